@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: app_info.py
+# Description: collects the build metadata served as app.info.json (app name,
+#              Node.js version, source hash/tag/branch, app version and the
+#              PatternFly / Red Hat Cloud Services dependency versions) and the
+#              full dependency version map served as app.info.deps.json, in a
+#              single process. package.json and the lockfile are read once and
+#              git refs are resolved with one batched plumbing pass.
+#
+# Usage:       ./app_info.py                       # app.info.json to STDOUT
+#              ./app_info.py --output-dir dist     # write both files
+#
+# Parameters:  --output-dir     Write app.info.json and app.info.deps.json here
+#              --skip-existing  Leave files that already exist in --output-dir
+#
+# Environment: PACKAGE_JSON_PATH, APP_VERSION, SOURCE_GIT_BRANCH,
+#              SOURCE_GIT_TAG and the CI branch variables listed in
+#              BRANCH_ENV_VARS are used as inputs or fallbacks.
+# ----------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from lockfile_deps import DependencyIndex, LockfileError, read_package_json
+
+APP_INFO_FILE = "app.info.json"
+DEPS_INFO_FILE = "app.info.deps.json"
+
+# Dependency scopes reported in app.info.json
+DEPENDENCY_SCOPES = {
+    "patternfly_dependencies": "@patternfly",
+    "rh_cloud_services_dependencies": "@redhat-cloud-services",
+}
+
+# CI variables holding the branch name in detached HEAD checkouts
+BRANCH_ENV_VARS = (
+    "SOURCE_GIT_BRANCH",
+    "GITHUB_HEAD_REF",
+    "GITHUB_REF_NAME",
+    "GIT_BRANCH",
+    "BRANCH_NAME",
+)
+
+UNKNOWN = "unknown"
+
+
+def _git(args, cwd):
+    """Run a git command and return its stripped stdout, or None on failure."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def _short_ref(ref):
+    """Reduce a ref to its last path component, as the CI fallbacks do."""
+    return ref.rsplit("/", 1)[-1]
+
+
+def resolve_git_refs(cwd=".", env=None):
+    """Resolve the source hash, branch and tag of the checkout.
+
+    One rev-parse call yields the commit and the symbolic name of HEAD, and
+    one for-each-ref call lists every branch, remote branch and tag pointing
+    at HEAD. `git describe` only runs when no tag points at HEAD. In detached
+    HEAD checkouts (Konflux/Tekton) the branch falls back to a remote branch at
+    HEAD and then to the CI environment variables.
+
+    Returns:
+        dict: "hash", "branch" and "tag", each "unknown" when unresolvable
+    """
+    env = os.environ if env is None else env
+    refs = {"hash": UNKNOWN, "branch": UNKNOWN, "tag": UNKNOWN}
+
+    head = _git(["rev-parse", "HEAD", "--symbolic-full-name", "HEAD"], cwd)
+    head_lines = head.splitlines() if head else []
+    if head_lines:
+        refs["hash"] = head_lines[0]
+
+    pointing = _git(
+        ["for-each-ref", "--points-at", "HEAD", "--format=%(refname)",
+         "refs/heads", "refs/remotes", "refs/tags"],
+        cwd,
+    )
+    pointing = pointing.splitlines() if pointing else []
+    remote_branches = [
+        ref for ref in pointing
+        if ref.startswith("refs/remotes/") and not ref.endswith("/HEAD")
+    ]
+    tags = [ref[len("refs/tags/"):] for ref in pointing if ref.startswith("refs/tags/")]
+
+    if len(head_lines) > 1 and head_lines[1].startswith("refs/heads/"):
+        refs["branch"] = head_lines[1][len("refs/heads/"):]
+    elif remote_branches:
+        refs["branch"] = _short_ref(remote_branches[0])
+    else:
+        for var in BRANCH_ENV_VARS:
+            if env.get(var):
+                refs["branch"] = _short_ref(env[var])
+                break
+
+    tag = tags[0] if tags else _git(["describe", "--tags", "--abbrev=0"], cwd)
+    if tag:
+        refs["tag"] = tag
+    elif env.get("SOURCE_GIT_TAG"):
+        refs["tag"] = env["SOURCE_GIT_TAG"]
+
+    return refs
+
+
+def _package_value(package_json, key):
+    """Look up a dotted key in package.json, defaulting to "unknown"."""
+    value = package_json
+    for part in key.split("."):
+        if not isinstance(value, dict) or value.get(part) is None:
+            return UNKNOWN
+        value = value[part]
+    return value
+
+
+def collect_app_info(project_dir=".", package_json_path=None, env=None):
+    """Collect app.info.json and app.info.deps.json contents in one pass.
+
+    Args:
+        project_dir: Directory holding package.json, the lockfile and .git
+        package_json_path: package.json path relative to project_dir
+            (default: $PACKAGE_JSON_PATH or package.json)
+        env: Environment mapping for fallbacks (default: os.environ)
+
+    Returns:
+        tuple: (app_info, deps_info) dictionaries
+    """
+    env = os.environ if env is None else env
+    package_json_path = package_json_path or env.get("PACKAGE_JSON_PATH") or "package.json"
+
+    package_json = read_package_json(project_dir, package_json_path)
+    refs = resolve_git_refs(project_dir, env)
+
+    try:
+        index = DependencyIndex.load(project_dir, package_json_path)
+    except LockfileError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        index = DependencyIndex({})
+
+    if index.lockfile is None:
+        print(
+            "Error: No supported lock file found. Cannot retrieve dependency lists.",
+            file=sys.stderr,
+        )
+
+    app_info = {
+        "app_name": _package_value(package_json, "insights.appname"),
+        "node_version": _package_value(package_json, "engines.node"),
+        "src_hash": refs["hash"],
+        "src_tag": refs["tag"],
+        "src_branch": refs["branch"],
+        "app_version": env.get("APP_VERSION") or UNKNOWN,
+    }
+    for field, scope in DEPENDENCY_SCOPES.items():
+        app_info[field] = index.matching(scope)
+        if index.lockfile is not None and not app_info[field]:
+            print(f"Error: No dependencies matching '{scope}' found.", file=sys.stderr)
+
+    deps_info = {
+        "lockfile": index.lockfile,
+        "dependencies": index.versions,
+    }
+    return app_info, deps_info
+
+
+def write_json(path, data):
+    """Write data as pretty-printed JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate app.info.json and app.info.deps.json.")
+    parser.add_argument("--output-dir")
+    parser.add_argument("--skip-existing", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.output_dir:
+        app_info, _ = collect_app_info()
+        print(json.dumps(app_info, indent=2))
+        return 0
+
+    outputs = {}
+    for name in (APP_INFO_FILE, DEPS_INFO_FILE):
+        path = os.path.join(args.output_dir, name)
+        if args.skip_existing and os.path.exists(path):
+            print(f"{name} already exists, skipping generation")
+        else:
+            outputs[name] = path
+    if not outputs:
+        return 0
+
+    app_info, deps_info = collect_app_info()
+    for name, data in ((APP_INFO_FILE, app_info), (DEPS_INFO_FILE, deps_info)):
+        if name in outputs:
+            write_json(outputs[name], data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: asset_inventory.py
+# Description: records what a build ships. Every file in the build output is
+#              compressed in a process pool, and its path, size, gzip size,
+#              brotli size and SHA-256 are written to a compact sidecar
+#              manifest (app.info.assets.json). The SHA-256 digests come from
+#              the assets.manifest.json of asset_integrity.py, which is only
+#              hashed again when it is missing or stale. Transfer sizes are then
+#              checked against the configured bundle budgets and against the
+#              previous build's manifest so bundle bloat is caught at build
+#              time instead of after deploy.
+#
+# Usage:       ./asset_inventory.py <build_dir> [--previous <path|url>]
+#
+# Parameters:  build_dir   Build output directory (e.g. dist)
+#              --previous  Manifest of the previous build, as a file path or
+#                          http(s) URL (default: $ASSET_BASELINE)
+#              --output    Manifest path (default: <build_dir>/app.info.assets.json)
+#              --integrity Digests written by asset_integrity.py (default:
+#                          <build_dir>/assets.manifest.json)
+#
+# Environment: ASSET_BUDGET_TOTAL_KB  Max total gzip size of shipped assets
+#              ASSET_BUDGET_CHUNK_KB  Max gzip size of any single JS/CSS chunk
+#              ASSET_BUDGET_GROWTH    Max relative growth against the previous
+#                                     manifest (default: 0.10)
+#              ASSET_BUDGET_MODE      warn or fail (default: warn)
+#
+# Dependencies: brotli sizes need the `brotli` Python module, which the
+#               builder image installs (python3-brotli); they are recorded as
+#               null without it.
+# ----------------------------------------------------------------------------
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import urllib.request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the build image
+    brotli = None
+
+from asset_integrity import MANIFEST_FILE as INTEGRITY_FILE
+from asset_integrity import build_manifest, map_files, write_manifest
+from build_metadata import list_files
+
+MANIFEST_FILE = "app.info.assets.json"
+MANIFEST_VERSION = 1
+
+# Files that are published but never downloaded by browsers
+UNSHIPPED_SUFFIXES = (".map",)
+
+# Code chunks checked against the per-chunk budget
+CHUNK_SUFFIXES = (".js", ".mjs", ".css")
+
+DEFAULT_GROWTH = 0.10
+LARGEST_CHUNKS_REPORTED = 5
+
+
+def measure_asset(build_dir, rel_path):
+    """Return the inventory entry for one file in the build output, without its digest."""
+    with open(os.path.join(build_dir, rel_path), "rb") as f:
+        data = f.read()
+    return {
+        "path": rel_path,
+        "size": len(data),
+        "gzip": len(gzip.compress(data, compresslevel=6, mtime=0)),
+        "brotli": len(brotli.compress(data)) if brotli is not None else None,
+    }
+
+
+def build_inventory(build_dir, workers=None, integrity=None):
+    """Measure every asset in build_dir in parallel.
+
+    Args:
+        build_dir: Build output directory
+        workers: Processes of the pool (default: CPU count)
+        integrity: Manifest of asset_integrity.py for the same build output;
+            its SHA-256 digests are reused when it lists every asset with the
+            measured size, otherwise the build output is hashed again
+
+    Returns:
+        dict: Manifest with "version", "totals" and path-sorted "assets"
+    """
+    assets = map_files(measure_asset, build_dir, list_files(build_dir), workers)
+
+    digests = (integrity or {}).get("assets", {})
+    if any(digests.get(asset["path"], {}).get("size") != asset["size"] for asset in assets):
+        digests = build_manifest(build_dir, workers)["assets"]
+    for asset in assets:
+        asset["sha256"] = digests[asset["path"]]["sha256"]
+
+    return {
+        "version": MANIFEST_VERSION,
+        "totals": summarize(assets),
+        "assets": assets,
+    }
+
+
+def is_shipped(asset):
+    """Return True for assets browsers actually download."""
+    return not asset["path"].endswith(UNSHIPPED_SUFFIXES)
+
+
+def is_chunk(asset):
+    """Return True for JS and CSS chunks."""
+    return asset["path"].endswith(CHUNK_SUFFIXES)
+
+
+def summarize(assets):
+    """Total file count and sizes of the shipped assets."""
+    shipped = [asset for asset in assets if is_shipped(asset)]
+    brotli_sizes = [asset["brotli"] for asset in shipped]
+    return {
+        "files": len(shipped),
+        "size": sum(asset["size"] for asset in shipped),
+        "gzip": sum(asset["gzip"] for asset in shipped),
+        "brotli": None if None in brotli_sizes else sum(brotli_sizes),
+    }
+
+
+def largest_chunks(manifest, count=LARGEST_CHUNKS_REPORTED):
+    """Return the largest JS/CSS chunks by gzip size."""
+    chunks = [asset for asset in manifest["assets"] if is_chunk(asset) and is_shipped(asset)]
+    return sorted(chunks, key=lambda asset: asset["gzip"], reverse=True)[:count]
+
+
+def budgets_from_env(env=None):
+    """Read the budget configuration from ASSET_BUDGET_* variables."""
+    env = os.environ if env is None else env
+
+    def _bytes(name):
+        value = env.get(name)
+        return int(float(value) * 1024) if value else None
+
+    mode = env.get("ASSET_BUDGET_MODE") or "warn"
+    if mode not in ("warn", "fail"):
+        raise ValueError(f"unsupported ASSET_BUDGET_MODE '{mode}'. Use 'warn' or 'fail'.")
+
+    return {
+        "total_gzip": _bytes("ASSET_BUDGET_TOTAL_KB"),
+        "chunk_gzip": _bytes("ASSET_BUDGET_CHUNK_KB"),
+        "growth": float(env.get("ASSET_BUDGET_GROWTH") or DEFAULT_GROWTH),
+        "mode": mode,
+    }
+
+
+def check_budgets(manifest, budgets, previous=None):
+    """Compare a manifest against budgets and the previous build's manifest.
+
+    Args:
+        manifest: Manifest produced by build_inventory()
+        budgets: Budget configuration from budgets_from_env()
+        previous: Manifest of the previous build, or None
+
+    Returns:
+        list: Human-readable budget violations (empty when within budget)
+    """
+    violations = []
+    totals = manifest["totals"]
+    chunks = largest_chunks(manifest, count=len(manifest["assets"]))
+
+    if budgets["total_gzip"] is not None and totals["gzip"] > budgets["total_gzip"]:
+        violations.append(
+            f"total gzip size {_kb(totals['gzip'])} exceeds budget {_kb(budgets['total_gzip'])}"
+        )
+
+    if budgets["chunk_gzip"] is not None:
+        for chunk in chunks:
+            if chunk["gzip"] <= budgets["chunk_gzip"]:
+                break
+            violations.append(
+                f"{chunk['path']} gzip size {_kb(chunk['gzip'])} exceeds chunk budget "
+                f"{_kb(budgets['chunk_gzip'])}"
+            )
+
+    if previous:
+        growth = budgets["growth"]
+        previous_total = previous.get("totals", {}).get("gzip") or 0
+        if previous_total and totals["gzip"] > previous_total * (1 + growth):
+            violations.append(
+                f"total gzip size grew {_pct(totals['gzip'], previous_total)} "
+                f"({_kb(previous_total)} -> {_kb(totals['gzip'])}), more than {growth:.0%}"
+            )
+
+        previous_chunks = largest_chunks(previous, count=1)
+        if chunks and previous_chunks:
+            current, before = chunks[0], previous_chunks[0]
+            if before["gzip"] and current["gzip"] > before["gzip"] * (1 + growth):
+                violations.append(
+                    f"largest chunk grew {_pct(current['gzip'], before['gzip'])} "
+                    f"({before['path']} {_kb(before['gzip'])} -> "
+                    f"{current['path']} {_kb(current['gzip'])}), more than {growth:.0%}"
+                )
+
+    return violations
+
+
+def _kb(size):
+    return f"{size / 1024:.1f}KB"
+
+
+def _pct(current, previous):
+    return f"{(current - previous) / previous:+.1%}"
+
+
+def load_manifest(location):
+    """Load a manifest from a file path or http(s) URL; None when unavailable."""
+    if not location:
+        return None
+    try:
+        if location.startswith(("http://", "https://")):
+            with urllib.request.urlopen(location, timeout=10) as response:
+                return json.load(response)
+        with open(location, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not load previous manifest {location}: {e}", file=sys.stderr)
+        return None
+
+
+def format_report(manifest, previous=None):
+    """Format a short size report of the build, with deltas when possible."""
+    totals = manifest["totals"]
+    lines = [
+        f"Assets: {totals['files']} files, {_kb(totals['size'])} raw, "
+        f"{_kb(totals['gzip'])} gzip"
+        + (f", {_kb(totals['brotli'])} brotli" if totals["brotli"] is not None else "")
+    ]
+    if previous and previous.get("totals", {}).get("gzip"):
+        lines[0] += f" ({_pct(totals['gzip'], previous['totals']['gzip'])} gzip vs previous)"
+
+    previous_sizes = {asset["path"]: asset["gzip"] for asset in (previous or {}).get("assets", [])}
+    lines.append("Largest chunks (gzip):")
+    for chunk in largest_chunks(manifest):
+        delta = ""
+        if previous_sizes.get(chunk["path"]):
+            delta = f" ({_pct(chunk['gzip'], previous_sizes[chunk['path']])})"
+        lines.append(f"  {_kb(chunk['gzip']):>10}  {chunk['path']}{delta}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inventory build assets and check bundle budgets.")
+    parser.add_argument("build_dir")
+    parser.add_argument("--previous", default=os.environ.get("ASSET_BASELINE"))
+    parser.add_argument("--output")
+    parser.add_argument("--integrity")
+    args = parser.parse_args(argv)
+
+    try:
+        budgets = budgets_from_env()
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    integrity_path = args.integrity or os.path.join(args.build_dir, INTEGRITY_FILE)
+    integrity = load_manifest(integrity_path) if os.path.isfile(integrity_path) else None
+    manifest = build_inventory(args.build_dir, integrity=integrity)
+    write_manifest(args.output or os.path.join(args.build_dir, MANIFEST_FILE), manifest)
+
+    previous = load_manifest(args.previous)
+    print(format_report(manifest, previous))
+
+    violations = check_budgets(manifest, budgets, previous)
+    if not violations:
+        return 0
+
+    level = "Error" if budgets["mode"] == "fail" else "Warning"
+    for violation in violations:
+        print(f"{level}: bundle budget: {violation}", file=sys.stderr)
+    return 1 if budgets["mode"] == "fail" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: build_cache.py
+# Description: content-addressed cache of the build output. The key covers the
+#              lockfile and build-relevant sources (by content), the build
+#              script names, the Node version and the env that shapes the
+#              bundle. On a hit universal_build.sh restores ${APP_BUILD_DIR}
+#              and skips install and build entirely; on a miss the fresh
+#              output is stored. The local cache is bounded by size and evicts
+#              the least recently used entries; entries can also be pushed to
+#              and pulled from an OCI registry with `oras`. Entries are kept
+#              per app (a subdirectory named after APP_NAME) and carry the
+#              SHA-256 of their tarball, which is checked before a restore.
+#
+# Usage:       ./build_cache.py key [--project-dir <dir>]
+#              ./build_cache.py restore <build_dir> --key <key>
+#              ./build_cache.py store <build_dir> --key <key>
+#              ./build_cache.py stats
+#
+# Environment: BUILD_CACHE_DIR     Local cache directory (empty, the default,
+#                                  disables the cache)
+#              APP_NAME            Cache scope: entries live in
+#                                  BUILD_CACHE_DIR/<APP_NAME>
+#              BUILD_CACHE_MAX_MB  Size bound of the local cache (default: 2048)
+#              BUILD_CACHE_OCI     OCI repository for shared entries, e.g.
+#                                  quay.io/org/app-build-cache (needs `oras`)
+#              BUILD_CACHE_IGNORE  Extra space-separated glob patterns of
+#                                  files that never affect the build output
+#              BUILD_CACHE_ENV     Extra space-separated env var names to key on
+#
+# Exit codes:  restore returns 0 on a hit and 1 on a miss.
+# ----------------------------------------------------------------------------
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+KEY_VERSION = "1"
+
+# Env that changes what the build produces
+KEY_ENV_VARS = (
+    "APP_BUILD_DIR",
+    "PACKAGE_JSON_PATH",
+    "NPM_BUILD_SCRIPT",
+    "YARN_BUILD_SCRIPT",
+    "PNPM_BUILD_SCRIPT",
+    "BUILD_WORKSPACES",
+    "WORKSPACE_PACKAGES",
+    "NODE_ENV",
+    "BETA",
+    "ENABLE_SENTRY",
+    "SENTRY_RELEASE",
+    "APP_VERSION",
+    "SOURCE_GIT_BRANCH",
+    "SOURCE_GIT_TAG",
+)
+
+# Files that never affect the build output
+IGNORED_PATTERNS = (
+    ".git/*",
+    "node_modules/*",
+    "build-tools/*",
+    ".github/*",
+    ".tekton/*",
+    ".dockerignore",
+    "Caddyfile",
+    "sourcemaps/*",
+    "README.md",
+    "CHANGELOG.md",
+)
+
+DEFAULT_MAX_MB = 2048
+ENTRY_SUFFIX = ".tar.gz"
+DIGEST_SUFFIX = ".sha256"
+DEFAULT_SCOPE = "default"
+STATS_FILE = "stats.json"
+
+
+def _words(value):
+    return tuple((value or "").split())
+
+
+def list_sources(project_dir, ignored=IGNORED_PATTERNS):
+    """List the files that make up the build input, sorted.
+
+    Uses git (tracked plus untracked, non-ignored files) when available so
+    .gitignore'd outputs and caches never enter the key; falls back to a
+    directory walk otherwise.
+    """
+    try:
+        output = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=project_dir,
+            capture_output=True,
+            check=True,
+        ).stdout
+        paths = [path.decode() for path in output.split(b"\0") if path]
+    except (OSError, subprocess.CalledProcessError):
+        paths = []
+        for root, dirs, files in os.walk(project_dir):
+            dirs[:] = [d for d in dirs if d not in (".git", "node_modules")]
+            for name in files:
+                rel_path = os.path.relpath(os.path.join(root, name), project_dir)
+                paths.append(rel_path.replace(os.sep, "/"))
+
+    return sorted(
+        path
+        for path in set(paths)
+        if os.path.isfile(os.path.join(project_dir, path))
+        and not any(fnmatch.fnmatch(path, pattern) for pattern in ignored)
+    )
+
+
+def node_version():
+    """Return `node --version`, or "unknown" when node is not installed."""
+    try:
+        return subprocess.run(
+            ["node", "--version"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compute_key(project_dir=".", env=None):
+    """Compute the cache key of a build.
+
+    Args:
+        project_dir: Application checkout
+        env: Environment mapping (defaults to os.environ)
+
+    Returns:
+        str: Hex SHA-256 over the key version, Node version, keyed env
+             and the path and content of every build input
+    """
+    env = os.environ if env is None else env
+    build_dir = (env.get("APP_BUILD_DIR") or "dist").strip("/")
+    ignored = IGNORED_PATTERNS + (f"{build_dir}/*",) + _words(env.get("BUILD_CACHE_IGNORE"))
+
+    digest = hashlib.sha256()
+    digest.update(f"v{KEY_VERSION}\nnode {node_version()}\n".encode())
+    for name in KEY_ENV_VARS + _words(env.get("BUILD_CACHE_ENV")):
+        digest.update(f"env {name}={env.get(name, '')}\n".encode())
+
+    for path in list_sources(project_dir, ignored):
+        digest.update(f"file {path} {_file_sha256(os.path.join(project_dir, path))}\n".encode())
+    return digest.hexdigest()
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_scope(env):
+    """Return the per-app subdirectory of the cache: APP_NAME, made path-safe."""
+    app_name = env.get("APP_NAME") or ""
+    if app_name in ("", "null"):
+        return DEFAULT_SCOPE
+    return re.sub(r"[^A-Za-z0-9._-]", "_", app_name).lstrip(".") or DEFAULT_SCOPE
+
+
+class BuildCache:
+    """Local, size-bounded store of build outputs keyed by compute_key().
+
+    Every entry is one gzip'd tarball named after its key, with the SHA-256
+    of the tarball next to it; an entry whose tarball does not match is
+    dropped instead of restored. Restoring an entry bumps its mtime, so
+    eviction drops the least recently used entries first.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_MB * 1024 * 1024, oci_repo=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.oci_repo = oci_repo
+
+    @classmethod
+    def from_env(cls, env=None):
+        """Create the cache from BUILD_CACHE_* variables; None when disabled.
+
+        The cache directory is BUILD_CACHE_DIR/<app name> (see cache_scope),
+        so apps built on the same host never restore each other's output.
+        """
+        env = os.environ if env is None else env
+        if not env.get("BUILD_CACHE_DIR"):
+            return None
+        max_mb = float(env.get("BUILD_CACHE_MAX_MB") or DEFAULT_MAX_MB)
+        cache_dir = os.path.join(env["BUILD_CACHE_DIR"], cache_scope(env))
+        return cls(cache_dir, int(max_mb * 1024 * 1024), env.get("BUILD_CACHE_OCI"))
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    def digest_path(self, key):
+        return os.path.join(self.cache_dir, key + DIGEST_SUFFIX)
+
+    def verify(self, key):
+        """Return True when the entry's tarball matches its recorded SHA-256."""
+        try:
+            with open(self.digest_path(key), encoding="utf-8") as f:
+                expected = f.read().strip()
+        except OSError:
+            return False
+        return expected == _file_sha256(self.entry_path(key))
+
+    def remove(self, key):
+        for path in (self.entry_path(key), self.digest_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def entries(self):
+        """Return (path, size, mtime) of every entry, least recently used first."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(ENTRY_SUFFIX):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((os.path.join(self.cache_dir, name), stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def restore(self, key, build_dir):
+        """Replace build_dir with the cached output for key.
+
+        Returns:
+            bool: True on a hit
+        """
+        path = self.entry_path(key)
+        if not os.path.exists(path) and not self._oci_pull(key):
+            self._count("misses")
+            return False
+        if not self.verify(key):
+            print(f"Warning: build cache entry {key[:12]} does not match its SHA-256; "
+                  "dropping it", file=sys.stderr)
+            self.remove(key)
+            self._count("misses")
+            return False
+
+        if os.path.isdir(build_dir):
+            shutil.rmtree(build_dir)
+        os.makedirs(build_dir)
+        with tarfile.open(path, "r:gz") as tar:
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(build_dir, filter="data")
+            else:  # pragma: no cover - Python without extraction filters
+                tar.extractall(build_dir)
+        os.utime(path)
+        self._count("hits")
+        return True
+
+    def store(self, key, build_dir):
+        """Store build_dir under key, then evict down to the size bound.
+
+        Returns:
+            tuple: (entry size in bytes, number of evicted entries)
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            with tarfile.open(tmp_path, "w:gz") as tar:
+                for rel_path in sorted(_walk(build_dir)):
+                    tar.add(os.path.join(build_dir, rel_path), rel_path, recursive=False)
+            with open(tmp_path + DIGEST_SUFFIX, "w", encoding="utf-8") as f:
+                f.write(_file_sha256(tmp_path) + "\n")
+            # Atomic publish: concurrent builds never see a half-written entry
+            os.replace(tmp_path + DIGEST_SUFFIX, self.digest_path(key))
+            os.replace(tmp_path, self.entry_path(key))
+        finally:
+            for path in (tmp_path, tmp_path + DIGEST_SUFFIX):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        self._oci_push(key)
+        return os.path.getsize(self.entry_path(key)), self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """Drop least recently used entries until the cache fits max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if keep and os.path.basename(path) == keep + ENTRY_SUFFIX:
+                continue
+            self.remove(os.path.basename(path)[:-len(ENTRY_SUFFIX)])
+            total -= size
+            evicted += 1
+        return evicted
+
+    def stats(self):
+        """Entry count, total size and the hit/miss counters."""
+        entries = self.entries()
+        stats = {"entries": len(entries), "size": sum(size for _, size, _ in entries)}
+        stats.update(self._read_counters())
+        return stats
+
+    def _read_counters(self):
+        try:
+            with open(os.path.join(self.cache_dir, STATS_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0}
+
+    def _count(self, counter):
+        # Best effort: counters are informational and never fail a build
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            counters = self._read_counters()
+            counters[counter] = counters.get(counter, 0) + 1
+            with open(os.path.join(self.cache_dir, STATS_FILE), "w", encoding="utf-8") as f:
+                json.dump(counters, f)
+        except OSError:
+            pass
+
+    def _oci_pull(self, key):
+        if not self.oci_repo or not shutil.which("oras"):
+            return False
+        os.makedirs(self.cache_dir, exist_ok=True)
+        result = subprocess.run(
+            ["oras", "pull", f"{self.oci_repo}:{key}", "--output", self.cache_dir],
+            capture_output=True,
+        )
+        return result.returncode == 0 and os.path.exists(self.entry_path(key))
+
+    def _oci_push(self, key):
+        if not self.oci_repo or not shutil.which("oras"):
+            return
+        result = subprocess.run(
+            ["oras", "push", f"{self.oci_repo}:{key}", key + ENTRY_SUFFIX, key + DIGEST_SUFFIX],
+            cwd=self.cache_dir,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            print(f"Warning: could not push build cache entry: {result.stderr.strip()}",
+                  file=sys.stderr)
+
+
+def _walk(build_dir):
+    for root, dirs, files in os.walk(build_dir):
+        for name in dirs + files:
+            yield os.path.relpath(os.path.join(root, name), build_dir)
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content-addressed build output cache.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    key_parser = subparsers.add_parser("key")
+    key_parser.add_argument("--project-dir", default=".")
+
+    for command in ("restore", "store"):
+        command_parser = subparsers.add_parser(command)
+        command_parser.add_argument("build_dir")
+        command_parser.add_argument("--key", required=True)
+
+    subparsers.add_parser("stats")
+    args = parser.parse_args(argv)
+
+    if args.command == "key":
+        print(compute_key(args.project_dir))
+        return 0
+
+    cache = BuildCache.from_env()
+    if cache is None:
+        print("Build cache: disabled (BUILD_CACHE_DIR is not set)")
+        return 1 if args.command == "restore" else 0
+
+    if args.command == "stats":
+        print(json.dumps(cache.stats()))
+        return 0
+
+    start = time.monotonic()
+    if args.command == "restore":
+        hit = cache.restore(args.key, args.build_dir)
+        stats = cache.stats()
+        result = "hit" if hit else "miss"
+        print(f"Build cache: {result} {args.key[:12]} "
+              f"({time.monotonic() - start:.1f}s; {stats['hits']} hits, "
+              f"{stats['misses']} misses, {stats['entries']} entries, {_mb(stats['size'])})")
+        return 0 if hit else 1
+
+    size, evicted = cache.store(args.key, args.build_dir)
+    print(f"Build cache: stored {args.key[:12]} ({_mb(size)} in "
+          f"{time.monotonic() - start:.1f}s, evicted {evicted})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
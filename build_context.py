@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: build_context.py
+# Description: works out which top-level directories of an app checkout the
+#              image build reads and writes a .dockerignore that keeps
+#              everything else (tests, fixtures, coverage, old dist and
+#              .history output, CI config) out of the build context. The
+#              build input is the package manifest and lockfile, the top-level
+#              config files, the source roots and every directory the build
+#              scripts, config files or workspaces refer to, plus the
+#              directories that kept sources import with a relative path
+#              (e.g. ../shared/a from src/). Logs the context size before and
+#              after, and the upload time that saves. Run it in the checkout
+#              (developer machine or CI) and commit the .dockerignore: the
+#              context is sent before anything in the image build runs.
+#
+# Usage:       ./build_context.py [project_dir] [--output <path>|-]
+#                  [--report <path>] [--bandwidth-mbps <n>] [--force]
+#                  [--no-stats]
+#
+# Parameters:  project_dir       App checkout (default: current directory)
+#              --output          .dockerignore to write, or - for STDOUT
+#                                (default: <project_dir>/.dockerignore)
+#              --report          Also write the analysis as JSON to this path
+#              --bandwidth-mbps  Upload bandwidth for the time estimate
+#                                (default: BUILD_CONTEXT_MBPS or 100)
+#              --force           Replace a .dockerignore that was not
+#                                generated by this script
+#              --no-stats        Skip the context size walk and summary
+#
+# Environment: BUILD_CONTEXT_INCLUDE  Extra space-separated top-level
+#                                     directories to keep in the context
+#              APP_BUILD_DIR, PACKAGE_JSON_PATH, NPM_BUILD_SCRIPT,
+#              YARN_BUILD_SCRIPT, PNPM_BUILD_SCRIPT as for universal_build.sh
+# ----------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import re
+import sys
+
+HEADER = "# Generated by build_context.py"
+
+# Top-level directories kept whenever they exist: source roots, package
+# manager files the install reads, and the build scripts the Dockerfile copies
+SOURCE_ROOTS = (
+    "src",
+    "public",
+    "static",
+    "assets",
+    "config",
+    "locales",
+    "patches",
+    ".yarn",
+    "build-tools",
+)
+
+# Top-level directories that are never build input, even when referenced
+NEVER_INCLUDED = (".git", "node_modules", ".history", ".cache", "coverage", ".nyc_output",
+                  "sourcemaps")
+
+# Excluded at any depth
+NESTED_EXCLUDES = ("**/node_modules", "**/__snapshots__", "**/.DS_Store")
+
+LOCKFILES = {"package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml"}
+
+# Top-level files that do not shape the build; never scanned for references
+UNSCANNED_FILES = re.compile(
+    r"^(jest|vitest|cypress|playwright|karma|eslint|prettier|stylelint|commitlint|lint-staged)"
+    r"[.\w-]*$|^\.(eslint|prettier|stylelint|commitlint|lintstaged)rc|\.md$",
+    re.IGNORECASE,
+)
+CONFIG_SUFFIXES = (".js", ".cjs", ".mjs", ".ts", ".cts", ".mts", ".json", ".yaml", ".yml")
+MAX_SCANNED_SIZE = 1024 * 1024
+
+# Build scripts run by universal_build.sh, in the order it looks them up
+DEFAULT_BUILD_SCRIPTS = ("build", "build:prod")
+_RUN_SCRIPT = re.compile(r"\b(?:npm run|pnpm(?: run)?|yarn(?: run)?)\s+([\w:.-]+)")
+
+# Sources scanned for relative imports ("../shared/a", url(../assets/x.png))
+SOURCE_SUFFIXES = (".js", ".jsx", ".cjs", ".mjs", ".ts", ".tsx", ".cts", ".mts", ".vue",
+                   ".svelte", ".css", ".scss", ".sass", ".less", ".html")
+_RELATIVE_PATH = re.compile(r"""["'`(]\s*(\.\.?/[^"'`)\s]+)""")
+
+DEFAULT_BANDWIDTH_MBPS = 100
+
+
+class DockerIgnore:
+    """Match paths against .dockerignore patterns the way Docker does.
+
+    A path is excluded when the last pattern matching it or one of its parent
+    directories is not a "!" exception.
+    """
+
+    def __init__(self, lines):
+        self.patterns = []
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            pattern = line[1:].strip() if negated else line
+            pattern = os.path.normpath(pattern.lstrip("/")).replace(os.sep, "/")
+            self.patterns.append((negated, pattern, self._compile(pattern)))
+
+    @classmethod
+    def load(cls, path):
+        """Read a .dockerignore; a missing file excludes nothing."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(f.read().splitlines())
+        except FileNotFoundError:
+            return cls([])
+
+    @staticmethod
+    def _compile(pattern):
+        regex = ""
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                regex += "(?:.*/)?"
+                i += 3
+            elif pattern.startswith("**", i):
+                regex += ".*"
+                i += 2
+            elif pattern[i] == "*":
+                regex += "[^/]*"
+                i += 1
+            elif pattern[i] == "?":
+                regex += "[^/]"
+                i += 1
+            else:
+                regex += re.escape(pattern[i])
+                i += 1
+        return re.compile(regex + "$")
+
+    def excluded(self, rel_path):
+        """Return True when rel_path is left out of the build context."""
+        parts = rel_path.split("/")
+        candidates = ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+        excluded = False
+        for negated, _, regex in self.patterns:
+            if any(regex.match(candidate) for candidate in candidates):
+                excluded = not negated
+        return excluded
+
+    def prunable(self, rel_dir):
+        """Return True when nothing below an excluded directory can be re-included."""
+        return not any(
+            negated and pattern.startswith((rel_dir + "/", "*"))
+            for negated, pattern, _ in self.patterns
+        )
+
+
+def context_size(project_dir, ignore):
+    """Walk the build context as Docker sends it.
+
+    Returns:
+        dict: {top-level entry: [files, bytes]} of the files not excluded
+    """
+    sizes = {}
+    for root, dirs, files in os.walk(project_dir):
+        rel_root = os.path.relpath(root, project_dir).replace(os.sep, "/")
+        rel_root = "" if rel_root == "." else rel_root + "/"
+        kept = []
+        for name in dirs:
+            rel_dir = rel_root + name
+            if not (ignore.excluded(rel_dir) and ignore.prunable(rel_dir)):
+                kept.append(name)
+        dirs[:] = kept
+        for name in files:
+            rel_path = rel_root + name
+            if ignore.excluded(rel_path):
+                continue
+            try:
+                size = os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+            entry = sizes.setdefault(rel_path.split("/", 1)[0], [0, 0])
+            entry[0] += 1
+            entry[1] += size
+    return sizes
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_scripts(package, env):
+    """Return the package.json script commands a build runs.
+
+    Starts from the configured build script (or build and build:prod), adds
+    their pre/post scripts and follows `npm run`, `yarn` and `pnpm` calls.
+    """
+    scripts = package.get("scripts") if isinstance(package.get("scripts"), dict) else {}
+    names = [env[var] for var in ("NPM_BUILD_SCRIPT", "YARN_BUILD_SCRIPT", "PNPM_BUILD_SCRIPT")
+             if env.get(var)] or list(DEFAULT_BUILD_SCRIPTS)
+    commands = []
+    seen = set()
+    while names:
+        name = names.pop(0)
+        if name in seen or not isinstance(scripts.get(name), str):
+            continue
+        seen.add(name)
+        commands.append(scripts[name])
+        names.extend([f"pre{name}", f"post{name}"] + _RUN_SCRIPT.findall(scripts[name]))
+    return commands
+
+
+def workspace_roots(project_dir, package):
+    """Return the top-level directories holding npm, yarn or pnpm workspaces."""
+    patterns = package.get("workspaces") or []
+    if isinstance(patterns, dict):
+        patterns = patterns.get("packages") or []
+    patterns = list(patterns)
+    try:
+        with open(os.path.join(project_dir, "pnpm-workspace.yaml"), encoding="utf-8") as f:
+            patterns += re.findall(r"^\s*-\s*['\"]?([^'\"#\s]+)", f.read(), re.MULTILINE)
+    except OSError:
+        pass
+    roots = set()
+    for pattern in patterns:
+        if isinstance(pattern, str) and not pattern.startswith("!"):
+            root = pattern.removeprefix("./").split("/", 1)[0]
+            if root and "*" not in root:
+                roots.add(root)
+    return roots
+
+
+def _config_texts(project_dir, names):
+    for name in names:
+        path = os.path.join(project_dir, name)
+        if (name in LOCKFILES or name == "package.json" or UNSCANNED_FILES.search(name)
+                or not os.path.isfile(path) or os.path.getsize(path) > MAX_SCANNED_SIZE):
+            continue
+        if name.endswith(CONFIG_SUFFIXES) or (name.startswith(".") and name.endswith("rc")):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                yield f.read()
+
+
+def _referenced(name, texts):
+    pattern = re.compile(
+        r"(?<![\w@.-])(?:\./)?" + re.escape(name) + r"(?=/|[\"'`\s,)\]]|$)"
+    )
+    return any(pattern.search(text) for text in texts)
+
+
+def imported_roots(project_dir, rel_dir):
+    """Return the top-level directories that sources under rel_dir import.
+
+    Every relative path literal in a source file ("../shared/a", './x',
+    url(../../assets/logo.svg)) is resolved against the file's directory;
+    paths that leave the file's own top-level directory name the one they
+    land in.
+    """
+    roots = set()
+    base = os.path.join(project_dir, rel_dir)
+    for root, dirs, files in os.walk(base):
+        dirs[:] = [d for d in dirs if d not in ("node_modules", ".git")]
+        for name in files:
+            path = os.path.join(root, name)
+            if not name.endswith(SOURCE_SUFFIXES) or os.path.getsize(path) > MAX_SCANNED_SIZE:
+                continue
+            with open(path, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+            file_dir = os.path.relpath(root, project_dir)
+            for ref in _RELATIVE_PATH.findall(text):
+                target = os.path.normpath(os.path.join(file_dir, ref)).replace(os.sep, "/")
+                top = target.split("/", 1)[0]
+                if top not in ("..", ".", rel_dir):
+                    roots.add(top)
+    return roots
+
+
+def analyze(project_dir, env=None):
+    """Work out the build input of an app checkout.
+
+    Returns:
+        tuple: (sorted top-level directories to keep, sorted ones to exclude)
+    """
+    env = os.environ if env is None else env
+    package_json = env.get("PACKAGE_JSON_PATH") or "package.json"
+    package = _read_json(os.path.join(project_dir, package_json))
+    if not isinstance(package, dict):
+        package = {}
+
+    entries = sorted(os.listdir(project_dir))
+    top_dirs = [name for name in entries if os.path.isdir(os.path.join(project_dir, name))]
+    texts = build_scripts(package, env) + list(_config_texts(project_dir, entries))
+
+    never = set(NEVER_INCLUDED) | {(env.get("APP_BUILD_DIR") or "dist").strip("/").split("/")[0]}
+    keep = set(SOURCE_ROOTS) | workspace_roots(project_dir, package)
+    keep |= set((env.get("BUILD_CONTEXT_INCLUDE") or "").split())
+    if "/" in package_json.strip("/"):
+        keep.add(package_json.strip("/").split("/", 1)[0])
+
+    included = {name for name in top_dirs
+                if name not in never and (name in keep or _referenced(name, texts))}
+    # Follow relative imports out of the kept directories until nothing new
+    # turns up, so a directory only imported from source stays in the context
+    pending = sorted(included)
+    while pending:
+        for name in imported_roots(project_dir, pending.pop()):
+            if name in top_dirs and name not in never and name not in included:
+                included.add(name)
+                pending.append(name)
+    return sorted(included), [name for name in top_dirs if name not in included]
+
+
+def render_dockerignore(included, excluded):
+    """Return the .dockerignore text for an analysis."""
+    lines = [
+        HEADER + "; regenerate it after adding a top-level",
+        "# directory the build reads, or list it in BUILD_CONTEXT_INCLUDE.",
+        f"# Build input: {', '.join(included) or '(top-level files only)'}",
+    ]
+    lines += sorted(set(excluded) | {".git", "node_modules"})
+    lines += NESTED_EXCLUDES
+    return "\n".join(lines) + "\n"
+
+
+def _totals(sizes):
+    return {
+        "files": sum(files for files, _ in sizes.values()),
+        "size": sum(size for _, size in sizes.values()),
+    }
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+def _write_output(output, content):
+    if output == "-":
+        sys.stdout.write(content)
+        return
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write a .dockerignore for a minimal build context."
+    )
+    parser.add_argument("project_dir", nargs="?", default=".")
+    parser.add_argument("--output")
+    parser.add_argument("--report")
+    bandwidth = os.environ.get("BUILD_CONTEXT_MBPS") or DEFAULT_BANDWIDTH_MBPS
+    parser.add_argument("--bandwidth-mbps", type=float, default=float(bandwidth))
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--no-stats", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.project_dir):
+        print(f"Error: project directory {args.project_dir} does not exist", file=sys.stderr)
+        return 1
+    if args.bandwidth_mbps <= 0:
+        print("Error: --bandwidth-mbps must be positive", file=sys.stderr)
+        return 1
+
+    existing_path = os.path.join(args.project_dir, ".dockerignore")
+    output = args.output or existing_path
+    if output != "-" and os.path.isfile(output) and not args.force:
+        with open(output, encoding="utf-8") as f:
+            if not f.read().startswith(HEADER):
+                print(f"Error: {output} was not generated by build_context.py; "
+                      "use --force to replace it", file=sys.stderr)
+                return 1
+
+    included, excluded = analyze(args.project_dir)
+    content = render_dockerignore(included, excluded)
+    if args.no_stats:
+        _write_output(output, content)
+        return 0
+
+    before = context_size(args.project_dir, DockerIgnore.load(existing_path))
+    after = context_size(args.project_dir, DockerIgnore(content.splitlines()))
+    baseline, minimal = _totals(before), _totals(after)
+    saved_size = baseline["size"] - minimal["size"]
+    saved_seconds = saved_size * 8 / (args.bandwidth_mbps * 1_000_000)
+
+    _write_output(output, content)
+
+    if args.report:
+        report = {
+            "included": included,
+            "excluded": [
+                {"path": name, "files": before.get(name, [0, 0])[0],
+                 "size": before.get(name, [0, 0])[1]}
+                for name in excluded
+            ],
+            "baseline": baseline,
+            "minimal": minimal,
+            "bandwidth_mbps": args.bandwidth_mbps,
+            "saved": {
+                "files": baseline["files"] - minimal["files"],
+                "size": saved_size,
+                "seconds": round(saved_seconds, 2),
+            },
+        }
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    share = saved_size / baseline["size"] if baseline["size"] else 0.0
+    print(f"Build context: {baseline['files']} files, {_mb(baseline['size'])} -> "
+          f"{minimal['files']} files, {_mb(minimal['size'])} (-{share:.0%}, "
+          f"~{saved_seconds:.1f}s less upload at {args.bandwidth_mbps:g}Mbit/s); "
+          f"excluded: {', '.join(excluded) or 'none'}",
+          file=sys.stderr if output == "-" else sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
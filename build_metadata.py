@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: build_metadata.py
+# Description: names of the build metadata files the build helpers write next
+#              to the assets of the build output, and the walker that lists
+#              the served files without them. asset_integrity.py,
+#              asset_inventory.py, fingerprint_lint.py and normalize_dist.py
+#              import it, so a new metadata file is added in one place.
+#
+# Usage:       from build_metadata import METADATA_FILES, list_files
+# ----------------------------------------------------------------------------
+
+import os
+
+# Build metadata that differs between builds of the same source
+VOLATILE_FILES = frozenset({
+    "app.info.json",
+    "app.info.deps.json",
+    "app.info.sourcemaps.json",
+    "asset-index.json",
+})
+
+# Build metadata written next to the assets; not served as app assets
+METADATA_FILES = VOLATILE_FILES | {
+    "app.info.assets.json",
+    "app.info.fingerprints.json",
+    "assets.manifest.json",
+}
+
+
+def list_files(build_dir):
+    """Return the relative paths of all files of build_dir but the metadata, sorted."""
+    paths = []
+    for root, _, files in os.walk(build_dir):
+        for name in files:
+            rel_path = os.path.relpath(os.path.join(root, name), build_dir).replace(os.sep, "/")
+            if rel_path not in METADATA_FILES:
+                paths.append(rel_path)
+    return sorted(paths)
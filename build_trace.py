@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: build_trace.py
+# Description: records and renders build-phase timings for universal_build.sh
+#              in Chrome trace format (viewable in chrome://tracing or
+#              https://ui.perfetto.dev). The trace_phase and trace_cmd helpers
+#              of universal_build.sh append the events to a JSON-lines file:
+#              phases that are shell functions as begin/end events, external
+#              commands through `exec`, which also records their exit code
+#              and peak RSS. `render` turns the events into a trace file and
+#              prints a one-line summary.
+#
+# Usage:       ./build_trace.py exec --events <file> --name <name> -- <cmd...>
+#              ./build_trace.py render --events <file> --output <trace.json>
+#
+# Parameters:  --events  JSON-lines event file shared by one build
+#              --name    Event name shown in the trace
+#              --cat     Event category: phase or command (default: command)
+#              --output  Chrome trace JSON file to write
+# ----------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+TRACE_PID = 1
+TRACE_TID = 1
+
+
+def now_us():
+    """Wall-clock time in microseconds, the same clock as bash's EPOCHREALTIME."""
+    return time.time_ns() // 1000
+
+
+def append_event(events_path, event):
+    """Append one event to the JSON-lines event file."""
+    with open(events_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event) + "\n")
+
+
+def run_command(events_path, name, cmd, cat="command"):
+    """Run cmd, then record its duration, exit code and peak RSS.
+
+    The command inherits stdin/stdout/stderr so build output is unchanged.
+    Peak RSS is the largest resident set of any process in the command's
+    tree that was waited for (RUSAGE_CHILDREN of this wrapper).
+
+    Returns:
+        int: The command's exit code (128 + signal when killed by a signal)
+    """
+    start = now_us()
+    try:
+        returncode = subprocess.call(cmd)
+    except OSError as e:
+        print(f"Error: could not run {cmd[0]}: {e}", file=sys.stderr)
+        returncode = 127
+    if returncode < 0:
+        returncode = 128 - returncode
+    end = now_us()
+
+    append_event(events_path, {
+        "ph": "X",
+        "name": name,
+        "cat": cat,
+        "ts": start,
+        "dur": end - start,
+        "exit_code": returncode,
+        # ru_maxrss is reported in KB on Linux
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    })
+    return returncode
+
+
+def load_events(events_path):
+    """Read the JSON-lines event file, skipping torn or malformed lines."""
+    events = []
+    if not os.path.exists(events_path):
+        return events
+    with open(events_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def complete_events(events, end_ts=None, exit_code=None):
+    """Pair phase begin/end events into complete ("X") events.
+
+    Phases still open when the build stopped (set -e aborted it) are closed
+    at end_ts with the build's exit code.
+
+    Returns:
+        list: Complete events sorted by start time
+    """
+    end_ts = end_ts or now_us()
+    completed = []
+    open_phases = []
+
+    for event in events:
+        if event["ph"] == "B":
+            open_phases.append(event)
+        elif event["ph"] == "E" and open_phases:
+            begin = open_phases.pop()
+            completed.append(_complete(begin, event["ts"], event.get("exit_code", 0)))
+        elif event["ph"] == "X":
+            completed.append(dict(event))
+
+    for begin in reversed(open_phases):
+        completed.append(_complete(begin, end_ts, exit_code))
+
+    completed.sort(key=lambda event: (event["ts"], -event["dur"]))
+
+    # A phase's peak RSS is the peak of the commands it ran
+    for event in completed:
+        if event.get("peak_rss_kb") is None:
+            nested = [
+                other.get("peak_rss_kb") or 0
+                for other in completed
+                if other is not event
+                and other["ts"] >= event["ts"]
+                and other["ts"] + other["dur"] <= event["ts"] + event["dur"]
+            ]
+            event["peak_rss_kb"] = max(nested) if nested else None
+    return completed
+
+
+def _complete(begin, end_ts, exit_code):
+    return {
+        "ph": "X",
+        "name": begin["name"],
+        "cat": begin.get("cat", "phase"),
+        "ts": begin["ts"],
+        "dur": max(0, end_ts - begin["ts"]),
+        "exit_code": exit_code,
+        "peak_rss_kb": None,
+    }
+
+
+def to_chrome_trace(completed):
+    """Convert complete events into a Chrome trace / Perfetto JSON object."""
+    trace_events = [
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": TRACE_PID,
+            "args": {"name": "universal_build.sh"},
+        }
+    ]
+    for event in completed:
+        trace_events.append({
+            "name": event["name"],
+            "cat": event["cat"],
+            "ph": "X",
+            "ts": event["ts"],
+            "dur": event["dur"],
+            "pid": TRACE_PID,
+            "tid": TRACE_TID,
+            "args": {
+                "exit_code": event["exit_code"],
+                "peak_rss_kb": event["peak_rss_kb"],
+            },
+        })
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def format_summary(completed, output=None):
+    """Format the one-line build summary: phase durations, shares and peak RSS."""
+    phases = [event for event in completed if event["cat"] == "phase"]
+    if not phases:
+        return "Build trace: no phases recorded"
+
+    total = max(e["ts"] + e["dur"] for e in phases) - min(e["ts"] for e in phases)
+    parts = [f"total {total / 1e6:.1f}s"]
+    for event in phases:
+        share = f" ({event['dur'] / total:.0%})" if total else ""
+        failed = f" exit={event['exit_code']}" if event["exit_code"] else ""
+        parts.append(f"{event['name']} {event['dur'] / 1e6:.1f}s{share}{failed}")
+
+    measured = [e for e in completed if e["cat"] == "command" and e.get("peak_rss_kb")]
+    measured = measured or [e for e in completed if e.get("peak_rss_kb")]
+    if measured:
+        peak = max(measured, key=lambda event: event["peak_rss_kb"])
+        parts.append(f"peak RSS {peak['peak_rss_kb'] / 1024:.0f}MB in {peak['name']}")
+    if output:
+        parts.append(f"trace: {output}")
+    return "Build trace: " + " | ".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and render build-phase traces.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    exec_parser = subparsers.add_parser("exec")
+    exec_parser.add_argument("--events", required=True)
+    exec_parser.add_argument("--name", required=True)
+    exec_parser.add_argument("--cat", default="command", choices=["phase", "command"])
+    exec_parser.add_argument("cmd", nargs=argparse.REMAINDER)
+
+    render_parser = subparsers.add_parser("render")
+    render_parser.add_argument("--events", required=True)
+    render_parser.add_argument("--output", required=True)
+    render_parser.add_argument("--exit-code", type=int)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "exec":
+        cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+        if not cmd:
+            parser.error("exec needs a command after --")
+        return run_command(args.events, args.name, cmd, args.cat)
+
+    completed = complete_events(load_events(args.events), exit_code=args.exit_code)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(completed), f)
+    print(format_summary(completed, args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: early_hints.py
+# Description: finds the critical entry scripts and stylesheets of a built
+#              frontend (from index.html and fed-mods.json) and prints them as
+#              an HTTP Link header value with rel=preload. server_config_gen.sh
+#              uses it to emit Link headers and 103 Early Hints for the
+#              entry-point routes in the generated Caddyfile.
+#
+# Usage:       ./early_hints.py <build_dir> --base <public_path>
+#
+# Parameters:  build_dir    Build output directory (e.g. dist)
+#              --base       Public path the build is served from; relative
+#                           references are resolved against it
+#              --max-links  Maximum number of preloads (default: 8)
+#
+# Output:      A single Link header value on STDOUT, or nothing when the build
+#              has no preloadable entry assets.
+# ----------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import posixpath
+import sys
+from html.parser import HTMLParser
+
+DEFAULT_MAX_LINKS = 8
+
+# Preload destinations ("as" values) by file extension
+PRELOAD_TYPES = {
+    ".js": "script",
+    ".mjs": "script",
+    ".css": "style",
+}
+
+
+class EntryAssetParser(HTMLParser):
+    """Collect script sources and stylesheet hrefs from an HTML document."""
+
+    def __init__(self):
+        super().__init__()
+        self.assets = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        if tag == "script" and attributes.get("src"):
+            self.assets.append((attributes["src"], "script"))
+        elif tag == "link" and attributes.get("href"):
+            rel = (attributes.get("rel") or "").lower().split()
+            if "stylesheet" in rel:
+                self.assets.append((attributes["href"], "style"))
+            elif "modulepreload" in rel:
+                self.assets.append((attributes["href"], "script"))
+
+
+def is_local_reference(ref):
+    """Return True for references served from the same origin as the app."""
+    return not (ref.startswith("//") or ":" in ref.split("/", 1)[0] or ref.startswith("data:"))
+
+
+def resolve_reference(ref, base):
+    """Resolve an asset reference against the public path the app is served from."""
+    ref = ref.split("#", 1)[0]
+    if ref.startswith("/"):
+        return ref
+    return posixpath.normpath(posixpath.join(base.rstrip("/") or "/", ref))
+
+
+def index_html_assets(build_dir):
+    """Return (reference, destination) pairs referenced by index.html."""
+    index_path = os.path.join(build_dir, "index.html")
+    if not os.path.isfile(index_path):
+        return []
+
+    parser = EntryAssetParser()
+    with open(index_path, encoding="utf-8", errors="replace") as f:
+        parser.feed(f.read())
+    return parser.assets
+
+
+def fed_mods_assets(build_dir):
+    """Return (reference, destination) pairs for fed-mods.json entry scripts."""
+    fed_mods_path = os.path.join(build_dir, "fed-mods.json")
+    if not os.path.isfile(fed_mods_path):
+        return []
+
+    try:
+        with open(fed_mods_path, encoding="utf-8") as f:
+            fed_mods = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not parse {fed_mods_path}: {e}", file=sys.stderr)
+        return []
+
+    assets = []
+    for module in fed_mods.values() if isinstance(fed_mods, dict) else []:
+        if not isinstance(module, dict):
+            continue
+        for entry in module.get("entry") or []:
+            destination = PRELOAD_TYPES.get(posixpath.splitext(entry.split("?", 1)[0])[1])
+            if destination:
+                assets.append((entry, destination))
+    return assets
+
+
+def collect_preloads(build_dir, base, max_links=DEFAULT_MAX_LINKS):
+    """Collect unique, same-origin entry assets as (url, destination) pairs.
+
+    index.html references come first since they block first paint, followed by
+    the federated module entry scripts listed in fed-mods.json.
+    """
+    preloads = []
+    seen = set()
+    for ref, destination in index_html_assets(build_dir) + fed_mods_assets(build_dir):
+        if not is_local_reference(ref):
+            continue
+        url = resolve_reference(ref, base)
+        if url in seen:
+            continue
+        seen.add(url)
+        preloads.append((url, destination))
+    return preloads[:max_links]
+
+
+def format_link_header(preloads):
+    """Format preloads as a single Link header value."""
+    return ", ".join(f"<{url}>; rel=preload; as={destination}" for url, destination in preloads)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the preload Link header of a build.")
+    parser.add_argument("build_dir")
+    parser.add_argument("--base", required=True)
+    parser.add_argument("--max-links", type=int, default=DEFAULT_MAX_LINKS)
+    args = parser.parse_args(argv)
+
+    preloads = collect_preloads(args.build_dir, args.base, args.max_links)
+    if preloads:
+        print(format_link_header(preloads))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: fingerprint_lint.py
+# Description: classifies every file of the build output as content-hashed
+#              (the name carries a hash, e.g. app.4f2c9a1b.js) or mutable (the
+#              same name can serve different bytes after a deploy, e.g.
+#              app.js). Only hashed names are safe to serve with a long,
+#              immutable Cache-Control; a mutable name referenced from
+#              index.html or fed-mods.json is served stale by CDNs and
+#              browsers after the next release. The result is written to
+#              app.info.fingerprints.json, and server_config_gen.sh can fail
+#              the build on it.
+#
+# Usage:       ./fingerprint_lint.py <build_dir> [--mode warn|fail|off]
+#                  [--max-mutable <ratio>] [--pattern <regex>]
+#
+# Parameters:  build_dir      Build output directory (e.g. dist)
+#              --mode         warn prints the violations, fail also exits 1,
+#                             off skips the check (default: FINGERPRINT_MODE
+#                             or warn)
+#              --max-mutable  Highest allowed share (0-1) of mutable assets,
+#                             entry documents excluded (default:
+#                             FINGERPRINT_MAX_MUTABLE, no limit when unset)
+#              --pattern      Regex that marks a file name as hashed, replacing
+#                             the built-in detection (default:
+#                             FINGERPRINT_PATTERN)
+#              --output       Report path (default:
+#                             <build_dir>/app.info.fingerprints.json)
+#
+# Violations:  every asset referenced by index.html or fed-mods.json that has
+#              a mutable name, and a mutable share above --max-mutable.
+# ----------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import posixpath
+import re
+import sys
+
+from build_metadata import list_files
+from early_hints import fed_mods_assets, index_html_assets, is_local_reference
+
+REPORT_FILE = "app.info.fingerprints.json"
+REPORT_VERSION = 1
+
+# Documents requested by a fixed URL; they are expected to keep their name and
+# be served with a short cache, so they do not count as mutable assets
+ENTRY_FILES = {"fed-mods.json"}
+ENTRY_EXTENSIONS = {".html", ".htm"}
+
+# Hash segments as bundlers write them: "[name].[contenthash].js" or
+# "[name]-[contenthash].js" (hex, at least 6 characters, with a digit so that
+# words such as "facade" do not count, and not a plain date such as
+# "logo-20230101.png"), and "[name]-[hash].js" with 8 base64url characters as
+# Vite and Rollup write them (with an uppercase letter and a digit, and not
+# made of capitalised words and numbers only, so that names such as
+# "chunk-12", "polyfills", "ReactDOM-Provider" or "ui-ChartsV2" do not count).
+_DATE = r"(?:19|20)\d\d(?:0[1-9]|1[0-2])(?:0[1-9]|[12]\d|3[01])\d*$"
+_WORDS = r"(?:[A-Z]+[a-z]*|\d+)+$"
+_HEX_TOKEN = re.compile(rf"(?!{_DATE})(?=[a-f]*\d)[0-9a-f]{{6,}}")
+_HEX_SUFFIX = re.compile(rf"[-_](?!{_DATE})(?=[a-f]*\d)[0-9a-f]{{6,}}$")
+_BASE64_SUFFIX = re.compile(rf"-(?=[^A-Z]*[A-Z])(?=\D*\d)(?!{_WORDS})[A-Za-z0-9_-]{{8}}$")
+
+HASHED = "hashed"
+MUTABLE = "mutable"
+ENTRY = "entry"
+
+
+def is_fingerprinted(name, pattern=None):
+    """Return True when the file name carries a content hash."""
+    if pattern is not None:
+        return pattern.search(name) is not None
+    stem = name.split(".")
+    if len(stem) > 1:
+        stem = stem[:-1]
+    return any(
+        _HEX_TOKEN.fullmatch(part) or _HEX_SUFFIX.search(part) or _BASE64_SUFFIX.search(part)
+        for part in stem
+    )
+
+
+def classify(rel_path, pattern=None):
+    """Return the class (hashed, mutable or entry) of a build output file."""
+    name = posixpath.basename(rel_path)
+    if rel_path in ENTRY_FILES or posixpath.splitext(name)[1].lower() in ENTRY_EXTENSIONS:
+        return ENTRY
+    return HASHED if is_fingerprinted(name, pattern) else MUTABLE
+
+
+def reference_path(ref, files):
+    """Map an entry document reference to a file of the build output.
+
+    Relative references resolve against the build root. Absolute ones carry
+    the public path the app is served from (e.g. /apps/<name>/js/app.js),
+    which is unknown here, so leading segments are dropped until the rest
+    names a built file.
+
+    Returns:
+        str: Relative path in the build output, or None when nothing matches
+    """
+    path = ref.split("#", 1)[0].split("?", 1)[0]
+    parts = [part for part in posixpath.normpath("/" + path).split("/") if part]
+    for start in range(len(parts)):
+        candidate = "/".join(parts[start:])
+        if candidate in files:
+            return candidate
+        if not path.startswith("/"):
+            break
+    return None
+
+
+def collect_references(build_dir, files, classes):
+    """Return the same-origin assets referenced by index.html and fed-mods.json.
+
+    Returns:
+        list: {"source", "ref", "path", "class"} per unique reference; path
+            and class are None for references missing from the build output
+    """
+    references = []
+    seen = set()
+    sources = [("index.html", index_html_assets(build_dir)),
+               ("fed-mods.json", fed_mods_assets(build_dir))]
+    for source, assets in sources:
+        for ref, _ in assets:
+            if not is_local_reference(ref) or (source, ref) in seen:
+                continue
+            seen.add((source, ref))
+            path = reference_path(ref, files)
+            references.append({
+                "source": source,
+                "ref": ref,
+                "path": path,
+                "class": classes.get(path),
+            })
+    return references
+
+
+def lint(build_dir, max_mutable=None, pattern=None):
+    """Classify the build output and collect the long-cache violations.
+
+    Returns:
+        dict: Report with "totals", "assets" ({path: class}), "references"
+            and "violations"
+    """
+    files = list_files(build_dir)
+    classes = {rel_path: classify(rel_path, pattern) for rel_path in files}
+    references = collect_references(build_dir, set(files), classes)
+
+    totals = {"files": len(files), HASHED: 0, MUTABLE: 0, ENTRY: 0}
+    for cls in classes.values():
+        totals[cls] += 1
+    assets = totals[HASHED] + totals[MUTABLE]
+    totals["mutable_ratio"] = round(totals[MUTABLE] / assets, 4) if assets else 0.0
+
+    violations = [
+        f"{reference['source']} references mutable asset {reference['path']}"
+        for reference in references
+        if reference["class"] == MUTABLE
+    ]
+    if max_mutable is not None and totals[MUTABLE] > max_mutable * assets:
+        violations.append(
+            f"{totals[MUTABLE]} of {assets} assets have mutable names "
+            f"({totals['mutable_ratio']:.1%}, limit {max_mutable:.1%})"
+        )
+
+    return {
+        "version": REPORT_VERSION,
+        "pattern": pattern.pattern if pattern is not None else None,
+        "max_mutable": max_mutable,
+        "totals": totals,
+        "assets": classes,
+        "references": references,
+        "violations": violations,
+    }
+
+
+def write_report(path, report):
+    """Write the report as JSON."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def _ratio(value):
+    ratio = float(value)
+    if not 0 <= ratio <= 1:
+        raise argparse.ArgumentTypeError(f"{value} is not between 0 and 1")
+    return ratio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag asset names that are unsafe to long-cache.")
+    parser.add_argument("build_dir")
+    parser.add_argument("--mode", choices=["warn", "fail", "off"],
+                        default=os.environ.get("FINGERPRINT_MODE") or "warn")
+    parser.add_argument("--max-mutable", type=_ratio,
+                        default=os.environ.get("FINGERPRINT_MAX_MUTABLE") or None)
+    parser.add_argument("--pattern", default=os.environ.get("FINGERPRINT_PATTERN") or None)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    if args.mode == "off":
+        return 0
+    if not os.path.isdir(args.build_dir):
+        print(f"Error: build directory {args.build_dir} does not exist", file=sys.stderr)
+        return 1
+    try:
+        pattern = re.compile(args.pattern) if args.pattern else None
+    except re.error as e:
+        print(f"Error: invalid FINGERPRINT_PATTERN '{args.pattern}': {e}", file=sys.stderr)
+        return 1
+
+    report = lint(args.build_dir, args.max_mutable, pattern)
+    output = args.output or os.path.join(args.build_dir, REPORT_FILE)
+    write_report(output, report)
+
+    totals = report["totals"]
+    print(f"Fingerprints: {totals[HASHED]} hashed, {totals[MUTABLE]} mutable, "
+          f"{totals[ENTRY]} entry documents -> {output}")
+    level = "Error" if args.mode == "fail" else "Warning"
+    for violation in report["violations"]:
+        print(f"{level}: {violation}", file=sys.stderr)
+    if report["violations"] and args.mode == "fail":
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: lockfile_deps.py
+# Description: resolves the installed versions of an app's production
+#              dependencies straight from its lockfile (package-lock.json,
+#              yarn.lock or pnpm-lock.yaml) instead of running `npm list` or
+#              `pnpm list`, which walk the whole node_modules tree. The
+#              lockfile is parsed once; any number of scope queries are then
+#              answered from the in-memory index.
+#
+# Usage:       ./lockfile_deps.py [project_dir] [--scope <scope> ...]
+#
+# Parameters:  project_dir  Directory holding package.json and the lockfile
+#                           (default: current directory)
+#              --scope      Case-insensitive substring to match dependency
+#                           names against, e.g. "@patternfly". Repeatable.
+#
+# Output:      Without --scope, a JSON object mapping every direct production
+#              dependency to its locked version. With --scope, a JSON object
+#              mapping each scope to a list of "name@version" strings.
+# ----------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import re
+import sys
+
+LOCKFILES = ("pnpm-lock.yaml", "package-lock.json", "yarn.lock")
+
+# Dependency sections that `npm list --production` reports
+PRODUCTION_SECTIONS = ("dependencies", "optionalDependencies")
+
+
+class LockfileError(Exception):
+    """Raised when a lockfile cannot be parsed."""
+
+
+def read_package_json(project_dir, package_json_path="package.json"):
+    """Return the parsed package.json of a project, or an empty dict."""
+    path = os.path.join(project_dir, package_json_path)
+    if not os.path.isfile(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def production_ranges(package_json):
+    """Return {name: range} for the direct production dependencies."""
+    ranges = {}
+    for section in PRODUCTION_SECTIONS:
+        ranges.update(package_json.get(section) or {})
+    return ranges
+
+
+def parse_package_lock(path, ranges, importer="."):
+    """Resolve direct dependency versions from an npm package-lock.json.
+
+    A workspace package (importer other than ".") uses its own nested install
+    of a dependency when there is one, and the hoisted root install otherwise.
+    """
+    with open(path, encoding="utf-8") as f:
+        lock = json.load(f)
+
+    versions = {}
+    packages = lock.get("packages")
+    if packages is not None:
+        # lockfileVersion 2 and 3: flat map keyed by install path
+        for name in ranges:
+            entry = packages.get(f"node_modules/{name}")
+            if importer != ".":
+                entry = packages.get(f"{importer}/node_modules/{name}") or entry
+            if entry and entry.get("version"):
+                versions[name] = entry["version"]
+    else:
+        # lockfileVersion 1: nested dependency tree
+        dependencies = lock.get("dependencies") or {}
+        for name in ranges:
+            entry = dependencies.get(name)
+            if entry and entry.get("version"):
+                versions[name] = entry["version"]
+    return versions
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _split_descriptor(descriptor):
+    """Split a yarn descriptor such as "@scope/pkg@npm:^1.0.0" into (name, range)."""
+    at = descriptor.find("@", 1)
+    if at == -1:
+        return descriptor, ""
+    spec = descriptor[at + 1:]
+    if spec.startswith("npm:"):
+        spec = spec[len("npm:"):]
+    return descriptor[:at], spec
+
+
+def parse_yarn_lock(path, ranges, importer="."):
+    """Resolve direct dependency versions from a yarn.lock (classic or berry)."""
+    by_descriptor = {}
+    by_name = {}
+    descriptors = []
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            if not line[0].isspace():
+                # Entry header: comma-separated descriptors ending with ":".
+                # Classic quotes each descriptor, berry the whole list
+                # ("a@npm:^1.0.0, a@npm:^1.1.0":); descriptors never contain
+                # quotes, so drop them all before splitting.
+                header = line.rstrip().rstrip(":").replace('"', "")
+                descriptors = [
+                    _split_descriptor(part.strip()) for part in header.split(",") if part.strip()
+                ]
+                continue
+            match = re.match(r'^\s+version:?\s+(.+)$', line)
+            if match and descriptors:
+                version = _unquote(match.group(1))
+                for name, spec in descriptors:
+                    by_descriptor[(name, spec)] = version
+                    by_name.setdefault(name, version)
+                descriptors = []
+
+    versions = {}
+    for name, spec in ranges.items():
+        version = by_descriptor.get((name, spec)) or by_name.get(name)
+        if version:
+            versions[name] = version
+    return versions
+
+
+def _strip_peer_suffix(version):
+    """Drop pnpm peer-dependency suffixes: 5.4.0(react@18.2.0) or 5.4.0_react@18."""
+    return re.split(r"[(_]", version, maxsplit=1)[0]
+
+
+def parse_pnpm_lock(path, ranges, importer="."):
+    """Resolve direct dependency versions from a pnpm-lock.yaml.
+
+    Only the dependency sections of one importer (the root "." by default, or
+    a workspace package directory) are read, using a small indentation-based
+    reader so the builder image needs no YAML library. Supports lockfile
+    formats 5.x (name: version), 6.x and 9.x (name: {specifier, version},
+    under importers["."] for 9.x).
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [
+            line.rstrip("\n")
+            for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+    def _indent(line):
+        return len(line) - len(line.lstrip(" "))
+
+    def _key(line):
+        return _unquote(line.strip().partition(":")[0])
+
+    # Locate the importer; older formats keep the root's sections at top level
+    base_indent = 0
+    start, end = 0, len(lines)
+    for i, line in enumerate(lines):
+        if line == "importers:":
+            for j in range(i + 1, len(lines)):
+                if _indent(lines[j]) == 0:
+                    break
+                if _indent(lines[j]) == 2 and _key(lines[j]) == importer:
+                    start = j + 1
+                    end = start
+                    while end < len(lines) and _indent(lines[end]) > 2:
+                        end += 1
+                    base_indent = 4
+                    break
+            break
+
+    versions = {}
+    section = None
+    current = None
+    for line in lines[start:end]:
+        indent = _indent(line)
+        key, _, value = line.strip().partition(":")
+        key, value = _unquote(key), value.strip()
+        if indent == base_indent:
+            section = key if key in PRODUCTION_SECTIONS else None
+            current = None
+        elif section and indent == base_indent + 2:
+            current = key
+            if value:
+                versions[key] = _strip_peer_suffix(_unquote(value))
+        elif section and current and indent == base_indent + 4 and key == "version":
+            versions[current] = _strip_peer_suffix(_unquote(value))
+
+    return {name: version for name, version in versions.items() if name in ranges}
+
+
+PARSERS = {
+    "pnpm-lock.yaml": parse_pnpm_lock,
+    "package-lock.json": parse_package_lock,
+    "yarn.lock": parse_yarn_lock,
+}
+
+
+class DependencyIndex:
+    """In-memory index of an app's direct production dependency versions."""
+
+    def __init__(self, versions, lockfile=None):
+        self.versions = dict(sorted(versions.items()))
+        self.lockfile = lockfile
+
+    @classmethod
+    def load(cls, project_dir=".", package_json_path="package.json"):
+        """Build the index from the first supported lockfile in project_dir.
+
+        Dependencies that are declared in package.json but missing from the
+        lockfile are reported with version "unknown", as `npm list` would.
+        """
+        ranges = production_ranges(read_package_json(project_dir, package_json_path))
+        importer = os.path.dirname(os.path.normpath(package_json_path)).replace(os.sep, "/") or "."
+
+        for lockfile in LOCKFILES:
+            path = os.path.join(project_dir, lockfile)
+            if os.path.isfile(path):
+                try:
+                    versions = PARSERS[lockfile](path, ranges, importer)
+                except (OSError, ValueError) as e:
+                    raise LockfileError(f"could not parse {path}: {e}") from e
+                versions = {name: versions.get(name, "unknown") for name in ranges}
+                return cls(versions, lockfile)
+
+        return cls({}, None)
+
+    def matching(self, scope):
+        """Return "name@version" strings for dependencies whose name contains scope."""
+        needle = scope.lower()
+        return [
+            f"{name}@{version}"
+            for name, version in self.versions.items()
+            if needle in name.lower()
+        ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve dependency versions from a lockfile.")
+    parser.add_argument("project_dir", nargs="?", default=".")
+    parser.add_argument("--scope", action="append", default=[])
+    parser.add_argument(
+        "--package-json",
+        default=os.environ.get("PACKAGE_JSON_PATH", "package.json"),
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        index = DependencyIndex.load(args.project_dir, args.package_json)
+    except LockfileError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.scope:
+        result = {scope: index.matching(scope) for scope in args.scope}
+    else:
+        result = index.versions
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: normalize_dist.py
+# Description: prepares the build output for reproducible image layers. Files
+#              are copied and split into the assets, whose content only
+#              changes when the app does, and the volatile build metadata
+#              (app.info.json, asset-index.json, ...), which changes on every
+#              build. Every file and directory of both trees gets its mtime
+#              set to SOURCE_DATE_EPOCH and normalized permissions, so two
+#              builds of identical content produce an identical asset layer.
+#              The build output itself is left untouched.
+#
+# Usage:       ./normalize_dist.py <build_dir> --assets <dir> --metadata <dir>
+#
+# Parameters:  build_dir   Build output directory (e.g. dist)
+#              --assets    Destination of the asset tree
+#              --metadata  Destination of the volatile metadata files
+#              --epoch     Timestamp for every entry (default: $SOURCE_DATE_EPOCH,
+#                          then the commit time of HEAD, then 0)
+#              --app-dirs  The build output holds one app per top-level
+#                          directory, each with its own metadata (default:
+#                          on when BUILD_WORKSPACES=true)
+# ----------------------------------------------------------------------------
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+from build_metadata import VOLATILE_FILES
+
+FILE_MODE = 0o644
+EXECUTABLE_MODE = 0o755
+DIR_MODE = 0o755
+
+
+def source_date_epoch(env=None, cwd="."):
+    """Resolve SOURCE_DATE_EPOCH: the env var, else the commit time of HEAD, else 0."""
+    env = os.environ if env is None else env
+    if env.get("SOURCE_DATE_EPOCH"):
+        return int(env["SOURCE_DATE_EPOCH"])
+    try:
+        output = subprocess.run(
+            ["git", "log", "-1", "--format=%ct"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        return int(output)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return 0
+
+
+def _place(src, dest):
+    """Copy src to dest with its mode bits.
+
+    A copy rather than a hard link: normalize_tree changes the mode and mtime
+    of dest, which must not touch the build output it came from.
+    """
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    if os.path.lexists(dest):
+        os.remove(dest)
+    shutil.copy(src, dest)
+
+
+def split_build(build_dir, assets_dir, metadata_dir, app_dirs=False):
+    """Split build_dir into the asset and the volatile metadata trees.
+
+    Only top-level files named in VOLATILE_FILES are metadata; a file of the
+    same name deeper in the tree belongs to the app. With app_dirs (workspace
+    builds, one app per top-level directory) those of each app directory are
+    metadata too. Empty directories are kept in the asset tree; symlinked
+    directories are not followed and are reported on stderr.
+
+    Returns:
+        tuple: (asset paths, metadata paths), relative and sorted
+    """
+    assets, metadata = [], []
+    for root, dirs, files in os.walk(build_dir):
+        for name in [name for name in dirs if os.path.islink(os.path.join(root, name))]:
+            dirs.remove(name)
+            rel_path = os.path.relpath(os.path.join(root, name), build_dir)
+            print(f"Warning: skipping symlinked directory {rel_path}", file=sys.stderr)
+        dirs.sort()
+        if not dirs and not files and root != build_dir:
+            os.makedirs(os.path.join(assets_dir, os.path.relpath(root, build_dir)), exist_ok=True)
+        for name in sorted(files):
+            src = os.path.join(root, name)
+            rel_path = os.path.relpath(src, build_dir)
+            name_path = rel_path.split(os.sep, 1)[-1] if app_dirs else rel_path
+            if rel_path in VOLATILE_FILES or name_path in VOLATILE_FILES:
+                metadata.append(rel_path)
+                _place(src, os.path.join(metadata_dir, rel_path))
+            else:
+                assets.append(rel_path)
+                _place(src, os.path.join(assets_dir, rel_path))
+    os.makedirs(assets_dir, exist_ok=True)
+    os.makedirs(metadata_dir, exist_ok=True)
+    return assets, metadata
+
+
+def normalize_tree(tree, epoch):
+    """Set every mtime under tree to epoch and normalize permissions.
+
+    Files keep only their executable bit. Directories are handled bottom-up,
+    after their entries, so touching the files does not bump them again.
+    """
+    for root, dirs, files in os.walk(tree, topdown=False):
+        for name in files:
+            path = os.path.join(root, name)
+            stat = os.lstat(path)
+            executable = stat.st_mode & 0o111
+            os.chmod(path, EXECUTABLE_MODE if executable else FILE_MODE)
+            os.utime(path, (epoch, epoch))
+        for name in dirs:
+            _normalize_dir(os.path.join(root, name), epoch)
+    _normalize_dir(tree, epoch)
+
+
+def _normalize_dir(path, epoch):
+    os.chmod(path, DIR_MODE)
+    os.utime(path, (epoch, epoch))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split and normalize the build output.")
+    parser.add_argument("build_dir")
+    parser.add_argument("--assets", required=True)
+    parser.add_argument("--metadata", required=True)
+    parser.add_argument("--epoch", type=int)
+    parser.add_argument("--app-dirs", action="store_true",
+                        default=os.environ.get("BUILD_WORKSPACES") == "true")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.build_dir):
+        print(f"Error: build directory {args.build_dir} does not exist", file=sys.stderr)
+        return 1
+
+    epoch = args.epoch if args.epoch is not None else source_date_epoch()
+    for tree in (args.assets, args.metadata):
+        if os.path.isdir(tree):
+            shutil.rmtree(tree)
+
+    assets, metadata = split_build(args.build_dir, args.assets, args.metadata, args.app_dirs)
+    normalize_tree(args.assets, epoch)
+    normalize_tree(args.metadata, epoch)
+
+    print(f"Normalized {len(assets)} assets and {len(metadata)} metadata files "
+          f"(SOURCE_DATE_EPOCH={epoch})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,11 @@
 # Expected .env structure: KEY=VALUE (one per line)
 # Lines starting with # are treated as comments and ignored
 # Empty lines are ignored
+# BUILD_SECRETS_FILE overrides the mounted secret's path (used by the tests)
 # Disable bash xtrace so secret values are not printed in CI logs, then restore
 { old_opts=$(set +o); set +x; } 2>/dev/null
 
-SECRETS_FILE="/run/secrets/build-container-additional-secret/secrets"
+SECRETS_FILE="${BUILD_SECRETS_FILE:-/run/secrets/build-container-additional-secret/secrets}"
 
 if [ ! -f "$SECRETS_FILE" ]; then
     echo "Error: Secrets file not found at $SECRETS_FILE"
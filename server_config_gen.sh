@@ -1,29 +1,249 @@
 #!/bin/bash
+set -euo pipefail
 
 export LC_ALL=en_US.utf-8
 export LANG=en_US.utf-8
-GIT_COMMIT=$(git rev-parse HEAD)
-export GIT_COMMIT
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-# shellcheck source=dependency_helpers.sh
-source "${SCRIPT_DIR}/dependency_helpers.sh" || exit 1
 
-NPM_INFO="undefined"
-PATTERNFLY_DEPS="undefined"
 export USES_CADDY=true
 SERVER_NAME=${SERVER_NAME:-$APP_NAME}
 
+# CADDY_PROFILE selects how the generated Caddyfile trades debuggability for
+# throughput:
+#   default    - directory browsing and a full access log (historic behaviour)
+#   production - no directory browsing (a static asset-index.json is generated
+#                instead), sampled or disabled access logging, tuned timeouts
+CADDY_PROFILE=${CADDY_PROFILE:-default}
+# Access log mode for the production profile: sampled, full, or off
+CADDY_ACCESS_LOG=${CADDY_ACCESS_LOG:-sampled}
+CADDY_LOG_SAMPLE_FIRST=${CADDY_LOG_SAMPLE_FIRST:-100}
+CADDY_LOG_SAMPLE_THEREAFTER=${CADDY_LOG_SAMPLE_THEREAFTER:-100}
+# Preload the entry scripts and stylesheets found in index.html and
+# fed-mods.json with Link headers and 103 Early Hints (true or false; opt-in)
+CADDY_EARLY_HINTS=${CADDY_EARLY_HINTS:-false}
+# Lint the build output for asset names that are unsafe to long-cache (no
+# content hash): warn, fail, or off. FINGERPRINT_MAX_MUTABLE optionally caps
+# the share of mutable asset names (0-1).
+FINGERPRINT_MODE=${FINGERPRINT_MODE:-warn}
+# Workspace builds (see universal_build.sh) get one /apps/<app name> route per
+# workspace app, each serving ${APP_BUILD_DIR}/<app name>
+BUILD_WORKSPACES=${BUILD_WORKSPACES:-false}
+WORKSPACE_APPS=()
+
+validate_caddy_profile() {
+  case "$CADDY_PROFILE" in
+    default|production) ;;
+    *)
+      echo "Error: unsupported CADDY_PROFILE '${CADDY_PROFILE}'. Use 'default' or 'production'." >&2
+      exit 1
+      ;;
+  esac
+
+  case "$CADDY_ACCESS_LOG" in
+    sampled|full|off) ;;
+    *)
+      echo "Error: unsupported CADDY_ACCESS_LOG '${CADDY_ACCESS_LOG}'. Use 'sampled', 'full', or 'off'." >&2
+      exit 1
+      ;;
+  esac
+
+  case "$CADDY_EARLY_HINTS" in
+    true|false) ;;
+    *)
+      echo "Error: unsupported CADDY_EARLY_HINTS '${CADDY_EARLY_HINTS}'. Use 'true' or 'false'." >&2
+      exit 1
+      ;;
+  esac
+
+  case "$FINGERPRINT_MODE" in
+    warn|fail|off) ;;
+    *)
+      echo "Error: unsupported FINGERPRINT_MODE '${FINGERPRINT_MODE}'. Use 'warn', 'fail', or 'off'." >&2
+      exit 1
+      ;;
+  esac
+
+  case "$BUILD_WORKSPACES" in
+    true|false) ;;
+    *)
+      echo "Error: unsupported BUILD_WORKSPACES '${BUILD_WORKSPACES}'. Use 'true' or 'false'." >&2
+      exit 1
+      ;;
+  esac
+}
+
+# Server options. Both servers get stable names so Prometheus series carry
+# server="frontend" rather than Caddy's generated srvN. Options set on a
+# named listener replace the catch-all block, so metrics are enabled there.
+# The production profile also bounds slow clients and idle keep-alive
+# connections instead of relying on Caddy's unlimited defaults.
+caddy_server_options() {
+  echo "	servers :9000 {
+		name metrics
+	}
+	servers :8000 {
+		name frontend
+		metrics"
+  if [[ "$CADDY_PROFILE" == production ]]; then
+    echo "		timeouts {
+			read_header 10s
+			read_body 30s
+			write 60s
+			idle 2m
+		}"
+  fi
+  echo "	}"
+}
+
+caddy_access_log() {
+  if [[ "$CADDY_PROFILE" != production || "$CADDY_ACCESS_LOG" == full ]]; then
+    echo "	log"
+  elif [[ "$CADDY_ACCESS_LOG" == sampled ]]; then
+    echo "	log {
+		sampling {
+			interval 1000000000
+			first ${CADDY_LOG_SAMPLE_FIRST}
+			thereafter ${CADDY_LOG_SAMPLE_THEREAFTER}
+		}
+	}"
+  fi
+}
+
+# Directory listings render the whole (history-aggregated) dist on every hit,
+# so they are only enabled outside of the production profile.
+caddy_browse_directive() {
+  local indent="$1"
+
+  if [[ "$CADDY_PROFILE" != production ]]; then
+    echo ""
+    echo -n "${indent}browse"
+  fi
+}
+
+# preload_link_header
+# Purpose: Print the Link header value preloading the build's entry assets,
+# resolved against the given public path. Prints nothing when early hints are
+# disabled or the build has no index.html/fed-mods.json entry assets.
+# Usage: preload_link_header <build_dir> <public_path>
+preload_link_header() {
+  local build_dir="$1" public_path="$2"
+
+  if [[ "$CADDY_EARLY_HINTS" != true || ! -d "$build_dir" ]]; then
+    return 0
+  fi
+
+  python3 "${SCRIPT_DIR}/early_hints.py" "$build_dir" --base "$public_path"
+}
+
+# caddy_app_route
+# Purpose: Print the matcher and handle block serving one app's build output
+# (root, under /srv) at its route path. The matcher names get the suffix so
+# several app routes can share a Caddyfile.
+# Usage: caddy_app_route <route_path> <root> <build_dir> [<matcher_suffix>]
+caddy_app_route() {
+  local route_path="$1" root="$2" build_dir="$3" suffix="${4:-}"
+  local app_link app_handler
+  app_link=$(preload_link_header "$build_dir" "$route_path")
+
+  app_handler="		uri strip_prefix ${route_path}
+		file_server * {
+			root /srv/${root}$(caddy_browse_directive "			")
+		}"
+
+  # Entry-point requests get a 103 Early Hints response carrying the preload
+  # Link header before the file is read, and the same header on the final
+  # response. route keeps the directives in written order so the entry
+  # matcher sees the path before strip_prefix rewrites it.
+  if [[ -n "$app_link" ]]; then
+    app_handler="		@app_entry${suffix} {
+			path ${route_path} ${route_path}/ ${route_path}/index.html ${route_path}/fed-mods.json
+		}
+		route {
+			header @app_entry${suffix} Link \"${app_link}\"
+			respond @app_entry${suffix} 103
+			uri strip_prefix ${route_path}
+			file_server * {
+				root /srv/${root}$(caddy_browse_directive "				")
+			}
+		}"
+  fi
+
+  echo "	@app_match${suffix} {
+		path ${route_path}*
+	}
+	handle @app_match${suffix} {
+${app_handler}
+	}"
+}
+
 generate_caddy_config() {
 
   local ROUTE_PATH=${ROUTE_PATH:-"/apps/${APP_NAME}"}
+  # The Caddyfile is generated before OUTPUT_DIR is pointed at APP_BUILD_DIR
+  local build_dir="${APP_BUILD_DIR:-$OUTPUT_DIR}"
+  local app_routes entry dir app env_link env_hints="" env_route=""
+
+  if [[ "$BUILD_WORKSPACES" == true ]]; then
+    # One route per workspace app. There is no env route: ENV_PUBLIC_PATH
+    # names a single app.
+    app_routes=""
+    for entry in "${WORKSPACE_APPS[@]}"; do
+      IFS=$'\t' read -r dir _ app <<< "$entry"
+      app_routes+="${app_routes:+
+
+}	# Handle the ${app} app route (${dir})
+$(caddy_app_route "/apps/${app}" "${OUTPUT_DIR}/${app}" "${build_dir}/${app}" "_${app//[^A-Za-z0-9_]/_}")"
+    done
+  else
+    app_routes="	# Handle main app route
+$(caddy_app_route "$ROUTE_PATH" "$OUTPUT_DIR" "$build_dir")"
+
+    # Left as a placeholder so Caddy resolves it from the runtime environment
+    # shellcheck disable=SC2016
+    env_link=$(preload_link_header "$build_dir" '{$ENV_PUBLIC_PATH}')
+    # The env route only gets the Link header: a top-level 103 respond would
+    # share the static_response metrics series with the root redirect.
+    if [[ -n "$env_link" ]]; then
+      env_hints="
+	@env_entry {
+		path {\$ENV_PUBLIC_PATH} {\$ENV_PUBLIC_PATH}/ {\$ENV_PUBLIC_PATH}/index.html {\$ENV_PUBLIC_PATH}/fed-mods.json
+		not path ${ROUTE_PATH}*
+	}
+	header @env_entry Link \"${env_link}\""
+    fi
+    env_route="
+
+	# Handle env based main route. It is served by top-level handlers rather
+	# than a handle block so its metrics stay separate from the app route.
+	# Top-level uri runs before handle, so the app route is excluded: an
+	# ENV_PUBLIC_PATH equal to or above it must not rewrite app requests.
+	@env_match {
+		path {\$ENV_PUBLIC_PATH}*
+		not path ${ROUTE_PATH}*
+	}
+	vars @env_match frontend_route env
+	uri @env_match strip_prefix {\$ENV_PUBLIC_PATH}${env_hints}
 
+	@env_route {
+		vars frontend_route env
+	}
+	file_server @env_route {
+		root /srv/${OUTPUT_DIR}$(caddy_browse_directive "		")
+	}"
+  fi
+
+  # Caddy labels HTTP metrics by server and top-level handler module only, so
+  # each route below compiles to a different top-level handler. That keeps
+  # latency and status-code series on :9000/metrics separate per route:
+  #   handler="subroute"         app routes (${ROUTE_PATH}, /apps/<app> per
+  #                              workspace app)
+  #   handler="file_server"      env route ({$ENV_PUBLIC_PATH})
+  #   handler="static_response"  root redirect
   echo "{
 	{\$CADDY_TLS_MODE}
 	auto_https disable_redirects
-	servers {
-		metrics
-	}
+$(caddy_server_options)
 }
 
 :9000 {
@@ -32,39 +252,35 @@ generate_caddy_config() {
 
 :8000 {
 	{\$CADDY_TLS_CERT}
-	log
+$(caddy_access_log)
 
-	# Handle main app route
-	@app_match {
-		path ${ROUTE_PATH}*
-	}
-	handle @app_match {
-		uri strip_prefix ${ROUTE_PATH}
-		file_server * {
-			root /srv/${OUTPUT_DIR}
-			browse
-		}
-	}
+${app_routes}${env_route}
 
-  # Handle env based main route
-  @env_match {
-      path {\$ENV_PUBLIC_PATH}*
-  }
-
-  handle @env_match {
-      uri strip_prefix {\$ENV_PUBLIC_PATH}
-      file_server * {
-          root /srv/${OUTPUT_DIR}
-          browse
-      }
-  }
-
-	handle / {
-		redir /apps/chrome/index.html permanent
-	}
+	# Redirect the bare root to chrome
+	redir / /apps/chrome/index.html permanent
 }"
 }
 
+# generate_asset_index
+# Purpose: Emit a static JSON listing of every file in the build output. The
+# production profile serves this file in place of Caddy's per-request
+# directory listings.
+# Usage: generate_asset_index <build_dir>
+generate_asset_index() {
+  local build_dir="$1"
+
+  find "$build_dir" -type f ! -name asset-index.json -printf '%P\t%s\n' \
+    | LC_ALL=C sort \
+    | jq -c -R -s '
+        split("\n")
+        | map(select(length > 0) | split("\t") | {path: .[0], size: (.[1] | tonumber)})
+        | {file_count: length, total_size: (map(.size) | add // 0), files: .}
+      '
+}
+
+# This runs inside the image build, after the context was sent, so it cannot
+# shrink it; a minimal .dockerignore is generated in the checkout with
+# build_context.py and committed (see docs/architecture-guidelines.md).
 generate_docker_ignore() {
   cat << EOF
 node_modules
@@ -72,26 +288,12 @@ node_modules
 EOF
 }
 
-# FIXME: How's this any different from the "build_app_info.sh script??"
-generate_app_info() {
-  if has_supported_lock_file; then
-    LINES=$(list_dependency_versions "@patternfly")
-    PATTERNFLY_DEPS=$(format_dependency_array "$LINES")
+validate_caddy_profile
 
-    LINES=$(list_dependency_versions "@redhat-cloud-services")
-    RH_CLOUD_SERVICES_DEPS=$(format_dependency_array "$LINES")
-  else
-    PATTERNFLY_DEPS="[]"
-    RH_CLOUD_SERVICES_DEPS="[]"
-  fi
-
-  echo -n "{
-  \"app_name\": \"$APP_NAME\",
-  \"src_hash\": \"$GIT_COMMIT\",
-  \"patternfly_dependencies\": $PATTERNFLY_DEPS,
-  \"rh_cloud_services_dependencies\": $RH_CLOUD_SERVICES_DEPS
-  }"
-}
+if [[ "$BUILD_WORKSPACES" == true ]]; then
+  workspace_listing=$(python3 "${SCRIPT_DIR}/workspace_packages.py" apps)
+  mapfile -t WORKSPACE_APPS <<< "$workspace_listing"
+fi
 
 # Now we check for a Caddyfile and if it's correct to generate
 if [[ -f Caddyfile ]]; then
@@ -111,14 +313,30 @@ if [[ -n "${APP_BUILD_DIR:-}" &&  -d $APP_BUILD_DIR ]]; then
   OUTPUT_DIR="$APP_BUILD_DIR"
 fi
 
-if [[ -f "${OUTPUT_DIR}/app.info.deps.json" ]]; then
-  echo "app.info.deps.json already exists, skipping generation"
-else
-  echo $NPM_INFO > "${OUTPUT_DIR}/app.info.deps.json"
-fi
+# finish_app_output
+# Purpose: Complete the metadata of one app's build output.
+# Usage: finish_app_output <build_dir>
+finish_app_output() {
+  local build_dir="$1"
+
+  # app.info.json is normally written by build_app_info.sh already; fill in
+  # whichever of the metadata files is still missing in the same single pass.
+  python3 "${SCRIPT_DIR}/app_info.py" --output-dir "$build_dir" --skip-existing
+
+  # Classify the asset names as content-hashed or mutable; writes
+  # app.info.fingerprints.json and fails the build in FINGERPRINT_MODE=fail
+  python3 "${SCRIPT_DIR}/fingerprint_lint.py" "$build_dir" --mode "$FINGERPRINT_MODE"
+
+  if [[ "$CADDY_PROFILE" == production ]]; then
+    generate_asset_index "$build_dir" > "${build_dir}/asset-index.json"
+  fi
+}
 
-if [[ -f "${OUTPUT_DIR}/app.info.json" ]]; then
-  echo "app.info.json already exists, skipping generation"
+if [[ "$BUILD_WORKSPACES" == true ]]; then
+  for entry in "${WORKSPACE_APPS[@]}"; do
+    IFS=$'\t' read -r dir _ app <<< "$entry"
+    APP_NAME="$app" PACKAGE_JSON_PATH="${dir}/package.json" finish_app_output "${OUTPUT_DIR}/${app}"
+  done
 else
-  generate_app_info > "${OUTPUT_DIR}/app.info.json"
+  finish_app_output "$OUTPUT_DIR"
 fi
@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: sourcemaps.py
+# Description: moves the sourcemaps out of the served build output. Every
+#              *.map file under the build directory is packed into a
+#              deterministic tarball next to a manifest that pairs each map
+#              with the bundle it belongs to (for the Sentry upload), then
+#              removed from the build output, so maps no longer ship in the
+#              image, its history levels or the CDN. In strip mode the
+#              sourceMappingURL comments of the paired bundles are removed
+#              too. The tarball and manifest can be pushed to an OCI
+#              registry with `oras`.
+#              The upload command sends the split maps and their bundles to
+#              Sentry in parallel, skipping files a ledger of content hashes
+#              records as already uploaded; the updated ledger is written
+#              next to app.info.json (app.info.sourcemaps.json).
+#
+# Usage:       ./sourcemaps.py split <build_dir> [--output <dir>] [--mode <mode>]
+#              ./sourcemaps.py upload <build_dir> [--output <dir>] [--ledger <path|url>]
+#
+# Parameters:  build_dir   Build output directory (e.g. dist)
+#              --output    Destination of sourcemaps.tar.gz and
+#                          sourcemaps.manifest.json (default: $SOURCEMAP_DIR,
+#                          then ./sourcemaps)
+#              --mode      keep, split or strip (default: $SOURCEMAP_MODE, then keep)
+#              --release   Release recorded in the manifest (default: $SENTRY_RELEASE)
+#              --oci       OCI repository to push the artifact to, e.g.
+#                          quay.io/org/app-sourcemaps (default: $SOURCEMAP_OCI;
+#                          needs `oras`)
+#
+# Modes:       keep   Leave the maps in the build output (no-op)
+#              split  Move the maps out; bundles keep their comments
+#              strip  Move the maps out and strip the comments pointing at them
+#
+# Upload:      --ledger       Ledger of the previous upload, as a file path or
+#                             http(s) URL (default: $SOURCEMAP_LEDGER); a local
+#                             path is updated in place
+#              --scope        release: skip files already uploaded to this
+#                             release; app: skip files already uploaded to any
+#                             release (only for maps Sentry resolves by debug
+#                             ID) (default: $SOURCEMAP_LEDGER_SCOPE, then release)
+#              --url-prefix   Artifact name prefix (default: $SOURCEMAP_URL_PREFIX,
+#                             then ~/apps/$APP_NAME/)
+#              --concurrency  Parallel uploads (default: $SOURCEMAP_UPLOAD_CONCURRENCY,
+#                             then 4)
+#
+# Environment: SENTRY_URL (default: https://sentry.io), SENTRY_ORG,
+#              SENTRY_PROJECT and SENTRY_AUTH_TOKEN for the upload
+# ----------------------------------------------------------------------------
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = ("keep", "split", "strip")
+DEFAULT_OUTPUT = "sourcemaps"
+ARCHIVE_NAME = "sourcemaps.tar.gz"
+MANIFEST_NAME = "sourcemaps.manifest.json"
+
+MAP_SUFFIX = ".map"
+# Bundles that can carry a sourceMappingURL comment
+SOURCE_SUFFIXES = (".js", ".mjs", ".cjs", ".css")
+
+# The comment is the last line of a bundle; only this much of the tail is read
+TAIL_BYTES = 4096
+
+LEDGER_FILE = "app.info.sourcemaps.json"
+LEDGER_SCOPES = ("release", "app")
+# Releases remembered per ledger entry
+MAX_LEDGER_RELEASES = 20
+DEFAULT_CONCURRENCY = 4
+DEFAULT_SENTRY_URL = "https://sentry.io"
+UPLOAD_RETRIES = 2
+# Seconds before the first retry; doubled for each further one
+RETRY_DELAY = 1.0
+UPLOAD_TIMEOUT = 60
+
+_COMMENT = re.compile(
+    rb"(^|\n)[ \t]*(?://[#@]|/\*[#@])[ \t]*sourceMappingURL=([^\s*]+)[ \t]*(?:\*/)?\s*$"
+)
+
+
+class _HashingReader:
+    """File wrapper that hashes what tarfile reads from it."""
+
+    def __init__(self, f):
+        self._f = f
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self.digest.update(data)
+        return data
+
+
+def find_comment(path):
+    """Find the trailing sourceMappingURL comment of a bundle.
+
+    Returns:
+        tuple: (offset of the comment line, URL) or None. Inline data: URLs
+            are not returned; the map is part of the bundle itself.
+    """
+    size = os.path.getsize(path)
+    start = max(0, size - TAIL_BYTES)
+    with open(path, "rb") as f:
+        f.seek(start)
+        tail = f.read()
+    match = _COMMENT.search(tail)
+    if not match:
+        return None
+    url = match.group(2).decode("utf-8", "replace")
+    if url.startswith("data:"):
+        return None
+    return start + match.start() + len(match.group(1)), url
+
+
+def _map_for_url(source_rel, url):
+    """Resolve a comment URL to a build-relative map path, None if external."""
+    if "://" in url or url.startswith("/"):
+        return None
+    url = url.split("?", 1)[0].split("#", 1)[0]
+    return os.path.normpath(os.path.join(os.path.dirname(source_rel), url))
+
+
+def _scan(build_dir):
+    maps, sources = [], []
+    for root, dirs, files in os.walk(build_dir):
+        dirs.sort()
+        for name in sorted(files):
+            rel_path = os.path.relpath(os.path.join(root, name), build_dir)
+            if name.endswith(MAP_SUFFIX):
+                maps.append(rel_path)
+            elif name.endswith(SOURCE_SUFFIXES):
+                sources.append(rel_path)
+    return maps, sources
+
+
+def _normalize(info):
+    info.mtime = 0
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    info.mode = 0o644
+    return info
+
+
+def _write_archive(build_dir, maps, archive_path):
+    """Pack maps into a reproducible tar.gz and return {map: sha256}."""
+    digests = {}
+    tmp_path = archive_path + ".tmp"
+    with open(tmp_path, "wb") as raw, \
+            gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz, \
+            tarfile.open(fileobj=gz, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for rel_path in maps:
+            path = os.path.join(build_dir, rel_path)
+            info = _normalize(tar.gettarinfo(path, arcname=rel_path))
+            with open(path, "rb") as f:
+                reader = _HashingReader(f)
+                tar.addfile(info, reader)
+            digests[rel_path] = reader.digest.hexdigest()
+    os.replace(tmp_path, archive_path)
+    return digests
+
+
+def _remove(build_dir, rel_path):
+    """Remove a file and the directories it leaves empty (not build_dir)."""
+    os.remove(os.path.join(build_dir, rel_path))
+    parent = os.path.dirname(rel_path)
+    while parent:
+        try:
+            os.rmdir(os.path.join(build_dir, parent))
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+
+
+def split_sourcemaps(build_dir, output_dir, strip_comments=False, release=None):
+    """Move every map out of build_dir into output_dir.
+
+    Each map is paired with the bundle whose sourceMappingURL comment points
+    at it, else with the file of the same name without ".map".
+
+    Returns:
+        dict: The manifest written to output_dir
+    """
+    maps, sources = _scan(build_dir)
+    map_set, source_set = set(maps), set(sources)
+    paired = {}
+    stripped = 0
+    for source in sources:
+        comment = find_comment(os.path.join(build_dir, source))
+        if comment is None:
+            continue
+        offset, url = comment
+        map_path = _map_for_url(source, url)
+        if map_path not in map_set:
+            continue
+        paired.setdefault(map_path, source)
+        if strip_comments:
+            os.truncate(os.path.join(build_dir, source), offset)
+            stripped += 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    digests = _write_archive(build_dir, maps, os.path.join(output_dir, ARCHIVE_NAME))
+
+    files = []
+    for map_path in maps:
+        source = paired.get(map_path)
+        if source is None and map_path[:-len(MAP_SUFFIX)] in source_set:
+            source = map_path[:-len(MAP_SUFFIX)]
+        files.append({
+            "map": map_path,
+            "source": source,
+            "size": os.path.getsize(os.path.join(build_dir, map_path)),
+            "sha256": digests[map_path],
+        })
+        _remove(build_dir, map_path)
+
+    manifest = {
+        "release": release or None,
+        "archive": ARCHIVE_NAME,
+        "comments_stripped": stripped,
+        "total_size": sum(entry["size"] for entry in files),
+        "files": files,
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return manifest
+
+
+def push_artifact(output_dir, repository, tag):
+    """Push the tarball and manifest to repository:tag with `oras`.
+
+    Returns:
+        bool: True when pushed
+    """
+    if not shutil.which("oras"):
+        print("Warning: oras is not installed; sourcemaps were not pushed", file=sys.stderr)
+        return False
+    result = subprocess.run(
+        ["oras", "push", f"{repository}:{tag}", ARCHIVE_NAME, MANIFEST_NAME],
+        cwd=output_dir,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(f"Warning: could not push sourcemaps: {result.stderr.strip()}", file=sys.stderr)
+        return False
+    return True
+
+
+def _artifact_tag(manifest):
+    if manifest["release"]:
+        return re.sub(r"[^A-Za-z0-9_.-]", "-", manifest["release"])[:128]
+    content = json.dumps(manifest["files"], sort_keys=True).encode()
+    return "sha256-" + hashlib.sha256(content).hexdigest()[:16]
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SentryClient:
+    """Minimal client for Sentry's release and release file endpoints."""
+
+    def __init__(self, url, org, project, token, timeout=UPLOAD_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.org = org
+        self.project = project
+        self.token = token
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls, env=None):
+        """Create the client from SENTRY_* variables; None when incomplete."""
+        env = os.environ if env is None else env
+        if not all(env.get(name) for name in ("SENTRY_ORG", "SENTRY_PROJECT", "SENTRY_AUTH_TOKEN")):
+            return None
+        return cls(env.get("SENTRY_URL") or DEFAULT_SENTRY_URL, env["SENTRY_ORG"],
+                   env["SENTRY_PROJECT"], env["SENTRY_AUTH_TOKEN"])
+
+    def _post(self, path, body, content_type):
+        request = urllib.request.Request(
+            f"{self.url}/api/0/{path}",
+            data=body,
+            method="POST",
+            headers={"Authorization": f"Bearer {self.token}", "Content-Type": content_type},
+        )
+        for attempt in range(UPLOAD_RETRIES + 1):
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return response.status
+            except urllib.error.HTTPError as e:
+                if e.code < 500 or attempt == UPLOAD_RETRIES:
+                    return e.code
+            except OSError:
+                if attempt == UPLOAD_RETRIES:
+                    raise
+            time.sleep(RETRY_DELAY * 2 ** attempt)
+
+    def ensure_release(self, release):
+        """Create the release; an existing release is fine."""
+        body = json.dumps({"version": release, "projects": [self.project]}).encode()
+        status = self._post(f"organizations/{self.org}/releases/", body, "application/json")
+        if status >= 300 and status != 208:
+            raise OSError(f"could not create Sentry release {release} (HTTP {status})")
+
+    def upload_file(self, release, name, path, header=None):
+        """Upload one release file; a file already in the release counts as uploaded.
+
+        Returns:
+            bool: True when the file is in the release
+        """
+        boundary = uuid.uuid4().hex
+        fields = [("name", name)] + ([("header", header)] if header else [])
+        body = b"".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n'
+            f"{value}\r\n".encode()
+            for key, value in fields
+        )
+        with open(path, "rb") as f:
+            content = f.read()
+        body += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+            f'filename="{os.path.basename(name)}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+        release_path = urllib.parse.quote(release, safe="")
+        status = self._post(
+            f"projects/{self.org}/{self.project}/releases/{release_path}/files/",
+            body,
+            f"multipart/form-data; boundary={boundary}",
+        )
+        # 409: a file of that name is already in the release
+        return status < 300 or status == 409
+
+
+def load_ledger(location):
+    """Load a ledger from a file path or http(s) URL; empty when unavailable."""
+    if not location:
+        return {}
+    try:
+        if location.startswith(("http://", "https://")):
+            with urllib.request.urlopen(location, timeout=10) as response:
+                return json.load(response)
+        with open(location, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not load sourcemap ledger {location}: {e}", file=sys.stderr)
+        return {}
+
+
+def upload_candidates(manifest, build_dir, url_prefix):
+    """List the maps and their bundles as release files.
+
+    Returns:
+        list: Dicts with the artifact name, sha256, whether it is a map, its
+            path (maps: inside the tarball, bundles: under build_dir) and the
+            Sourcemap header bundles carry (their comment may be stripped)
+    """
+    candidates = []
+    for entry in manifest["files"]:
+        candidates.append({
+            "name": url_prefix + entry["map"],
+            "sha256": entry["sha256"],
+            "map": True,
+            "path": entry["map"],
+            "header": None,
+        })
+        source = entry["source"] and os.path.join(build_dir, entry["source"])
+        if source and os.path.isfile(source):
+            map_url = os.path.relpath(entry["map"], os.path.dirname(entry["source"]))
+            candidates.append({
+                "name": url_prefix + entry["source"],
+                "sha256": _file_sha256(source),
+                "map": False,
+                "path": source,
+                "header": f"Sourcemap:{map_url}",
+            })
+    return candidates
+
+
+def is_uploaded(ledger, candidate, release, scope="release"):
+    """Whether the ledger records this exact content as uploaded (for release)."""
+    entry = (ledger.get("files") or {}).get(candidate["name"])
+    if not entry or entry.get("sha256") != candidate["sha256"]:
+        return False
+    return scope == "app" or release in entry.get("releases", [])
+
+
+def update_ledger(ledger, candidates, uploaded_names, release, client):
+    """Return the ledger for this build: every file now known to be uploaded.
+
+    Entries of files that are no longer built are dropped, so the ledger
+    stays the size of one build.
+    """
+    previous = ledger.get("files") or {}
+    files = {}
+    for candidate in candidates:
+        name = candidate["name"]
+        if name not in uploaded_names:
+            continue
+        entry = previous.get(name, {})
+        releases = entry.get("releases", []) if entry.get("sha256") == candidate["sha256"] else []
+        releases = [r for r in releases if r != release][-(MAX_LEDGER_RELEASES - 1):] + [release]
+        files[name] = {"sha256": candidate["sha256"], "releases": releases}
+    return {"org": client.org, "project": client.project, "files": files}
+
+
+def upload_sourcemaps(manifest_dir, build_dir, client, release, url_prefix, ledger,
+                      scope="release", concurrency=DEFAULT_CONCURRENCY):
+    """Upload the maps and bundles the ledger does not record, in parallel.
+
+    A ledger for another Sentry org or project is ignored.
+
+    Returns:
+        tuple: (uploaded names, skipped names, failed names, new ledger)
+    """
+    with open(os.path.join(manifest_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if (ledger.get("org"), ledger.get("project")) != (client.org, client.project):
+        ledger = {}
+
+    candidates = upload_candidates(manifest, build_dir, url_prefix)
+    pending = [c for c in candidates if not is_uploaded(ledger, c, release, scope)]
+    pending_names = {c["name"] for c in pending}
+    skipped = [c["name"] for c in candidates if c["name"] not in pending_names]
+    uploaded, failed = [], []
+
+    if pending:
+        client.ensure_release(release)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pending_maps = {c["path"] for c in pending if c["map"]}
+        with tarfile.open(os.path.join(manifest_dir, manifest["archive"])) as tar:
+            for member in tar:
+                if member.name in pending_maps:
+                    target = os.path.join(tmp_dir, member.name)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with tar.extractfile(member) as src, open(target, "wb") as out:
+                        shutil.copyfileobj(src, out, 1024 * 1024)
+
+        def _upload(candidate):
+            path = os.path.join(tmp_dir, candidate["path"]) if candidate["map"] \
+                else candidate["path"]
+            try:
+                return client.upload_file(release, candidate["name"], path, candidate["header"])
+            except OSError as e:
+                print(f"Warning: could not upload {candidate['name']}: {e}", file=sys.stderr)
+                return False
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for candidate, ok in zip(pending, pool.map(_upload, pending)):
+                (uploaded if ok else failed).append(candidate["name"])
+
+    new_ledger = update_ledger(ledger, candidates, set(uploaded) | set(skipped), release, client)
+    return uploaded, skipped, failed, new_ledger
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move sourcemaps out of the build output.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    split_parser = subparsers.add_parser("split")
+    split_parser.add_argument("build_dir")
+    split_parser.add_argument("--output", default=os.environ.get("SOURCEMAP_DIR") or DEFAULT_OUTPUT)
+    split_parser.add_argument("--mode", choices=MODES,
+                              default=os.environ.get("SOURCEMAP_MODE") or "keep")
+    split_parser.add_argument("--release", default=os.environ.get("SENTRY_RELEASE"))
+    split_parser.add_argument("--oci", default=os.environ.get("SOURCEMAP_OCI"))
+
+    upload_parser = subparsers.add_parser("upload")
+    upload_parser.add_argument("build_dir")
+    upload_parser.add_argument("--output",
+                               default=os.environ.get("SOURCEMAP_DIR") or DEFAULT_OUTPUT)
+    upload_parser.add_argument("--release", default=os.environ.get("SENTRY_RELEASE"))
+    upload_parser.add_argument("--ledger", default=os.environ.get("SOURCEMAP_LEDGER"))
+    upload_parser.add_argument("--scope", choices=LEDGER_SCOPES,
+                               default=os.environ.get("SOURCEMAP_LEDGER_SCOPE") or "release")
+    upload_parser.add_argument("--url-prefix", default=os.environ.get("SOURCEMAP_URL_PREFIX"))
+    upload_parser.add_argument(
+        "--concurrency", type=int,
+        default=int(os.environ.get("SOURCEMAP_UPLOAD_CONCURRENCY") or DEFAULT_CONCURRENCY),
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "upload":
+        return _upload_command(args)
+
+    if args.mode == "keep":
+        print("Sourcemaps: kept in the build output (SOURCEMAP_MODE=keep)")
+        return 0
+
+    if not os.path.isdir(args.build_dir):
+        print(f"Error: build directory {args.build_dir} does not exist", file=sys.stderr)
+        return 1
+
+    manifest = split_sourcemaps(args.build_dir, args.output,
+                                strip_comments=args.mode == "strip", release=args.release)
+    print(f"Sourcemaps: moved {len(manifest['files'])} maps ({_mb(manifest['total_size'])}) "
+          f"to {os.path.join(args.output, ARCHIVE_NAME)}, "
+          f"stripped {manifest['comments_stripped']} sourceMappingURL comments")
+
+    if args.oci:
+        tag = _artifact_tag(manifest)
+        if push_artifact(args.output, args.oci, tag):
+            print(f"Sourcemaps: pushed {args.oci}:{tag}")
+    return 0
+
+
+def _upload_command(args):
+    client = SentryClient.from_env()
+    if client is None:
+        print("Error: sourcemap upload needs SENTRY_ORG, SENTRY_PROJECT and SENTRY_AUTH_TOKEN",
+              file=sys.stderr)
+        return 1
+    if not os.path.exists(os.path.join(args.output, MANIFEST_NAME)):
+        print(f"Error: no {MANIFEST_NAME} in {args.output}; run split with "
+              "SOURCEMAP_MODE=split or strip first", file=sys.stderr)
+        return 1
+    with open(os.path.join(args.output, MANIFEST_NAME), encoding="utf-8") as f:
+        release = args.release or json.load(f)["release"]
+    if not release:
+        print("Error: sourcemap upload needs a release (--release or SENTRY_RELEASE)",
+              file=sys.stderr)
+        return 1
+    url_prefix = args.url_prefix
+    if url_prefix is None:
+        app_name = os.environ.get("APP_NAME")
+        url_prefix = f"~/apps/{app_name}/" if app_name else "~/"
+
+    start = time.monotonic()
+    try:
+        uploaded, skipped, failed, ledger = upload_sourcemaps(
+            args.output, args.build_dir, client, release, url_prefix, load_ledger(args.ledger),
+            args.scope, args.concurrency,
+        )
+    except OSError as e:
+        print(f"Error: sourcemap upload failed: {e}", file=sys.stderr)
+        return 1
+    _write_json(os.path.join(args.build_dir, LEDGER_FILE), ledger)
+    if args.ledger and not args.ledger.startswith(("http://", "https://")):
+        _write_json(args.ledger, ledger)
+
+    print(f"Sourcemaps: uploaded {len(uploaded)}, skipped {len(skipped)} unchanged, "
+          f"failed {len(failed)} to release {release} "
+          f"({time.monotonic() - start:.1f}s, concurrency {args.concurrency})")
+    for name in failed:
+        print(f"  failed: {name}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
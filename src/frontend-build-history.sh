@@ -36,6 +36,16 @@ DEBUG_MODE=false
 PUSH_SINGLE_IMAGES=false
 # Our default mode is to get images tagged -single
 GET_SINGLE_IMAGES=true
+# How many previous builds are aggregated into the output, and how many
+# commits we search for their images
+HISTORY_LEVELS=${HISTORY_LEVELS:-6}
+HISTORY_MAX_ITERATIONS=${HISTORY_MAX_ITERATIONS:-12}
+for setting in HISTORY_LEVELS HISTORY_MAX_ITERATIONS; do
+  if [[ ! "${!setting}" =~ ^[1-9][0-9]*$ ]]; then
+    echo "Exiting; ${setting} must be a positive number, got '${!setting}'" >&2
+    exit 1
+  fi
+done
 
 QUAY_TOKEN=""
 QUAY_USER=""
@@ -114,7 +124,9 @@ function getArgs() {
 
 function remakeHistoryDirectories() {
   rm -rf .history
-  mkdir -p .history/{1..6}
+  for ((level = 1; level <= HISTORY_LEVELS; level++)); do
+    mkdir -p ".history/$level"
+  done
 }
 
 function getGitHistory() {
@@ -123,18 +135,18 @@ function getGitHistory() {
 }
 
 function getBuildImages() {
-  # We count the number of images found to make sure we don't go over 6
+  # We count the number of images found to make sure we don't go over HISTORY_LEVELS
   local HISTORY_FOUND_IMAGES=0
-  # We track the history found backwards, from 6 down, because we need to build
-  # history cumulative from the oldest to the newest
-  local HISTORY_DEPTH=6
+  # We track the history found backwards, from HISTORY_LEVELS down, because we
+  # need to build history cumulative from the oldest to the newest
+  local HISTORY_DEPTH=$HISTORY_LEVELS
   local SINGLE_IMAGE=""
   local ITERATIONS=0
   local IMAGE_TEXT="Single-build"
   # Get the single build images
   for REF in $(cat .history/git_history); do
-    if [ $ITERATIONS -eq 12 ]; then
-      printError "Exiting image search after 12 iterations." ""
+    if [ "$ITERATIONS" -eq "$HISTORY_MAX_ITERATIONS" ]; then
+      printError "Exiting image search after $HISTORY_MAX_ITERATIONS iterations." ""
       break
     fi
     ITERATIONS=$((ITERATIONS+1))
@@ -194,9 +206,9 @@ function getBuildImages() {
     docker stop $HISTORY_CONTAINER_NAME >/dev/null 2>&1
     # delete the container
     docker rm -f $HISTORY_CONTAINER_NAME >/dev/null 2>&1
-    # if we've found 6 images we're done
-    if [ $HISTORY_FOUND_IMAGES -eq 6 ]; then
-      printSuccess "Found 6 images, stopping history search" $SINGLE_IMAGE
+    # if we've found HISTORY_LEVELS images we're done
+    if [ "$HISTORY_FOUND_IMAGES" -eq "$HISTORY_LEVELS" ]; then
+      printSuccess "Found $HISTORY_LEVELS images, stopping history search" "$SINGLE_IMAGE"
       break
     fi
     #Decrement history depth
@@ -210,7 +222,7 @@ directory_exists_and_not_empty() {
 
 copyHistoryIntoOutputDir() {
   # Copy the files from the history level directories into the build directory
-  for i in {6..1}; do
+  for ((i = HISTORY_LEVELS; i >= 1; i--)); do
     if directory_exists_and_not_empty ".history/$i"; then
       if ! cp -rf .history/$i/* $OUTPUT_DIR; then
         printError "Failed to copy files from history level: " $i
@@ -277,4 +289,8 @@ function main() {
   deleteBuildContainer
 }
 
-main $@
\ No newline at end of file
+# Only run when executed (or piped into bash), so the aggregation functions
+# can be sourced and benchmarked without quay or docker
+if [[ -z "${BASH_SOURCE[0]}" || "${BASH_SOURCE[0]}" == "$0" ]]; then
+  main "$@"
+fi
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+HTTP load generator and result bookkeeping for the Caddy benchmark suite.
+
+The harness drives a running server with a weighted mix of requests from a
+pool of worker threads, summarizes throughput and latency percentiles, and
+compares a run against a stored baseline so Caddyfile changes can be gated
+on performance.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+# Default regression tolerance: a run may be 20% slower than its baseline
+DEFAULT_TOLERANCE = 0.20
+
+
+def build_request_plan(mix, total_requests, seed=0):
+    """Expand a weighted request mix into a deterministic list of requests.
+
+    Args:
+        mix: List of dicts with "name", "path", "weight" and "expected_status"
+        total_requests: Number of requests to generate
+        seed: Random seed so repeated runs replay the same sequence
+
+    Returns:
+        list: Entries of the mix, one per request to send
+    """
+    rng = random.Random(seed)
+    weights = [entry["weight"] for entry in mix]
+    return rng.choices(mix, weights=weights, k=total_requests)
+
+
+def percentile(sorted_values, pct):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples, elapsed):
+    """Summarize raw request samples.
+
+    Args:
+        samples: List of (route_name, latency_seconds, bytes, ok) tuples
+        elapsed: Wall-clock duration of the run in seconds
+
+    Returns:
+        dict: RPS, latency percentiles (ms), bytes transferred and per-route stats
+    """
+    def _stats(subset):
+        latencies = sorted(sample[1] * 1000.0 for sample in subset)
+        return {
+            "requests": len(subset),
+            "errors": sum(1 for sample in subset if not sample[3]),
+            "bytes_transferred": sum(sample[2] for sample in subset),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "p99": round(percentile(latencies, 99), 3),
+            },
+        }
+
+    summary = _stats(samples)
+    summary["elapsed_s"] = round(elapsed, 3)
+    summary["rps"] = round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0
+
+    routes = {}
+    for sample in samples:
+        routes.setdefault(sample[0], []).append(sample)
+    summary["routes"] = {name: _stats(subset) for name, subset in sorted(routes.items())}
+    return summary
+
+
+def run_load(base_url, mix, total_requests=2000, concurrency=16, seed=0, timeout=10):
+    """Send a weighted request mix against base_url with bounded concurrency.
+
+    Each worker thread keeps its own keep-alive session, matching how browsers
+    reuse connections against the frontend pods.
+
+    Args:
+        base_url: Server origin, e.g. "http://localhost:8082"
+        mix: Weighted request mix (see build_request_plan)
+        total_requests: Number of requests to send
+        concurrency: Number of concurrent workers
+        seed: Random seed for the request plan
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        dict: Summary produced by summarize()
+    """
+    plan = build_request_plan(mix, total_requests, seed)
+    local = threading.local()
+
+    def _send(entry):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = session.get(
+                f"{base_url}{entry['path']}",
+                timeout=timeout,
+                allow_redirects=False
+            )
+            body_size = len(response.content)
+            ok = response.status_code == entry["expected_status"]
+        except requests.exceptions.RequestException:
+            body_size = 0
+            ok = False
+        return entry["name"], time.perf_counter() - start, body_size, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(_send, plan))
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(samples, elapsed)
+    summary["concurrency"] = concurrency
+    return summary
+
+
+def compare_to_baseline(result, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compare a run against its baseline.
+
+    Args:
+        result: Summary of the current run
+        baseline: Summary of the baseline run
+        tolerance: Allowed relative regression (0.2 = 20%)
+
+    Returns:
+        list: Human-readable regression descriptions (empty when within tolerance)
+    """
+    regressions = []
+
+    if result["rps"] < baseline["rps"] * (1 - tolerance):
+        regressions.append(
+            f"rps dropped from {baseline['rps']} to {result['rps']}"
+        )
+
+    for key in ("p50", "p95", "p99"):
+        current = result["latency_ms"][key]
+        previous = baseline["latency_ms"][key]
+        if previous > 0 and current > previous * (1 + tolerance):
+            regressions.append(
+                f"{key} latency rose from {previous}ms to {current}ms"
+            )
+
+    if result["errors"] > baseline.get("errors", 0):
+        regressions.append(
+            f"errors rose from {baseline.get('errors', 0)} to {result['errors']}"
+        )
+
+    return regressions
+
+
+def load_json(path):
+    """Load a JSON file, returning an empty dict when it does not exist."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    """Write data as pretty-printed JSON, creating parent directories."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def missing_baseline(path, key, update_target):
+    """Stop a run whose baseline file has no entry for key, loudly.
+
+    Without a baseline the regression gate cannot run, so under CI (CI set,
+    as GitHub Actions does) the test fails; locally it is skipped with the
+    command that records the baseline.
+    """
+    message = (
+        f"No baseline for {key} in {path}; results were recorded but not gated. "
+        f"Run `make {update_target}` and commit the baseline file."
+    )
+    if os.environ.get("CI"):
+        pytest.fail(message)
+    pytest.skip(message)
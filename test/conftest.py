@@ -2,14 +2,91 @@
 Pytest configuration for Dockerfile tests.
 """
 
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+
 import pytest
 
+from container_harness import unique_name
+from image_inspect import ImageFilesystem
+from script_harness import ScriptWorkspace
+from synthetic_app import generate_app, generate_dist
+
+TEST_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(TEST_SCRIPT_DIR)
+FIXTURES_DIR = os.path.join(TEST_SCRIPT_DIR, "test-fixtures")
+
+# Make the build helper modules at the repository root importable
+sys.path.insert(0, REPO_ROOT)
+
+# Build scripts copied next to the Dockerfile into a fixture's build-tools/
+BUILD_SCRIPTS = (
+    "universal_build.sh",
+    "build_app_info.sh",
+    "server_config_gen.sh",
+    "app_info.py",
+    "early_hints.py",
+    "asset_inventory.py",
+    "build_trace.py",
+    "build_cache.py",
+    "normalize_dist.py",
+    "sourcemaps.py",
+    "asset_integrity.py",
+    "fingerprint_lint.py",
+    "build_metadata.py",
+    "build_context.py",
+    "workspace_packages.py",
+    "lockfile_deps.py",
+    "parse-secrets.sh",
+)
+
+# Top-level fixture entries that are not build inputs (or are hashed from the repo)
+CONTEXT_IGNORED = {".git", "build-tools", "dist", "node_modules"}
+
+IMAGE_REPOSITORY = "localhost/test-frontend-builder-cache"
+IMAGE_KEY_LABEL = "test.frontend-builder.build-key"
+BUILD_TIMEOUT = 300
+
+# Podman-free unit test classes for the Python build helpers
+BUILDTOOLS_CLASSES = (
+    "TestLockfileDeps",
+    "TestAppInfo",
+    "TestAssetInventory",
+    "TestBuildTrace",
+    "TestBuildCache",
+    "TestNormalizeDist",
+    "TestBuildScripts",
+    "TestSyntheticApp",
+    "TestImageSizeReport",
+    "TestHistoryAggregation",
+    "TestSourcemaps",
+    "TestSourcemapUpload",
+    "TestAssetIntegrity",
+    "TestFingerprintLint",
+    "TestBuildContext",
+    "TestWorkspacePackages",
+)
+
+# Test classes that build images and run containers with podman
+PODMAN_CLASSES = (
+    "TestDockerfileCaddy",
+    "TestDockerfileEnvVars",
+    "TestDockerfileFilesystem",
+    "TestDockerfileHermetic",
+    "TestDockerfileBenchmark",
+    "TestDockerfileImageSize",
+)
+
 
 def pytest_configure(config):
     """Configure pytest with custom markers."""
     config.addinivalue_line(
         "markers",
-        "slow: marks tests as slow (deselect with '-m \"not slow\"')"
+        "slow: marks podman integration tests (deselect with '-m \"not slow\"')"
     )
     config.addinivalue_line(
         "markers",
@@ -31,11 +108,26 @@ def pytest_configure(config):
         "markers",
         "repofiles: marks tests related to repository-level config files"
     )
+    config.addinivalue_line(
+        "markers",
+        "benchmark: marks HTTP load benchmarks (deselect with '-m \"not benchmark\"')"
+    )
+    config.addinivalue_line(
+        "markers",
+        "imagesize: marks image size tracking against the stored size baselines"
+    )
+    config.addinivalue_line(
+        "markers",
+        "buildtools: marks podman-free tests of the build scripts and Python helpers"
+    )
 
 
 def pytest_collection_modifyitems(config, items):
     """Add markers to tests automatically."""
     for item in items:
+        # Everything that needs podman is integration-tier
+        if any(name in item.nodeid for name in PODMAN_CLASSES):
+            item.add_marker(pytest.mark.slow)
         # Mark all tests in TestDockerfileCaddy as caddy tests
         if "TestDockerfileCaddy" in item.nodeid:
             item.add_marker(pytest.mark.caddy)
@@ -51,3 +143,290 @@ def pytest_collection_modifyitems(config, items):
         # Mark all tests in TestRepoFiles as repofiles tests
         elif "TestRepoFiles" in item.nodeid:
             item.add_marker(pytest.mark.repofiles)
+        # Mark all tests in TestDockerfileBenchmark as benchmark tests
+        elif "TestDockerfileBenchmark" in item.nodeid:
+            item.add_marker(pytest.mark.benchmark)
+        # The offline history aggregation benchmark needs no podman
+        elif "TestHistoryBenchmark" in item.nodeid:
+            item.add_marker(pytest.mark.benchmark)
+        # Mark all tests in TestDockerfileImageSize as imagesize tests
+        elif "TestDockerfileImageSize" in item.nodeid:
+            item.add_marker(pytest.mark.imagesize)
+        # Mark the build script and Python helper unit tests as buildtools tests
+        elif any(name in item.nodeid for name in BUILDTOOLS_CLASSES):
+            item.add_marker(pytest.mark.buildtools)
+
+
+class ImageBuilder:
+    """Builds each distinct test image once per session.
+
+    An image is tagged with a hash of its build inputs: the Dockerfile, the
+    build scripts, the fixture files and the build args. Suites asking for the
+    same combination share one image. With TEST_IMAGE_REUSE=1 the images are
+    kept after the session, and a later run reuses an image whose key has not
+    changed instead of building it again.
+
+    Builds run from a copy of the fixture in work_dir (per pytest-xdist
+    worker), so workers never share a mutable build context, and without
+    TEST_IMAGE_REUSE the tags carry the worker id so one worker's cleanup
+    cannot remove an image another worker is testing.
+    """
+
+    def __init__(self, work_dir, reuse=False):
+        self.work_dir = work_dir
+        self.reuse = reuse
+        self.images = {}
+        self.prepared = set()
+
+    def prepare(self, fixture="fake-app", dockerfile="Dockerfile", synthetic=None):
+        """Copy the fixture to the work dir, with the Dockerfile and build scripts in build-tools/.
+
+        The copy is also made a git repository, which the build scripts need.
+
+        Args:
+            fixture: Fixture directory under test-fixtures/
+            dockerfile: Dockerfile at the repository root to build
+            synthetic: Optional synthetic_app.generate_app options; the copy
+                then builds a synthetic large app (its own copy per options)
+
+        Returns:
+            str: Path of the fixture copy (the build context)
+        """
+        name = fixture
+        if synthetic:
+            options = json.dumps(synthetic, sort_keys=True).encode()
+            name = f"{fixture}-synthetic-{hashlib.sha256(options).hexdigest()[:12]}"
+        test_dir = os.path.join(self.work_dir, name)
+        if not os.path.isdir(test_dir):
+            shutil.copytree(
+                os.path.join(FIXTURES_DIR, fixture),
+                test_dir,
+                ignore=shutil.ignore_patterns(*CONTEXT_IGNORED),
+            )
+            if synthetic:
+                generate_app(test_dir, **synthetic)
+        build_tools_dest = os.path.join(test_dir, "build-tools")
+        os.makedirs(build_tools_dest, exist_ok=True)
+        for name in (dockerfile, *BUILD_SCRIPTS):
+            shutil.copy(os.path.join(REPO_ROOT, name), build_tools_dest)
+
+        if not os.path.exists(os.path.join(test_dir, ".git")):
+            for git_cmd in (
+                ["init"],
+                ["config", "user.email", "test@test.com"],
+                ["config", "user.name", "Test User"],
+                ["add", "."],
+                ["commit", "-m", "Initial commit"],
+            ):
+                subprocess.run(["git", *git_cmd], cwd=test_dir, check=True)
+
+        self.prepared.add(test_dir)
+        return test_dir
+
+    def key(self, test_dir, dockerfile="Dockerfile", build_args=None, extra_args=()):
+        """Hash the build inputs of an image."""
+        digest = hashlib.sha256()
+
+        def add_file(rel_path, path):
+            digest.update(rel_path.encode() + b"\0")
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+
+        for name in (dockerfile, *BUILD_SCRIPTS):
+            add_file(f"build-tools/{name}", os.path.join(REPO_ROOT, name))
+
+        for root, dirs, files in os.walk(test_dir):
+            if root == test_dir:
+                dirs[:] = [name for name in dirs if name not in CONTEXT_IGNORED]
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                add_file(os.path.relpath(path, test_dir), path)
+
+        digest.update(json.dumps(
+            {"build_args": build_args or {}, "extra_args": list(extra_args)},
+            sort_keys=True,
+        ).encode())
+        return digest.hexdigest()
+
+    def build(self, fixture="fake-app", dockerfile="Dockerfile", build_args=None, extra_args=(),
+              synthetic=None):
+        """Return an image for these inputs, building it on first use.
+
+        Args:
+            fixture: Fixture directory under test-fixtures/
+            dockerfile: Dockerfile at the repository root to build
+            build_args: Optional dict of build arguments
+            extra_args: Extra podman build flags (e.g. --network=none)
+            synthetic: Optional synthetic_app.generate_app options (see prepare)
+
+        Returns:
+            str: Name of the built image
+        """
+        test_dir = self.prepare(fixture, dockerfile, synthetic)
+        key = self.key(test_dir, dockerfile, build_args, extra_args)
+        if key in self.images:
+            return self.images[key]
+
+        image_name = f"{IMAGE_REPOSITORY}:{key[:16]}"
+        if not self.reuse:
+            image_name = unique_name(image_name)
+        if self.reuse and image_exists(image_name):
+            print(f"\n✓ Reusing image {image_name} for {fixture} {build_args or {}}")
+        else:
+            print(f"\n=== Building image {image_name} for {fixture} {build_args or {}} ===")
+            self.podman_build(
+                image_name,
+                fixture,
+                dockerfile,
+                build_args,
+                [*extra_args, "--label", f"{IMAGE_KEY_LABEL}={key}"],
+                synthetic=synthetic,
+            )
+        self.images[key] = image_name
+        return image_name
+
+    def podman_build(self, image_name, fixture="fake-app", dockerfile="Dockerfile",
+                     build_args=None, extra_args=(), check=True, synthetic=None):
+        """Run podman build for an image the caller owns (and removes).
+
+        For builds that must not be shared: failing builds, uncached
+        rebuilds or builds of a modified fixture.
+
+        Returns:
+            subprocess.CompletedProcess: The build result
+        """
+        test_dir = self.prepare(fixture, dockerfile, synthetic)
+        build_cmd = ["podman", "build", *extra_args, "-t", image_name,
+                     "-f", f"build-tools/{dockerfile}"]
+        for name, value in (build_args or {}).items():
+            build_cmd.extend(["--build-arg", f"{name}={value}"])
+        build_cmd.append(".")
+
+        try:
+            result = subprocess.run(
+                build_cmd,
+                cwd=test_dir,
+                capture_output=True,
+                text=True,
+                timeout=BUILD_TIMEOUT
+            )
+        except subprocess.TimeoutExpired as e:
+            # Since text=True, stdout/stderr are already strings, not bytes
+            stdout = e.stdout if e.stdout else ""
+            stderr = e.stderr if e.stderr else ""
+            pytest.fail(
+                f"Docker build timed out after {BUILD_TIMEOUT} seconds.\n"
+                f"STDOUT: {stdout}\nSTDERR: {stderr}"
+            )
+
+        if check and result.returncode != 0:
+            print("STDOUT:", result.stdout)
+            print("STDERR:", result.stderr)
+            pytest.fail(f"Failed to build Docker image: {result.stderr}")
+
+        return result
+
+    def cleanup(self):
+        """Remove the session's images (unless reused) and the fixture copies."""
+        if not self.reuse:
+            for image_name in self.images.values():
+                subprocess.run(["podman", "rmi", "-f", image_name], capture_output=True)
+        for test_dir in self.prepared:
+            shutil.rmtree(test_dir, ignore_errors=True)
+
+
+def image_exists(image_name):
+    """Check whether podman has an image with this name."""
+    result = subprocess.run(["podman", "image", "exists", image_name], capture_output=True)
+    return result.returncode == 0
+
+
+@pytest.fixture(scope="session")
+def image_builder(tmp_path_factory):
+    """Session-wide (per xdist worker) ImageBuilder shared by the Dockerfile test suites."""
+    builder = ImageBuilder(
+        str(tmp_path_factory.mktemp("fixtures")),
+        reuse=os.environ.get("TEST_IMAGE_REUSE") == "1",
+    )
+    yield builder
+    builder.cleanup()
+
+
+@pytest.fixture
+def script_workspace(tmp_path):
+    """Return a factory for podman-free ScriptWorkspaces of a test fixture.
+
+    Usage: ``workspace = script_workspace("fake-pnpm-app")``
+    """
+    def create(fixture="fake-app"):
+        return ScriptWorkspace(
+            str(tmp_path / fixture),
+            os.path.join(FIXTURES_DIR, fixture),
+            REPO_ROOT,
+            BUILD_SCRIPTS,
+        )
+
+    return create
+
+
+@pytest.fixture
+def make_build_dir(tmp_path):
+    """Return a factory that writes files into a temp build output.
+
+    Usage: ``dist = make_build_dir({"index.html": "<html></html>", "js/app.js": b"..."})``;
+    values are text or bytes. The tree is ``tmp_path / "dist"`` unless a
+    root is given, and calling the factory again adds files to it. With mode,
+    every written file is chmod-ed to it.
+    """
+    def make(files, root=None, mode=None):
+        root = root or tmp_path / "dist"
+        root.mkdir(parents=True, exist_ok=True)
+        for rel_path, content in files.items():
+            path = root / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content.encode() if isinstance(content, str) else content)
+            if mode is not None:
+                path.chmod(mode)
+        return root
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def synthetic_dist(tmp_path_factory):
+    """Return a synthetic build output for generate_dist options, generated once per session.
+
+    Usage: ``summary = synthetic_dist(file_count=20000, seed=1)``; the tree
+    is at ``summary["path"]``. Benchmarks asking for the same options share
+    one tree.
+    """
+    trees = {}
+
+    def get(**options):
+        key = json.dumps(options, sort_keys=True)
+        if key not in trees:
+            dest = str(tmp_path_factory.mktemp("synthetic-dist"))
+            trees[key] = {"path": dest, **generate_dist(dest, **options)}
+        return trees[key]
+
+    return get
+
+
+@pytest.fixture(scope="session")
+def image_fs(tmp_path_factory):
+    """Return the exported, indexed filesystem of an image, exported once per image.
+
+    Usage: ``image_fs(image_name).read("/srv/dist/app.info.json")``
+    """
+    exported = {}
+
+    def get(image_name):
+        if image_name not in exported:
+            dest_dir = str(tmp_path_factory.mktemp("image-fs"))
+            exported[image_name] = ImageFilesystem.export(image_name, dest_dir)
+        return exported[image_name]
+
+    yield get
+    for filesystem in exported.values():
+        filesystem.close()
@@ -0,0 +1,141 @@
+"""
+Container lifecycle helpers for the Dockerfile test suites.
+
+Suites start one container per class (or per parameter set) and share it
+across their tests. Readiness is detected by polling the container's HTTP
+endpoints with a short backoff until a deadline, and a container that exits
+during startup fails the test immediately with its logs.
+
+Container names and image tags go through unique_name and host ports are
+allocated per container, so pytest-xdist workers never collide.
+"""
+
+import os
+import socket
+import subprocess
+import time
+
+import pytest
+import requests
+
+# Seconds a container may take to answer on all of its readiness URLs
+READY_TIMEOUT = 30
+
+# Any of these means Caddy is serving (the root route redirects)
+READY_STATUSES = (200, 301, 302, 307, 308)
+
+# Attempts at binding freshly allocated host ports before giving up
+PORT_ATTEMPTS = 3
+
+
+def worker_id():
+    """Return the pytest-xdist worker id (gw0, gw1, ...), or "" without xdist."""
+    return os.environ.get("PYTEST_XDIST_WORKER", "")
+
+
+def unique_name(name):
+    """Suffix a container name or image tag with the xdist worker id."""
+    worker = worker_id()
+    return f"{name}-{worker}" if worker else name
+
+
+def free_port():
+    """Return a TCP port on localhost that is free right now."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def remove_container(name):
+    """Stop and remove a container if it exists."""
+    subprocess.run(["podman", "rm", "-f", name], capture_output=True)
+
+
+def container_logs(name, tail=50):
+    result = subprocess.run(
+        ["podman", "logs", "--tail", str(tail), name],
+        capture_output=True,
+        text=True
+    )
+    return result.stdout + result.stderr
+
+
+def _is_running(name):
+    result = subprocess.run(
+        ["podman", "inspect", "--format", "{{.State.Running}}", name],
+        capture_output=True,
+        text=True
+    )
+    return result.stdout.strip() == "true"
+
+
+def wait_until_ready(name, urls, timeout=READY_TIMEOUT):
+    """Poll every URL until it answers with a READY_STATUSES code.
+
+    Fails the test when the deadline passes or the container stops.
+    """
+    deadline = time.monotonic() + timeout
+    pending = list(urls)
+    delay = 0.05
+    while pending:
+        try:
+            response = requests.get(pending[0], timeout=1, allow_redirects=False)
+            if response.status_code in READY_STATUSES:
+                pending.pop(0)
+                continue
+        except requests.exceptions.RequestException:
+            pass
+
+        if not _is_running(name):
+            pytest.fail(f"Container {name} exited during startup:\n{container_logs(name)}")
+        if time.monotonic() >= deadline:
+            pytest.fail(
+                f"Container {name} not ready within {timeout}s ({pending[0]}):\n"
+                f"{container_logs(name)}"
+            )
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def start_container(image_name, name, ports, env_vars=None, ready_paths=None,
+                    timeout=READY_TIMEOUT):
+    """Start a detached container on free host ports and wait until it is ready.
+
+    A host port can be taken by another process between allocation and
+    podman run, so the start is retried on fresh ports.
+
+    Args:
+        image_name: Image to run
+        name: Container name; an existing container of that name is replaced
+        ports: Container ports to publish, each on a free host port
+        env_vars: Optional dict of runtime environment variables
+        ready_paths: Dict of container port -> path that must answer before
+            the container counts as ready (default: "/" on the first port)
+        timeout: Readiness deadline in seconds
+
+    Returns:
+        dict: Container port -> host port
+    """
+    for attempt in range(PORT_ATTEMPTS):
+        remove_container(name)
+        host_ports = {container_port: free_port() for container_port in ports}
+
+        run_cmd = ["podman", "run", "-d", "--name", name]
+        for container_port, host_port in host_ports.items():
+            run_cmd.extend(["-p", f"{host_port}:{container_port}"])
+        for key, value in (env_vars or {}).items():
+            run_cmd.extend(["-e", f"{key}={value}"])
+        run_cmd.append(image_name)
+
+        result = subprocess.run(run_cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            break
+        if "address already in use" not in result.stderr or attempt == PORT_ATTEMPTS - 1:
+            pytest.fail(f"Failed to start container: {result.stderr}")
+
+    ready_urls = [
+        f"http://localhost:{host_ports[port]}{path}"
+        for port, path in (ready_paths or {ports[0]: "/"}).items()
+    ]
+    wait_until_ready(name, ready_urls, timeout)
+    return host_ports
@@ -0,0 +1,135 @@
+"""
+Local stand-in for the Sentry endpoints the sourcemap upload talks to.
+
+FakeSentry serves the release creation and release file upload endpoints of
+the Sentry API on 127.0.0.1, keeps the uploaded files per release, and
+records every request and the highest number of uploads in flight at once,
+so tests can check what was sent and that the concurrency stayed bounded.
+"""
+
+import email.parser
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_RELEASES = re.compile(r"^/api/0/organizations/(?P<org>[^/]+)/releases/$")
+_FILES = re.compile(
+    r"^/api/0/projects/(?P<org>[^/]+)/(?P<project>[^/]+)/releases/(?P<release>[^/]+)/files/$"
+)
+
+
+def parse_multipart(content_type, body):
+    """Return the fields of a multipart/form-data body as {name: bytes}."""
+    message = email.parser.BytesParser().parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+        for part in message.get_payload()
+    }
+
+
+class FakeSentry:
+    """Threaded fake Sentry server.
+
+    Attributes:
+        url: Base URL to use as SENTRY_URL
+        requests: (method, path) of every request, in arrival order
+        releases: Release -> {file name: {"content", "header"}}
+        max_in_flight: Highest number of concurrent file uploads seen
+        fail_names: File names answered with HTTP 500
+        upload_delay: Seconds each upload takes, to make overlap observable
+    """
+
+    def __init__(self, token="test-token", upload_delay=0.0):
+        self.token = token
+        self.upload_delay = upload_delay
+        self.requests = []
+        self.releases = {}
+        self.fail_names = set()
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def uploads(self, release=None):
+        """Names of the files uploaded, for one release or all of them."""
+        with self._lock:
+            if release is not None:
+                return sorted(self.releases.get(release, {}))
+            return sorted(name for files in self.releases.values() for name in files)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, data=None):
+                body = json.dumps(data or {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake._lock:
+                    fake.requests.append(("POST", self.path))
+                if self.headers.get("Authorization") != f"Bearer {fake.token}":
+                    return self._reply(401, {"detail": "Invalid token"})
+
+                if _RELEASES.match(self.path):
+                    version = json.loads(body)["version"]
+                    with fake._lock:
+                        exists = version in fake.releases
+                        fake.releases.setdefault(version, {})
+                    return self._reply(208 if exists else 201, {"version": version})
+
+                if match := _FILES.match(self.path):
+                    return self._upload(match["release"], body)
+                return self._reply(404, {"detail": "Not found"})
+
+            def _upload(self, release, body):
+                fields = parse_multipart(self.headers["Content-Type"], body)
+                name = fields["name"].decode()
+                with fake._lock:
+                    fake._in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake._in_flight)
+                time.sleep(fake.upload_delay)
+                with fake._lock:
+                    # Leave the flight before replying: the client may send
+                    # its next upload as soon as it has the response
+                    fake._in_flight -= 1
+                    files = fake.releases.get(release)
+                    if name in fake.fail_names:
+                        status, data = 500, {"detail": "Internal error"}
+                    elif files is None:
+                        status, data = 404, {"detail": "Release not found"}
+                    elif name in files:
+                        status, data = 409, {"detail": "File already exists"}
+                    else:
+                        files[name] = {
+                            "content": fields["file"],
+                            "header": fields.get("header", b"").decode() or None,
+                        }
+                        status, data = 201, {"name": name}
+                self._reply(status, data)
+
+        return Handler
@@ -0,0 +1,306 @@
+"""
+Offline harness for benchmarking the history aggregation of
+src/frontend-build-history.sh.
+
+In CI the script pulls up to HISTORY_LEVELS previous builds from quay, copies
+their dist out of a container into .history/<level> and then merges the
+levels and the current build. Here the previous builds are synthetic
+(synthetic_app.py) and are fed in either as plain directories or as local
+OCI image layouts holding /opt/app-root/src/dist, so the aggregation
+functions of the real script run without quay or docker.
+
+Each run records wall time per phase, bytes written, peak disk usage and
+the resulting file counts.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import tarfile
+import threading
+import time
+
+from synthetic_app import generate_dist
+
+# Fields of a run that only depend on its inputs; the baseline gates these
+GATED_FIELDS = ("output_files", "output_bytes", "aggregate_bytes_written")
+
+# Where the builder images keep the build output (see frontend-build-history.sh)
+IMAGE_DIST_PREFIX = "opt/app-root/src/dist"
+
+# Fraction of the files each build changes relative to the previous one
+DEFAULT_CHURN = 0.2
+
+# Files every build rewrites
+ENTRY_FILES = ("index.html", "fed-mods.json")
+
+# Disk usage sampling interval for the peak disk measurement
+DISK_SAMPLE_INTERVAL = 0.02
+
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{8}(\.[a-z0-9]+)$")
+
+# Runs the aggregation steps of main() after the levels have been fetched,
+# then reports the bytes the shell and its cp children wrote
+AGGREGATE_DRIVER = """
+source "$1"
+HISTORY_LEVELS=$2
+OUTPUT_DIR=$3
+CURRENT_BUILD_DIR=$4
+mkdir -p "$OUTPUT_DIR"
+copyHistoryIntoOutputDir || exit 1
+copyCurrentBuildIntoOutputDir
+copyOutputDirectoryIntoCurrentBuild
+grep '^wchar:' /proc/$$/io 2>/dev/null || true
+"""
+
+
+def _tree_stats(root):
+    """Return (file count, total bytes) of a directory tree."""
+    count = size = 0
+    for base, _, files in os.walk(root):
+        for name in files:
+            count += 1
+            size += os.path.getsize(os.path.join(base, name))
+    return count, size
+
+
+def generate_builds(dest, count, file_count=2000, churn=DEFAULT_CHURN, seed=0, **dist_options):
+    """Write count consecutive synthetic builds to dest/build-<n>, oldest first.
+
+    Every build changes a churn fraction of its predecessor's files: content
+    hashed files get new content under a new name (the old name disappears
+    from that build), unhashed files are rewritten in place, and the entry
+    files change every time. That is what makes history aggregation grow.
+
+    Returns:
+        list: Build directories, oldest first
+    """
+    builds = []
+    previous = os.path.join(dest, "build-0")
+    generate_dist(previous, file_count=file_count, seed=seed, **dist_options)
+    builds.append(previous)
+    for number in range(1, count):
+        current = os.path.join(dest, f"build-{number}")
+        shutil.copytree(previous, current)
+        rng = random.Random(f"{seed}-{number}")
+        paths = sorted(
+            os.path.relpath(os.path.join(base, name), current)
+            for base, _, files in os.walk(current)
+            for name in files
+        )
+        changed = rng.sample(paths, int(len(paths) * churn))
+        for rel_path in sorted(set(changed) | set(ENTRY_FILES)):
+            path = os.path.join(current, rel_path)
+            with open(path, "rb") as f:
+                content = f.read() + f"\n/* build {number} */\n".encode()
+            os.remove(path)
+            digest = hashlib.sha256(content).hexdigest()[:8]
+            new_path = _HASHED_NAME.sub(f".{digest}\\1", path)
+            with open(new_path, "wb") as f:
+                f.write(content)
+        builds.append(current)
+        previous = current
+    return builds
+
+
+def write_oci_layout(src_dir, layout_dir, prefix=IMAGE_DIST_PREFIX):
+    """Store src_dir as the single layer of a local OCI image layout at prefix.
+
+    The layer tar is deterministic (sorted, zero mtimes and owners).
+    """
+    blobs = os.path.join(layout_dir, "blobs", "sha256")
+    os.makedirs(blobs, exist_ok=True)
+
+    def _normalize(info):
+        info.mtime = 0
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    layer_tmp = os.path.join(layout_dir, "layer.tar")
+    with tarfile.open(layer_tmp, "w", format=tarfile.PAX_FORMAT) as tar:
+        for base, dirs, files in os.walk(src_dir):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(base, name)
+                arcname = f"{prefix}/{os.path.relpath(path, src_dir)}"
+                tar.add(path, arcname=arcname, filter=_normalize)
+
+    def _blob_from_file(path, media_type):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        os.replace(path, os.path.join(blobs, digest.hexdigest()))
+        return {
+            "mediaType": media_type,
+            "digest": f"sha256:{digest.hexdigest()}",
+            "size": os.path.getsize(os.path.join(blobs, digest.hexdigest())),
+        }
+
+    def _blob(data, media_type):
+        raw = json.dumps(data, sort_keys=True).encode()
+        path = os.path.join(layout_dir, "blob.tmp")
+        with open(path, "wb") as f:
+            f.write(raw)
+        return _blob_from_file(path, media_type)
+
+    layer = _blob_from_file(layer_tmp, "application/vnd.oci.image.layer.v1.tar")
+    config = _blob({
+        "architecture": "amd64",
+        "os": "linux",
+        "rootfs": {"type": "layers", "diff_ids": [layer["digest"]]},
+    }, "application/vnd.oci.image.config.v1+json")
+    manifest = _blob({
+        "schemaVersion": 2,
+        "mediaType": "application/vnd.oci.image.manifest.v1+json",
+        "config": config,
+        "layers": [layer],
+    }, "application/vnd.oci.image.manifest.v1+json")
+
+    with open(os.path.join(layout_dir, "oci-layout"), "w") as f:
+        json.dump({"imageLayoutVersion": "1.0.0"}, f)
+    with open(os.path.join(layout_dir, "index.json"), "w") as f:
+        json.dump({"schemaVersion": 2, "manifests": [manifest]}, f)
+    return layout_dir
+
+
+def extract_oci_dist(layout_dir, dest, prefix=IMAGE_DIST_PREFIX):
+    """Copy the files under prefix out of an OCI layout's layers into dest.
+
+    The offline counterpart of `docker pull` plus `docker cp <dist>/.`.
+    """
+    blobs = os.path.join(layout_dir, "blobs", "sha256")
+
+    def _json_blob(digest):
+        with open(os.path.join(blobs, digest.split(":", 1)[1])) as f:
+            return json.load(f)
+
+    with open(os.path.join(layout_dir, "index.json")) as f:
+        manifest = _json_blob(json.load(f)["manifests"][0]["digest"])
+    os.makedirs(dest, exist_ok=True)
+    for layer in manifest["layers"]:
+        with tarfile.open(os.path.join(blobs, layer["digest"].split(":", 1)[1])) as tar:
+            for member in tar:
+                if not member.isfile() or not member.name.startswith(prefix + "/"):
+                    continue
+                target = os.path.join(dest, member.name[len(prefix) + 1:])
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with tar.extractfile(member) as src, open(target, "wb") as out:
+                    shutil.copyfileobj(src, out, 1024 * 1024)
+
+
+class DiskSampler:
+    """Track the peak growth of used disk space on a filesystem in a thread."""
+
+    def __init__(self, path, interval=DISK_SAMPLE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._start = self._used()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _used(self):
+        stat = os.statvfs(self.path)
+        return (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._used() - self._start)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._used() - self._start)
+
+
+def run_history(script, work_dir, sources, current_build, source_type="dir"):
+    """Fetch the history levels and run the script's aggregation on them.
+
+    Args:
+        script: Path to frontend-build-history.sh
+        work_dir: Empty directory to run in (holds .history/ and the output)
+        sources: Previous builds, newest first, as directories or OCI layouts
+        current_build: Directory of the current build; it is copied into
+            work_dir first, since the aggregation writes into it
+        source_type: "dir" or "oci"
+
+    Returns:
+        dict: Timings, bytes written, peak disk usage and file counts
+    """
+    depth = len(sources)
+    build_dir = os.path.join(work_dir, "dist")
+    shutil.copytree(current_build, build_dir)
+
+    with DiskSampler(work_dir) as disk:
+        start = time.perf_counter()
+        # Like getBuildImages: the newest build is the highest level
+        for offset, source in enumerate(sources):
+            level_dir = os.path.join(work_dir, ".history", str(depth - offset))
+            if source_type == "oci":
+                extract_oci_dist(source, level_dir)
+            else:
+                shutil.copytree(source, level_dir)
+        fetched = time.perf_counter()
+
+        result = subprocess.run(
+            ["bash", "-c", AGGREGATE_DRIVER, "history-bench", script, str(depth),
+             "aggregated_history", "dist"],
+            cwd=work_dir,
+            capture_output=True,
+            text=True,
+        )
+        finished = time.perf_counter()
+    if result.returncode != 0:
+        raise RuntimeError(f"history aggregation failed:\n{result.stdout}\n{result.stderr}")
+
+    wchar = re.search(r"^wchar:\s*(\d+)", result.stdout, re.MULTILINE)
+    history_files, history_bytes = _tree_stats(os.path.join(work_dir, ".history"))
+    output_files, output_bytes = _tree_stats(build_dir)
+    return {
+        "depth": depth,
+        "source": source_type,
+        "fetch_s": round(fetched - start, 3),
+        "aggregate_s": round(finished - fetched, 3),
+        "wall_s": round(finished - start, 3),
+        "history_files": history_files,
+        "history_bytes": history_bytes,
+        "aggregate_bytes_written": int(wchar.group(1)) if wchar else None,
+        "bytes_written": history_bytes + (int(wchar.group(1)) if wchar else 0),
+        "peak_disk_bytes": disk.peak,
+        "output_files": output_files,
+        "output_bytes": output_bytes,
+    }
+
+
+def baseline_entry(result, inputs):
+    """Return what a baseline stores of a run: its inputs and the gated fields."""
+    return {"inputs": inputs, **{key: result[key] for key in GATED_FIELDS}}
+
+
+def compare_to_baseline(result, baseline):
+    """Compare a history run against its baseline.
+
+    Only GATED_FIELDS are compared: file counts and bytes written are
+    deterministic for a given input, so they may not grow at all. Times vary
+    too much on shared runners to gate on; they are only recorded.
+
+    Returns:
+        list: Human-readable regression descriptions
+    """
+    regressions = []
+    for key in GATED_FIELDS:
+        if baseline.get(key) is not None and result[key] is not None \
+                and result[key] > baseline[key]:
+            regressions.append(f"{key} rose from {baseline[key]} to {result[key]}")
+    return regressions
@@ -0,0 +1,170 @@
+"""
+Read-only view of a container image's root filesystem for the Dockerfile tests.
+
+The image is exported once with `podman export` into a tarball whose members
+are indexed in memory, and its `podman image inspect` JSON is loaded once, so
+every existence check, file read, directory listing or label lookup is a
+local lookup instead of a podman create/cp/rm round trip per assertion.
+"""
+
+import json
+import os
+import posixpath
+import subprocess
+import tarfile
+import uuid
+
+# Symlink hops before a path is treated as a loop (matches Linux ELOOP)
+MAX_SYMLINKS = 40
+
+
+def _member_path(name):
+    """Normalize a tar member name to a path relative to the image root."""
+    return posixpath.normpath("/" + name).lstrip("/")
+
+
+class ImageFilesystem:
+    """Indexed root filesystem and inspect data of one image."""
+
+    def __init__(self, tar_path, inspect):
+        self.tar_path = tar_path
+        self.inspect = inspect
+        self._tar = tarfile.open(tar_path)
+        self._members = {}
+        self._children = {"": set()}
+        for member in self._tar.getmembers():
+            path = _member_path(member.name)
+            if not path or path == ".":
+                continue
+            self._members[path] = member
+            # Parent directories are not always listed as members of their own
+            parent, name = posixpath.split(path)
+            while True:
+                self._children.setdefault(parent, set()).add(name)
+                if not parent:
+                    break
+                parent, name = posixpath.split(parent)
+            if member.isdir():
+                self._children.setdefault(path, set())
+
+    @classmethod
+    def export(cls, image_name, dest_dir):
+        """Export image_name's root filesystem into dest_dir and index it.
+
+        Returns:
+            ImageFilesystem: The indexed image
+        """
+        result = subprocess.run(
+            ["podman", "image", "inspect", image_name],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        inspect = json.loads(result.stdout)[0]
+
+        container_name = f"temp-export-{uuid.uuid4().hex[:8]}"
+        tar_path = os.path.join(dest_dir, f"{container_name}.tar")
+        subprocess.run(
+            ["podman", "create", "--name", container_name, image_name],
+            capture_output=True,
+            check=True,
+        )
+        try:
+            subprocess.run(
+                ["podman", "export", "-o", tar_path, container_name],
+                capture_output=True,
+                check=True,
+            )
+        finally:
+            subprocess.run(["podman", "rm", "-f", container_name], capture_output=True)
+        return cls(tar_path, inspect)
+
+    def close(self):
+        self._tar.close()
+
+    @property
+    def config(self):
+        return self.inspect.get("Config") or {}
+
+    @property
+    def labels(self):
+        """Image labels (root-level Labels on older podman, Config.Labels on newer)."""
+        return self.inspect.get("Labels") or self.config.get("Labels") or {}
+
+    @property
+    def user(self):
+        return self.config.get("User", "")
+
+    def _resolve(self, path):
+        """Resolve path inside the image, following symlinks in every component.
+
+        Relative paths are taken from the image's working directory.
+
+        Returns:
+            str: Path relative to the image root, or None for a symlink loop
+        """
+        if not path.startswith("/"):
+            path = posixpath.join(self.config.get("WorkingDir") or "/", path)
+        parts = [part for part in posixpath.normpath(path).split("/") if part]
+        hops = 0
+        resolved = ""
+        while parts:
+            candidate = posixpath.join(resolved, parts.pop(0))
+            member = self._members.get(candidate)
+            if member is not None and member.issym():
+                hops += 1
+                if hops > MAX_SYMLINKS:
+                    return None
+                target = member.linkname
+                base = "/" if target.startswith("/") else "/" + resolved
+                parts = [
+                    part
+                    for part in posixpath.normpath(posixpath.join(base, target)).split("/")
+                    if part
+                ] + parts
+                resolved = ""
+                continue
+            resolved = candidate
+        return resolved
+
+    def exists(self, path):
+        """Check whether path exists in the image."""
+        resolved = self._resolve(path)
+        return resolved is not None and (resolved in self._members or resolved in self._children)
+
+    def is_dir(self, path):
+        resolved = self._resolve(path)
+        return resolved is not None and resolved in self._children
+
+    def read_bytes(self, path):
+        """Read a regular file from the image.
+
+        Returns:
+            bytes: File content, or None if path is not a file
+        """
+        resolved = self._resolve(path)
+        member = self._members.get(resolved) if resolved is not None else None
+        if member is not None and member.islnk():
+            member = self._members.get(_member_path(member.linkname))
+        if member is None or not member.isfile():
+            return None
+        with self._tar.extractfile(member) as f:
+            return f.read()
+
+    def read(self, path):
+        """Read a text file from the image, or None if path is not a file."""
+        content = self.read_bytes(path)
+        return content.decode() if content is not None else None
+
+    def files(self):
+        """Yield (path, size) for every regular file, paths absolute in the image."""
+        for path, member in self._members.items():
+            if member.isfile():
+                yield "/" + path, member.size
+
+    def listdir(self, path):
+        """List a directory in the image, or None if path is not a directory."""
+        resolved = self._resolve(path)
+        if resolved is None or resolved not in self._children:
+            return None
+        return sorted(self._children[resolved])
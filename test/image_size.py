@@ -0,0 +1,164 @@
+"""
+Image size breakdown and baseline comparison for the size-tracking suite.
+
+An image's size is reported three ways: the total from `podman image
+inspect`, each layer's size from `podman history` (keyed by its normalized
+Dockerfile instruction, so the keys survive rebuilds), and the file bytes
+under each top-level directory group of the exported filesystem. Comparing
+a report against a stored baseline names the layer and the directory that
+grew, not just the total.
+"""
+
+import re
+import subprocess
+
+# Default regression tolerance: a size may grow 5% over its baseline
+DEFAULT_TOLERANCE = 0.05
+
+# Growth below this many bytes is noise (a changed timestamp file, a label)
+DEFAULT_MIN_GROWTH = 1024 * 1024
+
+# Directory groups, first match wins; files elsewhere belong to "base"
+DIRECTORY_GROUPS = ("/srv/dist", "/licenses", "/etc/caddy", "/srv")
+BASE_GROUP = "base"
+
+# Longest layer key kept from a Dockerfile instruction
+MAX_LAYER_KEY = 100
+
+_SHELL_PREFIX = re.compile(r"^/bin/sh -c (#\(nop\) )?")
+_CONTENT_DIGEST = re.compile(r"\b(file|dir|multi|sha256):[0-9a-f]{12,}")
+
+
+def layer_key(created_by):
+    """Normalize a history CreatedBy into a stable layer key.
+
+    Drops the shell wrapper buildah/docker add and the content digests of
+    COPY/ADD sources, which change whenever the copied files do.
+    """
+    key = _SHELL_PREFIX.sub("", created_by.strip())
+    key = _CONTENT_DIGEST.sub(r"\1:<digest>", key)
+    key = " ".join(key.split())
+    return key[:MAX_LAYER_KEY] or "<empty>"
+
+
+def parse_history(output):
+    """Parse `podman history --human=false --no-trunc` "size<TAB>created_by" lines.
+
+    Layers that add no bytes (ENV, LABEL, USER, ...) are dropped, repeated
+    instructions get a " #2", " #3" suffix.
+
+    Returns:
+        dict: Layer key -> size in bytes, base image layers first
+    """
+    layers = {}
+    # podman lists the newest layer first
+    for line in reversed(output.strip().splitlines()):
+        size, _, created_by = line.partition("\t")
+        if not size.strip().isdigit() or int(size) == 0:
+            continue
+        key = base = layer_key(created_by)
+        count = 1
+        while key in layers:
+            count += 1
+            key = f"{base} #{count}"
+        layers[key] = int(size)
+    return layers
+
+
+def image_layers(image_name):
+    """Return the non-empty layers of an image as {layer key: size}."""
+    result = subprocess.run(
+        ["podman", "history", "--human=false", "--no-trunc",
+         "--format", "{{.Size}}\t{{.CreatedBy}}", image_name],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_history(result.stdout)
+
+
+def directory_sizes(files, groups=DIRECTORY_GROUPS):
+    """Sum file sizes per directory group.
+
+    Args:
+        files: Iterable of (absolute path, size) pairs
+        groups: Directory prefixes, first match wins
+
+    Returns:
+        dict: Group -> bytes, every group plus BASE_GROUP present
+    """
+    sizes = dict.fromkeys((*groups, BASE_GROUP), 0)
+    for path, size in files:
+        for group in groups:
+            if path == group or path.startswith(group + "/"):
+                sizes[group] += size
+                break
+        else:
+            sizes[BASE_GROUP] += size
+    return sizes
+
+
+def size_report(image_fs, layers):
+    """Build the size report of an exported image.
+
+    Args:
+        image_fs: image_inspect.ImageFilesystem of the image
+        layers: {layer key: size} from image_layers()
+
+    Returns:
+        dict: "total", "layers" and "directories", all in bytes
+    """
+    return {
+        "total": int(image_fs.inspect["Size"]),
+        "layers": layers,
+        "directories": directory_sizes(image_fs.files()),
+    }
+
+
+def compare_sizes(report, baseline, tolerance=DEFAULT_TOLERANCE, min_growth=DEFAULT_MIN_GROWTH):
+    """Compare a size report against its baseline.
+
+    A size regresses when it grows by more than tolerance and by at least
+    min_growth bytes. A layer missing from the baseline counts as grown
+    from zero.
+
+    Returns:
+        list: Human-readable regression descriptions (empty when within tolerance)
+    """
+    regressions = []
+
+    def check(label, current, previous):
+        growth = current - previous
+        if growth >= min_growth and current > previous * (1 + tolerance):
+            regressions.append(
+                f"{label} grew from {_mb(previous)} to {_mb(current)} (+{_mb(growth)})"
+            )
+
+    check("image", report["total"], baseline.get("total", 0))
+    for section, label in (("layers", "layer"), ("directories", "directory")):
+        previous_sizes = baseline.get(section) or {}
+        for name, size in report[section].items():
+            check(f"{label} '{name}'", size, previous_sizes.get(name, 0))
+    return regressions
+
+
+def format_report(report, baseline=None):
+    """Format a size report as an aligned table with the change since baseline."""
+    baseline = baseline or {}
+    lines = []
+
+    def row(label, size, previous):
+        change = "" if previous is None else f"{size - previous:+,d}"
+        lines.append(f"  {_mb(size):>10} {change:>14}  {label}")
+
+    row("total", report["total"], baseline.get("total"))
+    for section in ("layers", "directories"):
+        lines.append(f" {section}:")
+        previous_sizes = baseline.get(section) or {}
+        for name, size in report[section].items():
+            row(name, size, previous_sizes.get(name, 0) if baseline else None)
+    return "\n".join(lines)
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.2f} MB"
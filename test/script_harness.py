@@ -0,0 +1,165 @@
+"""
+Podman-free workspace for running the build scripts directly.
+
+A workspace is a temporary copy of a test fixture with the build scripts in
+its build-tools/ directory, laid out the way the Dockerfile lays out the
+builder stage. npm, pnpm, yarn, node and git are replaced by stubs that log
+every call and fake only what the scripts rely on, so a full
+universal_build.sh run takes well under a second.
+"""
+
+import os
+import shutil
+import subprocess
+
+# Tools replaced by STUB_SCRIPT; the package manager stubs "build" the app
+STUB_TOOLS = ("npm", "pnpm", "yarn", "node", "git")
+
+# Logs "<tool> <args>" to $STUB_CALLS. git only supports `config` (there is no
+# checkout), so app_info.py falls back to the CI environment variables.
+# Workspace builds (npm run <script> --workspace <dir>, yarn workspace <name>
+# run <script>, pnpm --filter <name> run <script>) write into the package
+# directory. With STUB_BUILD_SLEEP each build logs "start|end <dir>" to
+# $STUB_CALLS.builds around a sleep; the build of the STUB_BUILD_FAIL
+# directory fails.
+STUB_SCRIPT = """#!/bin/bash
+tool=$(basename "$0")
+echo "$tool $*" >> "$STUB_CALLS"
+package_dir=.
+case "$tool $1" in
+  "npm run")
+    if [[ "${3:-}" == --workspace ]]; then
+      package_dir=$4
+    fi
+    ;;
+  "yarn workspace"|"pnpm --filter")
+    package_dir=$(dirname "$(grep -l "\\"name\\": \\"$2\\"" packages/*/package.json)")
+    ;;
+esac
+case "$tool $1" in
+  "node --version")
+    echo "v22.0.0"
+    ;;
+  "git config")
+    ;;
+  git\\ *)
+    echo "fatal: not a git repository" >&2
+    exit 128
+    ;;
+  "npm run"|"pnpm run"|"yarn build:prod"|"yarn workspace"|"pnpm --filter")
+    if [[ -n "${STUB_BUILD_SLEEP:-}" ]]; then
+      echo "start $package_dir" >> "$STUB_CALLS.builds"
+      sleep "$STUB_BUILD_SLEEP"
+      echo "end $package_dir" >> "$STUB_CALLS.builds"
+    fi
+    if [[ "$package_dir" == "${STUB_BUILD_FAIL:-}" ]]; then
+      echo "build failed in $package_dir" >&2
+      exit 1
+    fi
+    out="${package_dir}/${APP_BUILD_DIR:-dist}"
+    mkdir -p "${out}/js"
+    echo '<html><head><script src="js/app.js"></script></head></html>' \\
+      > "${out}/index.html"
+    echo 'console.log("app");' > "${out}/js/app.js"
+    # Stands in for build.js, which copies a synthetic_app.py output too
+    if [[ -d synthetic-dist ]]; then
+      cp -R synthetic-dist/. "${out}/"
+    fi
+    ;;
+esac
+"""
+
+# Environment the Dockerfile sets for the build stage
+DOCKERFILE_ENV = {
+    "PACKAGE_JSON_PATH": "package.json",
+    "APP_VERSION": "unknown",
+    "NPM_BUILD_SCRIPT": "",
+    "PNPM_BUILD_SCRIPT": "",
+    "YARN_BUILD_SCRIPT": "",
+    "ENABLE_SENTRY": "false",
+    "SOURCE_GIT_BRANCH": "",
+    "SOURCE_GIT_TAG": "",
+    "CADDY_PROFILE": "default",
+    "CADDY_ACCESS_LOG": "sampled",
+    "CADDY_EARLY_HINTS": "false",
+}
+
+
+class ScriptWorkspace:
+    """A fixture copy with build-tools/ and stubbed tools on PATH."""
+
+    def __init__(self, root, fixture_dir, repo_root, scripts):
+        self.app_dir = os.path.join(root, "app")
+        self.bin_dir = os.path.join(root, "stub-bin")
+        self.home_dir = os.path.join(root, "home")
+        self.calls_file = os.path.join(root, "stub-calls.log")
+        self.build_tools = os.path.join(self.app_dir, "build-tools")
+
+        shutil.copytree(fixture_dir, self.app_dir)
+        os.makedirs(self.build_tools)
+        for script in scripts:
+            shutil.copy2(os.path.join(repo_root, script), self.build_tools)
+
+        os.makedirs(self.bin_dir)
+        os.makedirs(self.home_dir)
+        for tool in STUB_TOOLS:
+            path = os.path.join(self.bin_dir, tool)
+            with open(path, "w") as f:
+                f.write(STUB_SCRIPT)
+            os.chmod(path, 0o755)
+        open(self.calls_file, "w").close()
+
+    def env(self, **overrides):
+        """Build-stage environment: the Dockerfile defaults plus overrides.
+
+        The host environment is not inherited (apart from PATH), so CI
+        variables on the test machine cannot leak into the scripts.
+        """
+        env = {
+            **DOCKERFILE_ENV,
+            "PATH": os.pathsep.join([self.build_tools, self.bin_dir, os.environ["PATH"]]),
+            "HOME": self.home_dir,
+            "STUB_CALLS": self.calls_file,
+        }
+        env.update(overrides)
+        return env
+
+    def run(self, args, check=True, **env):
+        """Run a command in the app directory with the build-stage environment.
+
+        Args:
+            args: Command and arguments; scripts resolve from build-tools/
+            check: Fail with the script output on a nonzero exit
+            **env: Environment overrides
+
+        Returns:
+            subprocess.CompletedProcess: The finished run with text output
+        """
+        result = subprocess.run(
+            args,
+            cwd=self.app_dir,
+            env=self.env(**env),
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        if check and result.returncode != 0:
+            raise AssertionError(
+                f"{args} exited with {result.returncode}:\n{result.stdout}\n{result.stderr}"
+            )
+        return result
+
+    def calls(self, tool=None):
+        """Return the logged stub calls, optionally only those of one tool."""
+        with open(self.calls_file) as f:
+            calls = f.read().splitlines()
+        if tool is None:
+            return calls
+        return [call for call in calls if call.split(" ", 1)[0] == tool]
+
+    def path(self, *parts):
+        return os.path.join(self.app_dir, *parts)
+
+    def read(self, *parts):
+        with open(self.path(*parts)) as f:
+            return f.read()
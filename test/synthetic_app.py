@@ -0,0 +1,345 @@
+"""
+Deterministic synthetic large-app generator for scaling tests and benchmarks.
+
+The fake-app fixtures build four tiny files, which says nothing about how
+history aggregation, asset hashing, compression or Caddy serving scale. This
+module writes build outputs of 10 to 100k files that look like a real
+webpack/federated-module build: content-hashed JS chunks (optionally with
+sourcemaps), stylesheets, images and fonts, unhashed locale and static
+files, an index.html and a fed-mods.json referencing the entry chunks. It
+can also write a fake lockfile with thousands of entries.
+
+The same arguments always produce byte-identical trees, so results can be
+compared across runs and machines.
+
+Usage:
+    generate_dist(dest, file_count=20000, seed=1)           # a dist tree
+    generate_app(app_dir, file_count=5000, lockfile_entries=3000)
+
+generate_app writes the tree to <app>/synthetic-dist/, which the fixture
+build.js (and the script_harness package manager stubs) copy into the build
+output, so a synthetic app builds like any other fixture.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+
+MIN_FILE_COUNT = 10
+MAX_FILE_COUNT = 100000
+
+# Directory of a generated app that build.js copies into the build output
+SYNTHETIC_DIST_DIR = "synthetic-dist"
+
+# index.html and fed-mods.json
+ENTRY_FILES = 2
+
+# Asset kinds: directory, extension, text or binary content, median size in
+# bytes and relative weight in the tree (roughly a federated module build)
+ASSET_KINDS = {
+    "chunk": ("js", ".js", "text", 8 * 1024, 55),
+    "style": ("css", ".css", "text", 4 * 1024, 10),
+    "image": ("static/images", ".png", "binary", 12 * 1024, 12),
+    "font": ("static/fonts", ".woff2", "binary", 20 * 1024, 3),
+    "locale": ("locales", ".json", "text", 1024, 12),
+    "icon": ("static/icons", ".svg", "text", 2 * 1024, 8),
+}
+
+# Kinds that are content-hashed by default (locales and icons ship unhashed)
+HASHED_KINDS = ("chunk", "style", "image", "font")
+
+SIZE_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+# Spread of the lognormal distribution; 1.0 gives the long tail of vendor chunks
+LOGNORMAL_SIGMA = 1.0
+
+MIN_FILE_SIZE = 16
+MAX_FILE_SIZE = 8 * 1024 * 1024
+
+# Files per directory before a kind is split into numbered subdirectories
+FILES_PER_DIR = 500
+
+CONTENT_HASH_LENGTH = 8
+
+# Identifiers for compressible, JS-looking text content
+WORDS = (
+    "function", "return", "const", "let", "var", "if", "else", "for", "while",
+    "module", "exports", "require", "import", "from", "default", "async", "await",
+    "props", "state", "render", "children", "className", "useEffect", "useState",
+    "chrome", "insights", "dispatch", "payload", "selector", "undefined", "null",
+    "Promise", "Object", "Array", "length", "value", "key", "index", "options",
+)
+
+# Packages that app.info.json reports on, always present as direct dependencies
+SCOPED_DEPENDENCIES = {
+    "@patternfly/react-core": "5.4.0",
+    "@patternfly/react-icons": "5.4.0",
+    "@redhat-cloud-services/frontend-components": "4.2.1",
+    "@redhat-cloud-services/frontend-components-utilities": "4.0.1",
+}
+
+
+def sample_size(rng, distribution, median):
+    """Draw one file size in bytes from a size distribution around median."""
+    if distribution == "fixed":
+        size = median
+    elif distribution == "uniform":
+        size = rng.uniform(0, 2 * median)
+    elif distribution == "lognormal":
+        size = rng.lognormvariate(math.log(median), LOGNORMAL_SIGMA)
+    else:
+        raise ValueError(
+            f"unknown size distribution {distribution!r}; use one of {SIZE_DISTRIBUTIONS}"
+        )
+    return int(min(max(size, MIN_FILE_SIZE), MAX_FILE_SIZE))
+
+
+def _text_pool(rng, size=256 * 1024):
+    """Return size bytes of JS-looking text that compresses like real bundles."""
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        token = f"{word}{rng.randrange(100)}{rng.choice('(){};,. =')}"
+        parts.append(token)
+        length += len(token)
+    return "".join(parts).encode()[:size]
+
+
+def _text_content(rng, pool, header, size):
+    start = rng.randrange(len(pool))
+    body = (pool[start:] + pool) * (size // len(pool) + 1)
+    return (header + body)[:size]
+
+
+def _content_name(stem, ext, content, hashed):
+    if not hashed:
+        return f"{stem}{ext}"
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:CONTENT_HASH_LENGTH]}{ext}"
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def _plan(rng, file_count, sourcemaps):
+    """Assign asset kinds to the file slots left after the entry files.
+
+    A chunk with a sourcemap takes two slots, so the total is exactly
+    file_count. The first chunk and stylesheet are the entry assets.
+    """
+    kinds = list(ASSET_KINDS)
+    weights = [ASSET_KINDS[kind][4] for kind in kinds]
+    remaining = file_count - ENTRY_FILES
+    plan = []
+    for kind in ("chunk", "style"):
+        with_map = sourcemaps and kind == "chunk" and remaining >= 2
+        plan.append((kind, with_map))
+        remaining -= 2 if with_map else 1
+    while remaining > 0:
+        kind = rng.choices(kinds, weights=weights)[0]
+        with_map = sourcemaps and kind == "chunk" and remaining >= 2
+        plan.append((kind, with_map))
+        remaining -= 2 if with_map else 1
+    return plan
+
+
+def generate_dist(dest, file_count=1000, seed=0, size_distribution="lognormal",
+                  size_scale=1.0, hashed_ratio=1.0, sourcemaps=False, app_name="synthetic-app",
+                  public_path=None):
+    """Write a synthetic build output of exactly file_count files into dest.
+
+    Args:
+        dest: Directory to write the tree into (created if missing)
+        file_count: Total number of files, MIN_FILE_COUNT to MAX_FILE_COUNT
+        seed: Random seed; equal arguments produce identical trees
+        size_distribution: "fixed", "uniform" or "lognormal" around each
+            kind's median size
+        size_scale: Multiplier for every median size
+        hashed_ratio: Fraction of chunks, stylesheets, images and fonts with
+            a content hash in their name; the rest keep a mutable name
+        sourcemaps: Give chunks a .map file and a sourceMappingURL comment
+        app_name: App name used in fed-mods.json and the public path
+        public_path: URL prefix of the build (default: /apps/<app_name>)
+
+    Returns:
+        dict: "file_count", "total_size", "entry" (the entry chunk and
+        stylesheet paths) and "files" ({relative path: size}, sorted)
+    """
+    if not MIN_FILE_COUNT <= file_count <= MAX_FILE_COUNT:
+        raise ValueError(
+            f"file_count must be between {MIN_FILE_COUNT} and {MAX_FILE_COUNT}, got {file_count}"
+        )
+    if size_distribution not in SIZE_DISTRIBUTIONS:
+        raise ValueError(
+            f"unknown size distribution {size_distribution!r}; use one of {SIZE_DISTRIBUTIONS}"
+        )
+    public_path = public_path or f"/apps/{app_name}"
+
+    rng = random.Random(seed)
+    pool = _text_pool(rng)
+    files = {}
+    entry = {}
+    counts = dict.fromkeys(ASSET_KINDS, 0)
+
+    def add(rel_path, content):
+        _write(os.path.join(dest, rel_path), content)
+        files[rel_path] = len(content)
+
+    for kind, with_map in _plan(rng, file_count, sourcemaps):
+        directory, ext, content_type, median, _ = ASSET_KINDS[kind]
+        index = counts[kind]
+        counts[kind] += 1
+        if index >= FILES_PER_DIR:
+            directory = f"{directory}/{index // FILES_PER_DIR:03d}"
+        stem = f"{rng.choice(WORDS)}-{kind}-{index}"
+        size = sample_size(rng, size_distribution, median * size_scale)
+
+        if content_type == "binary":
+            content = rng.randbytes(size)
+        else:
+            content = _text_content(rng, pool, f"/* {stem} */\n".encode(), size)
+        hashed = kind in HASHED_KINDS and rng.random() < hashed_ratio
+        name = _content_name(stem, ext, content, hashed)
+        if with_map:
+            content += f"\n//# sourceMappingURL={name}.map\n".encode()
+            add(f"{directory}/{name}.map", json.dumps({
+                "version": 3,
+                "file": name,
+                "sources": [f"webpack://{app_name}/src/{stem}.tsx"],
+                "names": [],
+                "mappings": "AAAA;" * (size // 64 + 1),
+            }).encode())
+        add(f"{directory}/{name}", content)
+        if kind in ("chunk", "style") and kind not in entry:
+            entry[kind] = f"{directory}/{name}"
+
+    add("index.html", (
+        "<!DOCTYPE html><html><head><title>Synthetic App</title>"
+        f'<link rel="stylesheet" href="{entry["style"]}">'
+        f'<script src="{entry["chunk"]}"></script>'
+        "</head><body><div id=\"root\"></div></body></html>"
+    ).encode())
+    add("fed-mods.json", json.dumps({
+        app_name: {
+            "entry": [f"{public_path}/{entry['chunk']}"],
+            "modules": [],
+        },
+    }, indent=2).encode())
+
+    return {
+        "file_count": len(files),
+        "total_size": sum(files.values()),
+        "entry": entry,
+        "files": dict(sorted(files.items())),
+    }
+
+
+def _package_versions(rng, count):
+    """Return count {name: version} packages, SCOPED_DEPENDENCIES first."""
+    packages = dict(SCOPED_DEPENDENCIES)
+    while len(packages) < count:
+        name = f"{rng.choice(WORDS).lower()}-{len(packages)}"
+        if rng.random() < 0.2:
+            name = f"@{rng.choice(WORDS).lower()}/{name}"
+        packages[name] = f"{rng.randrange(20)}.{rng.randrange(30)}.{rng.randrange(50)}"
+    return packages
+
+
+def _package_lock(name, direct, packages):
+    lock_packages = {"": {"name": name, "version": "1.0.0", "dependencies": {
+        dep: f"^{version}" for dep, version in direct.items()
+    }}}
+    for dep, version in packages.items():
+        lock_packages[f"node_modules/{dep}"] = {
+            "version": version,
+            "resolved": f"https://registry.npmjs.org/{dep}/-/{dep.split('/')[-1]}-{version}.tgz",
+            "integrity": "sha512-" + hashlib.sha512(f"{dep}@{version}".encode()).hexdigest(),
+        }
+    return json.dumps({
+        "name": name,
+        "version": "1.0.0",
+        "lockfileVersion": 3,
+        "requires": True,
+        "packages": lock_packages,
+    }, indent=2) + "\n"
+
+
+def _pnpm_lock(direct, packages):
+    lines = [
+        "lockfileVersion: '9.0'",
+        "",
+        "importers:",
+        "",
+        "  .:",
+        "    dependencies:",
+    ]
+    for dep, version in direct.items():
+        lines += [
+            f"      '{dep}':",
+            f"        specifier: ^{version}",
+            f"        version: {version}",
+        ]
+    lines += ["", "packages:", ""]
+    for dep, version in packages.items():
+        digest = hashlib.sha512(f"{dep}@{version}".encode()).hexdigest()
+        lines += [f"  '{dep}@{version}':", f"    resolution: {{integrity: sha512-{digest}}}", ""]
+    return "\n".join(lines) + "\n"
+
+
+def generate_lockfile(project_dir, entries=3000, seed=0, direct_count=50):
+    """Write a fake lockfile with `entries` packages and matching package.json deps.
+
+    The lockfile format follows the project's existing lockfile (pnpm-lock.yaml,
+    else package-lock.json). The first direct_count packages, including the
+    @patternfly and @redhat-cloud-services ones, become the production
+    dependencies in package.json. Only for stubbed installs: a real npm ci or
+    pnpm install would try to fetch the packages.
+
+    Returns:
+        dict: {name: version} of the direct dependencies
+    """
+    rng = random.Random(seed)
+    packages = _package_versions(rng, entries)
+    direct = dict(list(packages.items())[:min(direct_count, entries)])
+
+    package_json_path = os.path.join(project_dir, "package.json")
+    with open(package_json_path, encoding="utf-8") as f:
+        package_json = json.load(f)
+    package_json["dependencies"] = {dep: f"^{version}" for dep, version in direct.items()}
+    with open(package_json_path, "w", encoding="utf-8") as f:
+        json.dump(package_json, f, indent=2)
+        f.write("\n")
+
+    if os.path.isfile(os.path.join(project_dir, "pnpm-lock.yaml")):
+        with open(os.path.join(project_dir, "pnpm-lock.yaml"), "w") as f:
+            f.write(_pnpm_lock(direct, packages))
+    else:
+        with open(os.path.join(project_dir, "package-lock.json"), "w") as f:
+            f.write(_package_lock(package_json.get("name", "synthetic-app"), direct, packages))
+    return direct
+
+
+def generate_app(app_dir, lockfile_entries=0, seed=0, **dist_options):
+    """Turn a fixture copy into a synthetic large app.
+
+    Writes the build output to <app_dir>/synthetic-dist/ for build.js to
+    copy into the build, using the app name from package.json. With
+    lockfile_entries the lockfile is replaced by a fake one (see
+    generate_lockfile); leave it at 0 for image builds, whose install is real.
+
+    Returns:
+        dict: The generate_dist summary
+    """
+    with open(os.path.join(app_dir, "package.json"), encoding="utf-8") as f:
+        app_name = (json.load(f).get("insights") or {}).get("appname") or "synthetic-app"
+    summary = generate_dist(
+        os.path.join(app_dir, SYNTHETIC_DIST_DIR), seed=seed, app_name=app_name, **dist_options
+    )
+    if lockfile_entries:
+        generate_lockfile(app_dir, lockfile_entries, seed=seed)
+    return summary
@@ -20,7 +20,9 @@ fs.mkdirSync(jsDir, { recursive: true });
 // Create test files
 fs.writeFileSync(
   path.join(buildDir, 'index.html'),
-  '<!DOCTYPE html><html><head><title>Test App</title></head><body><h1>Test App</h1></body></html>'
+  '<!DOCTYPE html><html><head><title>Test App</title>' +
+    '<link rel="stylesheet" href="css/app.css"></head>' +
+    '<body><h1>Test App</h1><script src="js/app.js"></script></body></html>'
 );
 
 fs.writeFileSync(
@@ -38,4 +40,9 @@ fs.writeFileSync(
   JSON.stringify({ name: 'test-app', version: '1.0.0' }, null, 2)
 );
 
+// Synthetic large-app output written by test/synthetic_app.py
+if (fs.existsSync('synthetic-dist')) {
+  fs.cpSync('synthetic-dist', buildDir, { recursive: true });
+}
+
 console.log(`Build complete! Files created in ${buildDir}/`);
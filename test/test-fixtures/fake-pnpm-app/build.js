@@ -23,4 +23,9 @@ if (process.env.BUILD_VARIANT === 'plugin') {
   fs.writeFileSync(path.join(buildDir, 'plugin-build.txt'), 'plugin build');
 }
 
+// Synthetic large-app output written by test/synthetic_app.py
+if (fs.existsSync('synthetic-dist')) {
+  fs.cpSync('synthetic-dist', buildDir, { recursive: true });
+}
+
 console.log(`Build complete! Files created in ${buildDir}/`);
@@ -0,0 +1,138 @@
+"""
+Tests for app_info.py, the single-pass app.info.json generator.
+
+This test suite verifies that app.info.json and app.info.deps.json are
+collected in one process from package.json, the lockfile and a batched git
+lookup, including the detached HEAD fallbacks used in Konflux/Tekton.
+These tests run without Podman — they use a throwaway git repository.
+"""
+
+import json
+import subprocess
+
+import pytest
+from app_info import collect_app_info, main, resolve_git_refs
+
+PACKAGE_JSON = {
+    "name": "info-app",
+    "engines": {"node": ">=18"},
+    "insights": {"appname": "info-app"},
+    "dependencies": {
+        "@patternfly/react-core": "^5.0.0",
+        "@redhat-cloud-services/frontend-components": "^4.2.0",
+        "react": "^18.2.0",
+    },
+}
+
+PACKAGE_LOCK = {
+    "lockfileVersion": 3,
+    "packages": {
+        "": {"name": "info-app"},
+        "node_modules/@patternfly/react-core": {"version": "5.4.0"},
+        "node_modules/@redhat-cloud-services/frontend-components": {"version": "4.2.1"},
+        "node_modules/react": {"version": "18.2.0"},
+    },
+}
+
+
+def _git(repo, *args):
+    return subprocess.run(
+        ["git", "-c", "user.email=test@test.com", "-c", "user.name=Test User", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+class TestAppInfo:
+    """Test suite for the app.info.json generator."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        """Create a committed app checkout on branch main."""
+        (tmp_path / "package.json").write_text(json.dumps(PACKAGE_JSON))
+        (tmp_path / "package-lock.json").write_text(json.dumps(PACKAGE_LOCK))
+        _git(tmp_path, "init", "-q", "-b", "main")
+        _git(tmp_path, "add", ".")
+        _git(tmp_path, "commit", "-q", "-m", "Initial commit")
+        return tmp_path
+
+    def test_collects_app_info_fields(self, repo):
+        """Test that every app.info.json field is populated in one pass."""
+        app_info, deps_info = collect_app_info(str(repo), env={"APP_VERSION": "1.2.3"})
+
+        assert app_info == {
+            "app_name": "info-app",
+            "node_version": ">=18",
+            "src_hash": _git(repo, "rev-parse", "HEAD"),
+            "src_tag": "unknown",
+            "src_branch": "main",
+            "app_version": "1.2.3",
+            "patternfly_dependencies": ["@patternfly/react-core@5.4.0"],
+            "rh_cloud_services_dependencies": ["@redhat-cloud-services/frontend-components@4.2.1"],
+        }
+        assert deps_info == {
+            "lockfile": "package-lock.json",
+            "dependencies": {
+                "@patternfly/react-core": "5.4.0",
+                "@redhat-cloud-services/frontend-components": "4.2.1",
+                "react": "18.2.0",
+            },
+        }
+
+    def test_detached_head_uses_remote_branch_and_tag(self, repo):
+        """Test the detached HEAD fallbacks: remote branch and tag at HEAD."""
+        head = _git(repo, "rev-parse", "HEAD")
+        _git(repo, "update-ref", "refs/remotes/origin/release", head)
+        _git(repo, "tag", "-a", "v1.0.0", "-m", "release")
+        _git(repo, "checkout", "-q", "--detach")
+
+        refs = resolve_git_refs(str(repo), env={})
+
+        assert refs == {"hash": head, "branch": "release", "tag": "v1.0.0"}
+
+    def test_detached_head_falls_back_to_ci_env(self, repo):
+        """Test that CI variables fill the branch and tag when git cannot."""
+        _git(repo, "checkout", "-q", "--detach")
+
+        refs = resolve_git_refs(
+            str(repo),
+            env={"GITHUB_REF_NAME": "refs/heads/feature", "SOURCE_GIT_TAG": "v2.0.0"},
+        )
+
+        assert refs["branch"] == "feature"
+        assert refs["tag"] == "v2.0.0"
+
+    def test_nearest_tag_from_history(self, repo):
+        """Test that git describe supplies the nearest tag when none is at HEAD."""
+        _git(repo, "tag", "v0.9.0")
+        _git(repo, "commit", "-q", "--allow-empty", "-m", "Next commit")
+
+        assert resolve_git_refs(str(repo), env={})["tag"] == "v0.9.0"
+
+    def test_outside_git_reports_unknown(self, tmp_path):
+        """Test that missing git metadata degrades to 'unknown' instead of failing."""
+        refs = resolve_git_refs(str(tmp_path), env={})
+
+        assert refs == {"hash": "unknown", "branch": "unknown", "tag": "unknown"}
+
+    def test_cli_writes_both_files_and_skips_existing(self, repo, monkeypatch):
+        """Test that --output-dir writes both files and --skip-existing keeps them."""
+        monkeypatch.chdir(repo)
+        dist = repo / "dist"
+        dist.mkdir()
+        (dist / "app.info.json").write_text('{"app_name": "prebuilt"}')
+
+        assert main(["--output-dir", str(dist), "--skip-existing"]) == 0
+
+        assert json.loads((dist / "app.info.json").read_text()) == {"app_name": "prebuilt"}
+        deps_info = json.loads((dist / "app.info.deps.json").read_text())
+        assert deps_info["dependencies"]["react"] == "18.2.0"
+
+        assert main(["--output-dir", str(dist)]) == 0
+        assert json.loads((dist / "app.info.json").read_text())["app_name"] == "info-app"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,83 @@
+"""
+Tests for asset_integrity.py, the content-hash and SRI manifest.
+
+This test suite verifies that every built file gets its size, SHA-256 and a
+sha384 Subresource Integrity string, that memory-mapped and streamed reads
+hash alike, that the process pool matches a serial run, and that build
+metadata stays out of the manifest. These tests run without Podman — they
+use a temp build directory and a synthetic dist.
+"""
+
+import base64
+import hashlib
+import json
+import os
+
+import asset_integrity
+import pytest
+from asset_integrity import MANIFEST_FILE, build_manifest, hash_file, main
+
+
+def _sri(content):
+    return "sha384-" + base64.b64encode(hashlib.sha384(content).digest()).decode()
+
+
+class TestAssetIntegrity:
+    """Test suite for the content-hash and SRI manifest."""
+
+    @pytest.fixture
+    def build_dir(self, make_build_dir):
+        """Create a small build output with code, an empty file and metadata."""
+        return make_build_dir({
+            "index.html": b"<html><script src='js/app.js'></script></html>",
+            "js/app.js": b"console.log('app');" * 200,
+            "img/empty.svg": b"",
+            "app.info.json": b"{}",
+            "app.info.assets.json": b"{}",
+        })
+
+    def test_manifest_entries(self, build_dir):
+        """Test size, SHA-256 and SRI of each file; metadata is skipped."""
+        assert main([str(build_dir), "--workers", "1"]) == 0
+
+        manifest = json.loads((build_dir / MANIFEST_FILE).read_text())
+        content = b"console.log('app');" * 200
+        assert manifest["assets"]["js/app.js"] == {
+            "size": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "integrity": _sri(content),
+        }
+        assert manifest["assets"]["img/empty.svg"]["integrity"] == _sri(b"")
+        assert sorted(manifest["assets"]) == ["img/empty.svg", "index.html", "js/app.js"]
+        assert manifest["files"] == 3
+        assert manifest["size"] == sum(a["size"] for a in manifest["assets"].values())
+
+    def test_mmap_matches_streamed_reads(self, tmp_path, monkeypatch):
+        """Test that files above the mmap threshold hash the same as streamed ones."""
+        path = tmp_path / "bundle.js"
+        path.write_bytes(os.urandom(300 * 1024))
+
+        streamed = hash_file(str(path))
+        monkeypatch.setattr(asset_integrity, "MMAP_THRESHOLD", 1)
+        mapped = hash_file(str(path))
+
+        assert mapped == streamed
+        assert streamed[2] == _sri(path.read_bytes())
+
+    def test_process_pool_matches_serial(self, synthetic_dist):
+        """Test that the parallel manifest of a synthetic dist equals a serial run."""
+        dist = synthetic_dist(file_count=2000, seed=11, size_scale=0.2)["path"]
+
+        serial = build_manifest(dist, workers=1)
+        parallel = build_manifest(dist, workers=4)
+
+        assert parallel == serial
+        assert parallel["files"] == 2000
+
+    def test_missing_build_dir_fails(self, tmp_path):
+        """Test that a missing build directory is an error."""
+        assert main([str(tmp_path / "missing")]) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,128 @@
+"""
+Tests for asset_inventory.py, the per-asset manifest and bundle budget check.
+
+This test suite verifies that every built file is inventoried with its size,
+gzip size and SHA-256, that the process pool produces the same manifest as a
+serial run, that the digests of assets.manifest.json are reused unless stale,
+and that budgets and the previous build's manifest flag bundle growth. These
+tests run without Podman — they use a temp build directory.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+
+import asset_integrity
+import pytest
+from asset_inventory import (
+    MANIFEST_FILE,
+    budgets_from_env,
+    build_inventory,
+    check_budgets,
+    main,
+)
+
+
+class TestAssetInventory:
+    """Test suite for the asset inventory and bundle budgets."""
+
+    @pytest.fixture
+    def build_dir(self, make_build_dir):
+        """Create a small build output with code, a sourcemap and metadata."""
+        return make_build_dir({
+            "index.html": b"<html><script src='js/app.js'></script></html>",
+            "js/app.js": b"console.log('app');" * 200,
+            "js/vendor.js": os.urandom(4096),
+            "js/app.js.map": b'{"version":3}' * 50,
+            "css/app.css": b"body { margin: 0; }" * 20,
+            "app.info.json": b"{}",
+        })
+
+    def test_inventories_every_asset(self, build_dir):
+        """Test that each asset gets size, gzip size and SHA-256; metadata is skipped."""
+        manifest = build_inventory(str(build_dir), workers=1)
+        assets = {asset["path"]: asset for asset in manifest["assets"]}
+
+        assert sorted(assets) == [
+            "css/app.css", "index.html", "js/app.js", "js/app.js.map", "js/vendor.js"
+        ]
+
+        content = (build_dir / "js" / "app.js").read_bytes()
+        assert assets["js/app.js"]["size"] == len(content)
+        assert assets["js/app.js"]["sha256"] == hashlib.sha256(content).hexdigest()
+        assert assets["js/app.js"]["gzip"] == len(gzip.compress(content, compresslevel=6, mtime=0))
+        assert "brotli" in assets["js/app.js"]
+
+        # Sourcemaps are inventoried but not counted as shipped
+        assert manifest["totals"]["files"] == 4
+        assert manifest["totals"]["size"] == sum(
+            asset["size"] for path, asset in assets.items() if not path.endswith(".map")
+        )
+
+    def test_process_pool_matches_serial_run(self, build_dir, make_build_dir):
+        """Test that the parallel hasher produces the same manifest as a serial run."""
+        make_build_dir({
+            f"js/chunk-{i}.js": f"export const c{i} = {i};".encode() * (i + 1) for i in range(40)
+        })
+
+        assert build_inventory(str(build_dir), workers=4) == build_inventory(str(build_dir), workers=1)
+
+    def test_reuses_integrity_digests(self, build_dir, make_build_dir):
+        """Test that the digests of assets.manifest.json are reused unless stale."""
+        assert asset_integrity.main([str(build_dir), "--workers", "1"]) == 0
+        integrity = json.loads((build_dir / asset_integrity.MANIFEST_FILE).read_text())
+        integrity["assets"]["js/app.js"]["sha256"] = "0" * 64
+
+        manifest = build_inventory(str(build_dir), workers=1, integrity=integrity)
+        assets = {asset["path"]: asset for asset in manifest["assets"]}
+        assert assets["js/app.js"]["sha256"] == "0" * 64
+
+        # A file that changed size since the manifest was written is hashed again
+        make_build_dir({"js/app.js": b"console.log('changed');"})
+        manifest = build_inventory(str(build_dir), workers=1, integrity=integrity)
+        assets = {asset["path"]: asset for asset in manifest["assets"]}
+        assert assets["js/app.js"]["sha256"] == hashlib.sha256(
+            b"console.log('changed');"
+        ).hexdigest()
+
+    def test_budgets_flag_total_and_chunk(self, build_dir):
+        """Test that total and per-chunk gzip budgets report the offending assets."""
+        manifest = build_inventory(str(build_dir), workers=1)
+        budgets = budgets_from_env({"ASSET_BUDGET_TOTAL_KB": "1", "ASSET_BUDGET_CHUNK_KB": "2"})
+
+        violations = check_budgets(manifest, budgets)
+
+        assert any(v.startswith("total gzip size") for v in violations)
+        assert any(v.startswith("js/vendor.js") for v in violations)
+        assert not any(v.startswith("js/app.js ") for v in violations)
+
+    def test_growth_against_previous_manifest(self, build_dir, make_build_dir):
+        """Test that growth beyond ASSET_BUDGET_GROWTH is reported against the previous build."""
+        previous = build_inventory(str(build_dir), workers=1)
+        make_build_dir({"js/vendor.js": os.urandom(8192)})
+        manifest = build_inventory(str(build_dir), workers=1)
+
+        violations = check_budgets(manifest, budgets_from_env({}), previous)
+        assert any(v.startswith("total gzip size grew") for v in violations)
+        assert any(v.startswith("largest chunk grew") for v in violations)
+
+        relaxed = budgets_from_env({"ASSET_BUDGET_GROWTH": "5"})
+        assert check_budgets(manifest, relaxed, previous) == []
+
+    def test_cli_fail_mode_exits_nonzero(self, build_dir, tmp_path, monkeypatch):
+        """Test that the CLI writes the manifest and only fails the build in fail mode."""
+        monkeypatch.setenv("ASSET_BUDGET_CHUNK_KB", "1")
+        monkeypatch.delenv("ASSET_BASELINE", raising=False)
+
+        monkeypatch.setenv("ASSET_BUDGET_MODE", "warn")
+        assert main([str(build_dir)]) == 0
+        manifest = json.loads((build_dir / MANIFEST_FILE).read_text())
+        assert manifest["totals"]["files"] == 4
+
+        monkeypatch.setenv("ASSET_BUDGET_MODE", "fail")
+        assert main([str(build_dir), "--previous", str(tmp_path / "missing.json")]) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,151 @@
+"""
+Tests for build_cache.py, the content-addressed build output cache.
+
+This test suite verifies that the cache key follows the build inputs (sources,
+lockfile, build script and env) but not files that never affect the output,
+that a stored build is restored byte for byte, and that the cache evicts the
+least recently used entries to stay within its size bound.
+These tests run without Podman — they use a throwaway git repository.
+"""
+
+import json
+import os
+import subprocess
+
+import pytest
+from build_cache import BuildCache, compute_key, main
+
+ENV = {"APP_BUILD_DIR": "dist", "NPM_BUILD_SCRIPT": ""}
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+class TestBuildCache:
+    """Test suite for the build output cache."""
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        """Create a git app checkout with build output and node_modules."""
+        project = tmp_path / "app"
+        _write(project / "package.json", json.dumps({"name": "cache-app"}))
+        _write(project / "package-lock.json", json.dumps({"lockfileVersion": 3}))
+        _write(project / "src" / "index.js", "console.log('app');\n")
+        _write(project / "README.md", "# cache-app\n")
+        _write(project / ".gitignore", "node_modules/\n")
+        subprocess.run(["git", "init", "-q"], cwd=project, check=True)
+        _write(project / "dist" / "index.html", "<html></html>")
+        _write(project / "dist" / "js" / "app.js", "console.log('built');")
+        _write(project / "node_modules" / "dep" / "index.js", "module.exports = 1;")
+        return project
+
+    def test_key_follows_build_inputs(self, project):
+        """Test that sources, lockfile and build env change the key."""
+        key = compute_key(str(project), ENV)
+        assert key == compute_key(str(project), ENV)
+
+        assert compute_key(str(project), {**ENV, "NPM_BUILD_SCRIPT": "build:beta"}) != key
+
+        _write(project / "src" / "index.js", "console.log('changed');\n")
+        changed_source = compute_key(str(project), ENV)
+        assert changed_source != key
+
+        _write(project / "package-lock.json", json.dumps({"lockfileVersion": 3, "packages": {}}))
+        assert compute_key(str(project), ENV) != changed_source
+
+    def test_key_ignores_non_build_files(self, project):
+        """Test that docs, build output, node_modules and ignored patterns keep the key."""
+        key = compute_key(str(project), ENV)
+
+        _write(project / "README.md", "# renamed\n")
+        _write(project / "dist" / "js" / "app.js", "console.log('rebuilt');")
+        _write(project / "node_modules" / "dep" / "index.js", "module.exports = 2;")
+        _write(project / "build-tools" / "universal_build.sh", "#!/bin/bash\n")
+        assert compute_key(str(project), ENV) == key
+
+        _write(project / "docs" / "guide.md", "guide\n")
+        assert compute_key(str(project), ENV) != key
+        assert compute_key(str(project), {**ENV, "BUILD_CACHE_IGNORE": "docs/*"}) == key
+
+    def test_store_and_restore_round_trip(self, project, tmp_path):
+        """Test that a hit restores the stored build output exactly."""
+        cache = BuildCache(str(tmp_path / "cache"))
+        build_dir = str(project / "dist")
+
+        assert not cache.restore("abc", build_dir)
+        cache.store("abc", build_dir)
+
+        _write(project / "dist" / "stale.js", "stale")
+        assert cache.restore("abc", build_dir)
+
+        restored = sorted(
+            os.path.relpath(os.path.join(root, name), build_dir)
+            for root, _, files in os.walk(build_dir)
+            for name in files
+        )
+        assert restored == ["index.html", os.path.join("js", "app.js")]
+        assert (project / "dist" / "js" / "app.js").read_text() == "console.log('built');"
+        stats = cache.stats()
+        assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+    def test_evicts_least_recently_used(self, project, tmp_path):
+        """Test that eviction keeps the newest and most recently restored entries."""
+        cache = BuildCache(str(tmp_path / "cache"))
+        build_dir = str(project / "dist")
+        for index, key in enumerate(("first", "second", "third")):
+            cache.store(key, build_dir)
+            os.utime(cache.entry_path(key), (1000 + index, 1000 + index))
+        cache.restore("first", build_dir)
+
+        entry_size = os.path.getsize(cache.entry_path("first"))
+        cache.max_bytes = entry_size * 2
+        _, evicted = cache.store("fourth", build_dir)
+
+        remaining = sorted(os.path.basename(path) for path, _, _ in cache.entries())
+        assert evicted == 2
+        assert remaining == ["first.tar.gz", "fourth.tar.gz"]
+
+    def test_cli_reports_hit_and_miss(self, project, tmp_path, monkeypatch, capsys):
+        """Test the restore exit codes and the hit/miss report."""
+        monkeypatch.setenv("BUILD_CACHE_DIR", str(tmp_path / "cache"))
+        build_dir = str(project / "dist")
+
+        assert main(["restore", build_dir, "--key", "0123456789abcdef"]) == 1
+        assert "Build cache: miss 0123456789ab" in capsys.readouterr().out
+
+        assert main(["store", build_dir, "--key", "0123456789abcdef"]) == 0
+        assert main(["restore", build_dir, "--key", "0123456789abcdef"]) == 0
+        assert "Build cache: hit 0123456789ab" in capsys.readouterr().out
+
+        monkeypatch.setenv("BUILD_CACHE_DIR", "")
+        assert main(["restore", build_dir, "--key", "0123456789abcdef"]) == 1
+
+    def test_tampered_entry_is_dropped(self, project, tmp_path, capsys):
+        """Test that an entry whose tarball does not match its SHA-256 is not restored."""
+        cache = BuildCache(str(tmp_path / "cache"))
+        build_dir = str(project / "dist")
+        cache.store("abc", build_dir)
+        with open(cache.entry_path("abc"), "ab") as f:
+            f.write(b"poisoned")
+
+        assert not cache.restore("abc", build_dir)
+        assert "does not match its SHA-256" in capsys.readouterr().err
+        assert not os.path.exists(cache.entry_path("abc"))
+        assert (project / "dist" / "js" / "app.js").read_text() == "console.log('built');"
+
+    def test_cache_is_scoped_per_app(self, project, tmp_path):
+        """Test that each app gets its own cache directory."""
+        env = {"BUILD_CACHE_DIR": str(tmp_path / "cache")}
+        one = BuildCache.from_env({**env, "APP_NAME": "app-one"})
+        two = BuildCache.from_env({**env, "APP_NAME": "../app-two"})
+        one.store("abc", str(project / "dist"))
+
+        assert two.cache_dir == str(tmp_path / "cache" / "_app-two")
+        assert not two.restore("abc", str(project / "dist"))
+        assert BuildCache.from_env({**env, "APP_NAME": "null"}).cache_dir.endswith("default")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
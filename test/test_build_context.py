@@ -0,0 +1,146 @@
+"""
+Tests for build_context.py, the minimal build context analyzer.
+
+This test suite verifies that source roots, workspaces and the directories
+named by the build scripts and config files stay in the build context while
+tests, coverage, old build output and CI config are left out, that the
+.dockerignore matcher follows Docker's rules, and that the size report and
+the protection of hand-written .dockerignore files work. These tests run
+without Podman — they use a temp app checkout.
+"""
+
+import json
+
+import pytest
+from build_context import DockerIgnore, analyze, main
+
+
+def _write(project_dir, rel_path, content="x"):
+    path = project_dir / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+class TestBuildContext:
+    """Test suite for the build context analyzer."""
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        """Create an app checkout with build input and everything around it."""
+        project = tmp_path / "app"
+        _write(project, "package.json", json.dumps({
+            "name": "test-app",
+            "workspaces": ["packages/*"],
+            "scripts": {
+                "build": "npm run build:icons && webpack --config tools/webpack.prod.js",
+                "build:icons": "node scripts/icons.js",
+                "test": "jest test/",
+            },
+            "devDependencies": {"cypress": "13.0.0"},
+        }))
+        _write(project, "package-lock.json", "{}")
+        _write(project, "tsconfig.json", json.dumps({"include": ["src", "types"]}))
+        _write(project, "jest.config.js", "module.exports = {roots: ['<rootDir>/fixtures']};")
+        for rel_path in ("src/index.js", "src/__snapshots__/a.snap", "tools/webpack.prod.js",
+                         "scripts/icons.js", "types/app.d.ts", "packages/ui/index.js",
+                         "packages/ui/node_modules/dep.js", "test/app.test.js",
+                         "fixtures/big.json", "cypress/e2e.js", "coverage/lcov.info",
+                         "dist/app.js", ".history/src/index.js", ".github/workflows/ci.yml",
+                         "node_modules/react/index.js", "docs/README.md"):
+            _write(project, rel_path, "x" * 1000)
+        return project
+
+    def test_analysis(self, project):
+        """Test which top-level directories are build input."""
+        included, excluded = analyze(str(project), env={})
+
+        assert included == ["packages", "scripts", "src", "tools", "types"]
+        assert excluded == [".github", ".history", "coverage", "cypress", "dist", "docs",
+                            "fixtures", "node_modules", "test"]
+
+    def test_env_options(self, project):
+        """Test BUILD_CONTEXT_INCLUDE, PACKAGE_JSON_PATH and APP_BUILD_DIR."""
+        (project / "apps" / "web").mkdir(parents=True)
+        (project / "apps" / "web" / "package.json").write_text("{}")
+
+        included, excluded = analyze(str(project), env={
+            "BUILD_CONTEXT_INCLUDE": "fixtures",
+            "PACKAGE_JSON_PATH": "apps/web/package.json",
+            "APP_BUILD_DIR": "tools",
+        })
+
+        assert {"apps", "fixtures"} <= set(included)
+        assert "tools" in excluded
+
+    def test_source_imports(self, project):
+        """Test that directories imported from kept sources stay, transitively."""
+        _write(project, "src/index.js", "import a from '../shared/a';\nimport './local';\n")
+        _write(project, "shared/a.js", 'const b = require("../lib/b");\n')
+        _write(project, "lib/b.scss", "@import './c'; .x { background: url(../static/x.png); }")
+        _write(project, "test/app.test.js", "import m from '../mocks/api';\n")
+        _write(project, "mocks/api.js")
+
+        included, excluded = analyze(str(project), env={})
+
+        assert {"lib", "shared"} <= set(included)
+        assert {"mocks", "test"} <= set(excluded)
+
+    def test_pnpm_workspace(self, project):
+        """Test that pnpm-workspace.yaml packages stay in the context."""
+        _write(project, "pnpm-workspace.yaml", "packages:\n  - 'libs/*'\n  - \"!libs/old\"\n")
+        _write(project, "libs/core/index.js")
+
+        assert "libs" in analyze(str(project), env={})[0]
+
+    def test_dockerignore_matching(self):
+        """Test Docker's rules: parent directories, ** and the last match winning."""
+        ignore = DockerIgnore(["# comment", "/docs", "**/*.snap", "test", "!test/keep.js"])
+
+        assert ignore.excluded("docs/README.md")
+        assert ignore.excluded("src/a/__snapshots__/b.snap")
+        assert ignore.excluded("test/app.test.js")
+        assert not ignore.excluded("test/keep.js")
+        assert not ignore.excluded("src/docs/index.js")
+        assert not ignore.prunable("test")
+        assert ignore.prunable("docs")
+
+    def test_writes_dockerignore_and_report(self, project, tmp_path, capsys):
+        """Test the generated .dockerignore and the size and upload time report."""
+        report_path = tmp_path / "context.json"
+        assert main([str(project), "--report", str(report_path), "--bandwidth-mbps", "8"]) == 0
+
+        lines = (project / ".dockerignore").read_text().splitlines()
+        assert "# Build input: packages, scripts, src, tools, types" in lines
+        assert {"test", "coverage", "dist", ".git", "node_modules", "**/node_modules",
+                "**/__snapshots__"} <= set(lines)
+
+        report = json.loads(report_path.read_text())
+        kept = ["src/index.js", "tools/webpack.prod.js", "scripts/icons.js", "types/app.d.ts",
+                "packages/ui/index.js"]
+        assert report["minimal"]["files"] == len(kept) + 4
+        assert report["baseline"]["files"] == 20
+        assert report["saved"]["size"] == report["baseline"]["size"] - report["minimal"]["size"]
+        assert report["saved"]["seconds"] == round(report["saved"]["size"] / 1_000_000, 2)
+        assert {"path": "test", "files": 1, "size": 1000} in report["excluded"]
+        assert "Build context: 20 files" in capsys.readouterr().out
+
+    def test_existing_dockerignore(self, project):
+        """Test that a hand-written .dockerignore is kept unless --force is given."""
+        (project / ".dockerignore").write_text("node_modules\n")
+
+        assert main([str(project)]) == 1
+        assert (project / ".dockerignore").read_text() == "node_modules\n"
+
+        assert main([str(project), "--force"]) == 0
+        assert main([str(project)]) == 0
+
+    def test_stdout_output(self, project, capsys):
+        """Test that --output - prints the .dockerignore and writes no file."""
+        assert main([str(project), "--output", "-", "--no-stats"]) == 0
+
+        assert capsys.readouterr().out.startswith("# Generated by build_context.py")
+        assert not (project / ".dockerignore").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,369 @@
+"""
+Fast-tier tests for the build shell scripts.
+
+This test suite runs server_config_gen.sh, build_app_info.sh, parse-secrets.sh
+and the dependency install/build steps of universal_build.sh directly against
+temporary copies of the test fixtures, with npm, pnpm, yarn, node and git
+stubbed out. These tests run without Podman and finish in seconds; the image
+builds stay in the slow tier.
+"""
+
+import json
+import os
+
+import pytest
+
+from fake_sentry import FakeSentry
+from synthetic_app import generate_dist
+
+SECRETS = """\
+# Build secrets
+TEST_APP_SECRET=sentry-token
+
+  SPACED_KEY  =value with spaces
+URL=https://example.com/?a=1&b=2
+not a variable
+"""
+
+
+class TestBuildScripts:
+    """Test suite for the build scripts run outside of an image build."""
+
+    @pytest.fixture
+    def workspace(self, script_workspace):
+        """fake-app copy with a build output holding an entry script."""
+        workspace = script_workspace()
+        workspace.run(["npm", "run", "build"])
+        return workspace
+
+    def _server_config(self, workspace, **env):
+        return workspace.run(["server_config_gen.sh"], APP_NAME="test-app", OUTPUT_DIR="dist", **env)
+
+    def test_caddyfile_default_profile(self, workspace):
+        """Test the default profile: browsing, named metrics servers, no early hints."""
+        self._server_config(workspace)
+
+        caddyfile = workspace.read("Caddyfile")
+        assert "name frontend" in caddyfile
+        assert "name metrics" in caddyfile
+        assert "path /apps/test-app*" in caddyfile
+        assert "root /srv/dist" in caddyfile
+        assert "browse" in caddyfile
+        assert "@app_entry" not in caddyfile
+        assert "rel=preload" not in caddyfile
+        assert "timeouts" not in caddyfile
+        assert "redir / /apps/chrome/index.html permanent" in caddyfile
+        assert workspace.read(".dockerignore") == "node_modules\n.git\n"
+
+    def test_caddyfile_env_route_skips_app_route(self, workspace):
+        """Test that the env route does not rewrite app requests when ENV_PUBLIC_PATH
+        is the app route or above it."""
+        self._server_config(workspace, ROUTE_PATH="/apps/test-app", CADDY_EARLY_HINTS="true")
+
+        caddyfile = workspace.read("Caddyfile")
+        env_match = caddyfile.split("@env_match {", 1)[1].split("}\n", 1)[0]
+        env_entry = caddyfile.split("@env_entry {", 1)[1].split("}\n", 1)[0]
+        assert "not path /apps/test-app*" in env_match
+        assert "not path /apps/test-app*" in env_entry
+        # The app route is matched on the request path, before any rewrite
+        assert caddyfile.index("@app_match {") < caddyfile.index("uri @env_match strip_prefix")
+
+    def test_caddyfile_early_hints(self, workspace):
+        """Test that CADDY_EARLY_HINTS=true adds the 103 and preload Link headers."""
+        self._server_config(workspace, CADDY_EARLY_HINTS="true")
+
+        caddyfile = workspace.read("Caddyfile")
+        assert "respond @app_entry 103" in caddyfile
+        assert 'Link "</apps/test-app/js/app.js>; rel=preload; as=script"' in caddyfile
+        assert "header @env_entry Link" in caddyfile
+
+    def test_caddyfile_production_profile(self, workspace):
+        """Test the production profile: no browsing, timeouts, sampled log, asset index."""
+        self._server_config(workspace, CADDY_PROFILE="production", CADDY_EARLY_HINTS="false")
+
+        caddyfile = workspace.read("Caddyfile")
+        assert "browse" not in caddyfile
+        assert "read_header 10s" in caddyfile
+        assert "sampling" in caddyfile
+        assert "@app_entry" not in caddyfile
+
+        asset_index = json.loads(workspace.read("dist", "asset-index.json"))
+        paths = [entry["path"] for entry in asset_index["files"]]
+        assert asset_index["file_count"] == len(paths)
+        assert {"index.html", "js/app.js", "app.info.json"} <= set(paths)
+
+    def test_existing_caddyfile_is_kept(self, workspace):
+        """Test that an app's own Caddyfile is not overwritten."""
+        with open(workspace.path("Caddyfile"), "w") as f:
+            f.write(":8000 {}\n")
+
+        result = self._server_config(workspace)
+
+        assert "Caddy config already exists, skipping generation" in result.stdout
+        assert workspace.read("Caddyfile") == ":8000 {}\n"
+
+    def test_invalid_caddy_profile_fails(self, workspace):
+        """Test that an unknown CADDY_PROFILE fails before anything is written."""
+        result = workspace.run(
+            ["server_config_gen.sh"], check=False,
+            APP_NAME="test-app", OUTPUT_DIR="dist", CADDY_PROFILE="fast",
+        )
+
+        assert result.returncode == 1
+        assert "unsupported CADDY_PROFILE 'fast'" in result.stderr
+        assert not workspace.calls("git")
+
+    def test_fingerprint_lint(self, workspace):
+        """Test that the unhashed entry script is reported, and fails the build in
+        FINGERPRINT_MODE=fail."""
+        result = self._server_config(workspace)
+
+        assert "Warning: index.html references mutable asset js/app.js" in result.stderr
+        report = json.loads(workspace.read("dist", "app.info.fingerprints.json"))
+        assert report["assets"] == {"index.html": "entry", "js/app.js": "mutable"}
+
+        result = workspace.run(
+            ["server_config_gen.sh"], check=False,
+            APP_NAME="test-app", OUTPUT_DIR="dist", FINGERPRINT_MODE="fail",
+        )
+        assert result.returncode == 1
+        assert "Error: index.html references mutable asset js/app.js" in result.stderr
+
+    def test_build_app_info(self, workspace):
+        """Test that build_app_info.sh writes app.info.json from the CI variables."""
+        workspace.run(
+            ["build_app_info.sh", "--output-dir", "dist"],
+            APP_VERSION="1.2.3", SOURCE_GIT_BRANCH="main", SOURCE_GIT_TAG="v1.2.3",
+        )
+
+        app_info = json.loads(workspace.read("dist", "app.info.json"))
+        assert app_info["app_name"] == "test-app"
+        assert app_info["node_version"] == ">=16.0.0"
+        assert app_info["app_version"] == "1.2.3"
+        assert app_info["src_branch"] == "main"
+        assert app_info["src_tag"] == "v1.2.3"
+        assert app_info["src_hash"] == "unknown"
+        deps_info = json.loads(workspace.read("dist", "app.info.deps.json"))
+        assert deps_info["lockfile"] == "package-lock.json"
+
+    def test_parse_secrets_exports_env(self, script_workspace, tmp_path):
+        """Test that parse-secrets.sh exports KEY=VALUE lines and skips the rest."""
+        workspace = script_workspace()
+        secrets_file = tmp_path / "secrets"
+        secrets_file.write_text(SECRETS)
+
+        result = workspace.run(
+            ["bash", "-c", "source build-tools/parse-secrets.sh >/dev/null && env"],
+            BUILD_SECRETS_FILE=str(secrets_file),
+        )
+
+        env = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+        assert env["TEST_APP_SECRET"] == "sentry-token"
+        assert env["SPACED_KEY"] == "value with spaces"
+        assert env["URL"] == "https://example.com/?a=1&b=2"
+        assert "sentry-token" not in result.stderr
+
+    def test_parse_secrets_missing_file(self, script_workspace, tmp_path):
+        """Test that a missing secrets file is reported without failing the build."""
+        workspace = script_workspace()
+
+        result = workspace.run(
+            ["bash", "-c", "source build-tools/parse-secrets.sh"],
+            BUILD_SECRETS_FILE=str(tmp_path / "missing"),
+        )
+
+        assert "Error: Secrets file not found" in result.stdout
+
+    def test_universal_build_npm(self, script_workspace, tmp_path):
+        """Test a full npm build: install, build, metadata and Caddyfile, Sentry from secrets."""
+        workspace = script_workspace()
+        secrets_file = tmp_path / "secrets"
+        secrets_file.write_text(SECRETS)
+
+        result = workspace.run(["universal_build.sh"], BUILD_SECRETS_FILE=str(secrets_file))
+
+        assert "Sentry: token found for TEST_APP" in result.stdout
+        assert workspace.calls("npm") == ["npm ci", "npm run build"]
+        assert json.loads(workspace.read("dist", "app.info.json"))["app_name"] == "test-app"
+        assert "js/app.js" in json.loads(workspace.read("dist", "assets.manifest.json"))["assets"]
+        assert "path /apps/test-app*" in workspace.read("Caddyfile")
+        assert "sentry-token" not in result.stdout + result.stderr
+
+    def test_universal_build_pnpm(self, script_workspace):
+        """Test that pnpm lockfiles install frozen and run PNPM_BUILD_SCRIPT."""
+        workspace = script_workspace("fake-pnpm-app")
+
+        workspace.run(["universal_build.sh"], PNPM_BUILD_SCRIPT="build-plugin",
+                      PNPM_STORE_DIR="/tmp/pnpm-store")
+
+        assert workspace.calls("pnpm") == [
+            "pnpm install --frozen-lockfile --store-dir /tmp/pnpm-store",
+            "pnpm run build-plugin",
+        ]
+        assert not workspace.calls("npm")
+
+    def test_multiple_lockfiles_fail(self, script_workspace):
+        """Test that a second lockfile fails the build before anything is installed."""
+        workspace = script_workspace()
+        with open(workspace.path("yarn.lock"), "w") as f:
+            f.write("# yarn lockfile v1\n")
+
+        result = workspace.run(["universal_build.sh"], check=False)
+
+        assert result.returncode == 1
+        assert "multiple supported package lock files found" in result.stderr
+        assert not workspace.calls("npm")
+        assert not workspace.calls("yarn")
+
+    def test_build_step_reuses_current_install(self, script_workspace):
+        """Test that the build step skips the install when the lockfile is unchanged."""
+        workspace = script_workspace()
+
+        workspace.run(["universal_build.sh", "install"])
+        workspace.run(["universal_build.sh", "build"])
+        with open(workspace.path("package-lock.json"), "a") as f:
+            f.write("\n")
+        workspace.run(["universal_build.sh", "build"])
+
+        assert workspace.calls("npm") == ["npm ci", "npm run build", "npm ci", "npm run build"]
+
+    def test_new_patch_invalidates_install(self, script_workspace):
+        """Test that a file added under a manifest directory (patches/) reinstalls."""
+        workspace = script_workspace()
+
+        workspace.run(["universal_build.sh", "install"])
+        os.makedirs(workspace.path("patches"))
+        with open(workspace.path("patches", "left-pad+1.3.0.patch"), "w") as f:
+            f.write("--- a/index.js\n+++ b/index.js\n")
+        workspace.run(["universal_build.sh", "build"])
+        workspace.run(["universal_build.sh", "build"])
+
+        assert workspace.calls("npm") == ["npm ci", "npm ci", "npm run build", "npm run build"]
+
+    def test_universal_build_strips_sourcemaps(self, script_workspace):
+        """Test that SOURCEMAP_MODE=strip moves the maps and the build trace out of dist."""
+        workspace = script_workspace()
+        generate_dist(workspace.path("synthetic-dist"), file_count=40, seed=3, sourcemaps=True)
+
+        workspace.run(["universal_build.sh"], SOURCEMAP_MODE="strip", SOURCEMAP_DIR="sourcemaps")
+
+        manifest = json.loads(workspace.read("sourcemaps", "sourcemaps.manifest.json"))
+        assert manifest["files"]
+        assert manifest["comments_stripped"] == len(manifest["files"])
+        inventory = workspace.read("dist", "app.info.assets.json")
+        assert ".map" not in inventory
+        assert "sourceMappingURL" not in workspace.read("dist", manifest["files"][0]["source"])
+
+        # The build trace goes next to the maps, not into the served output
+        trace = json.loads(workspace.read("sourcemaps", "build-trace.json"))
+        events = {event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"}
+        for name in ("install", "build", "npm ci", "npm run build", "server_config"):
+            assert events[name]["args"]["exit_code"] == 0, f"{name} did not exit 0"
+        assert not os.path.exists(workspace.path("dist", "build-trace.json"))
+
+    def test_universal_build_uploads_sourcemaps(self, script_workspace, tmp_path):
+        """Test the Sentry upload with the secrets-file token, skipped on a rebuild."""
+        workspace = script_workspace()
+        generate_dist(workspace.path("synthetic-dist"), file_count=20, seed=4, sourcemaps=True)
+        secrets_file = tmp_path / "secrets"
+        secrets_file.write_text(SECRETS)
+
+        with FakeSentry(token="sentry-token") as sentry:
+            env = {
+                "BUILD_SECRETS_FILE": str(secrets_file), "SOURCEMAP_MODE": "split",
+                "SOURCEMAP_UPLOAD": "true", "SOURCEMAP_LEDGER": str(tmp_path / "ledger.json"),
+                "SENTRY_URL": sentry.url, "SENTRY_ORG": "org", "SENTRY_PROJECT": "test-app",
+                "SENTRY_RELEASE": "abc123",
+            }
+            workspace.run(["universal_build.sh"], **env)
+            uploaded = sentry.uploads("abc123")
+            result = workspace.run(["universal_build.sh"], **env)
+
+        assert uploaded
+        assert all(name.startswith("~/apps/test-app/") for name in uploaded)
+        assert sentry.uploads("abc123") == uploaded
+        assert f"uploaded 0, skipped {len(uploaded)} unchanged" in result.stdout
+        assert json.loads(workspace.read("dist", "app.info.sourcemaps.json"))["files"]
+
+    def test_workspace_build(self, script_workspace, tmp_path):
+        """Test one install and a build, app.info.json and route per workspace app."""
+        workspace = script_workspace("fake-workspace-app")
+        secrets_file = tmp_path / "secrets"
+        secrets_file.write_text("APP_ONE_SECRET=sentry-token\n")
+
+        result = workspace.run(["universal_build.sh"], BUILD_WORKSPACES="true",
+                               BUILD_SECRETS_FILE=str(secrets_file))
+
+        assert workspace.calls("npm")[0] == "npm ci"
+        assert sorted(workspace.calls("npm")[1:]) == [
+            "npm run build --workspace packages/app-one",
+            "npm run build --workspace packages/app-two",
+        ]
+        assert "Sentry: token found for app-one" in result.stdout
+        assert "sentry-token" not in result.stdout + result.stderr
+        for app in ("app-one", "app-two"):
+            info = json.loads(workspace.read("dist", app, "app.info.json"))
+            assert info["app_name"] == app
+            assert json.loads(workspace.read("dist", app, "app.info.fingerprints.json"))["assets"]
+        caddyfile = workspace.read("Caddyfile")
+        assert "path /apps/app-one*" in caddyfile
+        assert "root /srv/dist/app-two" in caddyfile
+        assert "ENV_PUBLIC_PATH" not in caddyfile
+
+    @pytest.mark.parametrize(("lockfile", "workspace_file", "build_call"), [
+        ("yarn.lock", None, "yarn workspace @test/app-one run build:prod"),
+        ("pnpm-lock.yaml", "pnpm-workspace.yaml", "pnpm --filter @test/app-one run build"),
+    ])
+    def test_workspace_build_package_managers(self, script_workspace, lockfile, workspace_file,
+                                              build_call):
+        """Test the yarn and pnpm workspace commands and WORKSPACE_PACKAGES."""
+        workspace = script_workspace("fake-workspace-app")
+        os.remove(workspace.path("package-lock.json"))
+        with open(workspace.path(lockfile), "w") as f:
+            f.write("lockfileVersion: '9.0'\n" if lockfile == "pnpm-lock.yaml" else "")
+        if workspace_file:
+            with open(workspace.path(workspace_file), "w") as f:
+                f.write("packages:\n  - 'packages/*'\n")
+
+        workspace.run(["universal_build.sh"], BUILD_WORKSPACES="true",
+                      WORKSPACE_PACKAGES="app-one")
+
+        tool = build_call.split()[0]
+        assert [call for call in workspace.calls(tool) if " run " in call] == [build_call]
+        assert os.path.isfile(workspace.path("dist", "app-one", "app.info.json"))
+        assert not os.path.exists(workspace.path("dist", "app-two"))
+
+    @pytest.mark.parametrize(("jobs", "expected"), [
+        ("1", ["start packages/app-one", "end packages/app-one",
+               "start packages/app-two", "end packages/app-two"]),
+        ("2", ["start", "start", "end", "end"]),
+    ])
+    def test_workspace_build_jobs(self, script_workspace, jobs, expected):
+        """Test that BUILD_JOBS caps the number of concurrent package builds."""
+        workspace = script_workspace("fake-workspace-app")
+
+        workspace.run(["universal_build.sh"], BUILD_WORKSPACES="true", BUILD_JOBS=jobs,
+                      STUB_BUILD_SLEEP="0.5")
+
+        with open(workspace.calls_file + ".builds") as f:
+            builds = f.read().splitlines()
+        if jobs == "2":
+            builds = [line.split()[0] for line in builds]
+        assert builds == expected
+
+    def test_workspace_build_failure(self, script_workspace):
+        """Test that a failed package build fails the build after all builds ran."""
+        workspace = script_workspace("fake-workspace-app")
+
+        result = workspace.run(["universal_build.sh"], check=False, BUILD_WORKSPACES="true",
+                               BUILD_JOBS="1", STUB_BUILD_FAIL="packages/app-one")
+
+        assert result.returncode == 1
+        assert "build failed in packages/app-one" in result.stdout
+        assert "Exiting; workspace builds failed" in result.stderr
+        assert "npm run build --workspace packages/app-two" in workspace.calls("npm")
+        assert not os.path.exists(workspace.path("Caddyfile"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
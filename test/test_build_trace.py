@@ -0,0 +1,100 @@
+"""
+Tests for build_trace.py, the build phase tracer used by universal_build.sh.
+
+This test suite verifies that subcommands are recorded with their exit code
+and peak RSS, that phase begin/end events become complete Chrome trace
+events (including phases left open by a failed build), and that the summary
+fits on one line. These tests run without Podman — they use a temp event file.
+"""
+
+import json
+import sys
+
+import pytest
+from build_trace import complete_events, format_summary, load_events, main, run_command
+
+
+class TestBuildTrace:
+    """Test suite for the build phase tracer."""
+
+    @pytest.fixture
+    def events_file(self, tmp_path):
+        return str(tmp_path / "events.jsonl")
+
+    def test_records_exit_code_and_peak_rss(self, events_file):
+        """Test that a command's exit code and peak RSS are recorded."""
+        allocate = "x = bytearray(64 * 1024 * 1024); import sys; sys.exit(3)"
+
+        assert run_command(events_file, "allocate", [sys.executable, "-c", allocate]) == 3
+
+        [event] = load_events(events_file)
+        assert event["name"] == "allocate"
+        assert event["cat"] == "command"
+        assert event["exit_code"] == 3
+        assert event["peak_rss_kb"] >= 64 * 1024
+        assert event["dur"] > 0
+
+    def test_missing_command_exits_127(self, events_file):
+        """Test that a command that cannot be started is recorded as exit 127."""
+        assert run_command(events_file, "missing", ["/nonexistent/command"]) == 127
+        assert load_events(events_file)[0]["exit_code"] == 127
+
+    def test_phases_nest_commands(self):
+        """Test that phases become complete events with the peak RSS of their commands."""
+        events = [
+            {"ph": "B", "name": "install", "cat": "phase", "ts": 100},
+            {"ph": "X", "name": "npm ci", "cat": "command", "ts": 110, "dur": 50,
+             "exit_code": 0, "peak_rss_kb": 2048},
+            {"ph": "E", "name": "install", "cat": "phase", "ts": 200, "exit_code": 0},
+            {"ph": "B", "name": "build", "cat": "phase", "ts": 200},
+        ]
+
+        completed = complete_events(events, end_ts=400, exit_code=2)
+
+        assert [(e["name"], e["ts"], e["dur"], e["exit_code"]) for e in completed] == [
+            ("install", 100, 100, 0),
+            ("npm ci", 110, 50, 0),
+            ("build", 200, 200, 2),
+        ]
+        assert completed[0]["peak_rss_kb"] == 2048
+        assert completed[2]["peak_rss_kb"] is None
+
+    def test_summary_is_one_line(self):
+        """Test the one-line summary: durations, shares, failures and peak RSS."""
+        completed = complete_events([
+            {"ph": "X", "name": "install", "cat": "phase", "ts": 0, "dur": 3_000_000,
+             "exit_code": 0, "peak_rss_kb": None},
+            {"ph": "X", "name": "npm run build", "cat": "command", "ts": 3_000_000,
+             "dur": 1_000_000, "exit_code": 1, "peak_rss_kb": 512 * 1024},
+            {"ph": "X", "name": "build", "cat": "phase", "ts": 3_000_000, "dur": 1_000_000,
+             "exit_code": 1, "peak_rss_kb": None},
+        ])
+
+        summary = format_summary(completed, "dist/build-trace.json")
+
+        assert "\n" not in summary
+        assert summary == (
+            "Build trace: total 4.0s | install 3.0s (75%) | build 1.0s (25%) exit=1"
+            " | peak RSS 512MB in npm run build | trace: dist/build-trace.json"
+        )
+
+    def test_cli_writes_chrome_trace(self, events_file, tmp_path, capsys):
+        """Test that exec and render produce a loadable Chrome trace file."""
+        assert main([
+            "exec", "--events", events_file, "--name", "app_info", "--cat", "phase",
+            "--", sys.executable, "-c", "pass",
+        ]) == 0
+
+        output = tmp_path / "build-trace.json"
+        assert main(["render", "--events", events_file, "--output", str(output)]) == 0
+
+        trace = json.loads(output.read_text())
+        [event] = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        assert event["name"] == "app_info"
+        assert {"pid", "tid", "ts", "dur"} <= set(event)
+        assert event["args"]["exit_code"] == 0
+        assert capsys.readouterr().out.startswith("Build trace: total")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
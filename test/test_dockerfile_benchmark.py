@@ -0,0 +1,137 @@
+"""
+HTTP load benchmarks for the built Caddy image.
+
+This suite:
+1. Builds the image once per Caddy profile (default and production)
+2. Starts it locally with podman
+3. Drives it with a concurrent, weighted mix of index.html, static assets,
+   404s and ENV_PUBLIC_PATH routes
+4. Records RPS, p50/p95/p99 latency and bytes transferred to a JSON results file
+5. Only once benchmarks/caddy-baseline.json is committed, fails when a profile
+   regresses beyond its tolerance. No baseline is committed yet, so this is a
+   recorded benchmark: the gate is skipped locally and fails under CI, and
+   make bench is not run by CI
+
+Environment:
+    BENCHMARK_RESULTS          Results file (default: benchmark-results/caddy.json)
+    BENCHMARK_BASELINE         Baseline file (default: benchmarks/caddy-baseline.json)
+    BENCHMARK_TOLERANCE        Allowed relative regression (default: 0.2)
+    BENCHMARK_REQUESTS         Requests per run (default: 2000)
+    BENCHMARK_CONCURRENCY      Concurrent workers (default: 16)
+    BENCHMARK_UPDATE_BASELINE  Set to 1 to overwrite the baseline with this run
+"""
+
+import os
+
+import pytest
+
+from benchmark_harness import (
+    DEFAULT_TOLERANCE,
+    compare_to_baseline,
+    load_json,
+    missing_baseline,
+    run_load,
+    write_json,
+)
+from container_harness import remove_container, start_container, unique_name
+
+TEST_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.environ.get(
+    "BENCHMARK_RESULTS",
+    os.path.join(TEST_SCRIPT_DIR, "benchmark-results", "caddy.json")
+)
+BASELINE_PATH = os.environ.get(
+    "BENCHMARK_BASELINE",
+    os.path.join(TEST_SCRIPT_DIR, "benchmarks", "caddy-baseline.json")
+)
+
+
+@pytest.mark.slow
+class TestDockerfileBenchmark:
+    """Load benchmarks for the Caddy image, one run per Caddy profile."""
+
+    CONTAINER_NAME = unique_name("test-bench-container")
+    APP_NAME = "test-app"
+    CONTAINER_PORT = 8000
+    ENV_PUBLIC_PATH = "/bench/public"
+
+    # Weighted mix approximating console traffic: mostly static assets,
+    # some entry-point HTML, a trickle of misses and env-routed requests.
+    REQUEST_MIX = [
+        {"name": "index_html", "path": f"/apps/{APP_NAME}/index.html", "weight": 20, "expected_status": 200},
+        {"name": "js_chunk", "path": f"/apps/{APP_NAME}/js/app.js", "weight": 35, "expected_status": 200},
+        {"name": "css_chunk", "path": f"/apps/{APP_NAME}/css/app.css", "weight": 20, "expected_status": 200},
+        {"name": "not_found", "path": f"/apps/{APP_NAME}/missing-chunk.js", "weight": 10, "expected_status": 404},
+        {"name": "env_public_path", "path": f"{ENV_PUBLIC_PATH}/index.html", "weight": 15, "expected_status": 200},
+    ]
+
+    @classmethod
+    def teardown_class(cls):
+        """Remove the container (the images are removed after the session)."""
+        remove_container(cls.CONTAINER_NAME)
+
+    def _start_container(self, image_name):
+        """Start the benchmark container with a custom ENV_PUBLIC_PATH."""
+        host_ports = start_container(
+            image_name,
+            self.CONTAINER_NAME,
+            [self.CONTAINER_PORT],
+            {"ENV_PUBLIC_PATH": self.ENV_PUBLIC_PATH},
+        )
+        self.host_port = host_ports[self.CONTAINER_PORT]
+
+    @pytest.mark.parametrize("profile", ["default", "production"])
+    def test_caddy_throughput(self, profile, image_builder):
+        """Benchmark a Caddy profile; gated only against a committed baseline."""
+        print(f"\n=== Benchmarking CADDY_PROFILE={profile} ===")
+
+        image_name = image_builder.build(build_args={"CADDY_PROFILE": profile})
+        self._start_container(image_name)
+
+        base_url = f"http://localhost:{self.host_port}"
+        concurrency = int(os.environ.get("BENCHMARK_CONCURRENCY", "16"))
+        total_requests = int(os.environ.get("BENCHMARK_REQUESTS", "2000"))
+
+        # Warm up connections and the OS page cache before measuring
+        run_load(base_url, self.REQUEST_MIX, total_requests=100, concurrency=concurrency, seed=1)
+        result = run_load(
+            base_url,
+            self.REQUEST_MIX,
+            total_requests=total_requests,
+            concurrency=concurrency
+        )
+
+        print(
+            f"  rps={result['rps']} p50={result['latency_ms']['p50']}ms "
+            f"p95={result['latency_ms']['p95']}ms p99={result['latency_ms']['p99']}ms "
+            f"bytes={result['bytes_transferred']} errors={result['errors']}"
+        )
+
+        results = load_json(RESULTS_PATH)
+        results[profile] = result
+        write_json(RESULTS_PATH, results)
+
+        assert result["errors"] == 0, \
+            f"{result['errors']} requests returned an unexpected status: {result['routes']}"
+
+        if os.environ.get("BENCHMARK_UPDATE_BASELINE") == "1":
+            baseline = load_json(BASELINE_PATH)
+            baseline[profile] = result
+            write_json(BASELINE_PATH, baseline)
+            print(f"✓ Baseline for {profile} updated at {BASELINE_PATH}")
+            return
+
+        baseline = load_json(BASELINE_PATH).get(profile)
+        if baseline is None:
+            missing_baseline(BASELINE_PATH, profile, "bench-baseline")
+
+        tolerance = float(os.environ.get("BENCHMARK_TOLERANCE", DEFAULT_TOLERANCE))
+        regressions = compare_to_baseline(result, baseline, tolerance)
+        assert not regressions, \
+            f"CADDY_PROFILE={profile} regressed against baseline: {'; '.join(regressions)}"
+
+        print(f"✓ CADDY_PROFILE={profile} is within {tolerance:.0%} of its baseline")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -13,11 +13,7 @@ This test suite verifies that:
 """
 
 import json
-import os
-import shutil
 import subprocess
-import tempfile
-import uuid
 
 import pytest
 
@@ -25,338 +21,79 @@ import pytest
 class TestDockerfileHermetic:
     """Test suite for Dockerfile.hermetic structure and build."""
 
-    IMAGE_NAME = "test-frontend-builder-hermetic:test"
-    CONTAINER_NAME = "test-hermetic-container"
     APP_NAME = "test-app"
 
-    @classmethod
-    def setup_class(cls):
-        """Build the Docker image once before running all tests."""
-        print("\n=== Building Hermetic Docker image for tests ===")
+    @pytest.fixture(scope="class", autouse=True)
+    def image(self, request, image_builder, image_fs):
+        """Build (or reuse) the hermetic image once before running all tests."""
+        request.cls.image_builder = image_builder
+        request.cls.image_fs = staticmethod(image_fs)
+        request.cls.image_name = self._build_image(image_builder)
 
-        # Get paths
-        test_script_dir = os.path.dirname(__file__)
-        repo_root = os.path.abspath(os.path.join(test_script_dir, ".."))
-        cls.test_dir = os.path.join(test_script_dir, "test-fixtures", "fake-app")
+    @staticmethod
+    def _build_image(image_builder, build_args=None):
+        """Build the hermetic image with network access disabled (offline build).
 
-        # Prepare environment
-        cls._prepare_test_env(cls.test_dir, repo_root)
-
-        # Build hermetic image
-        print("Building hermetic image (offline build)")
-        cls._build_image(cls.test_dir)
-
-        print(f"✓ Hermetic image {cls.IMAGE_NAME} built successfully and ready for tests")
-
-    @classmethod
-    def teardown_class(cls):
-        """Clean up: remove the Docker image and copied files."""
-        print("\n=== Cleaning up hermetic tests ===")
-
-        # Remove the Docker image
-        subprocess.run(
-            ["podman", "rmi", "-f", cls.IMAGE_NAME],
-            capture_output=True
-        )
-        print(f"✓ Image {cls.IMAGE_NAME} removed")
-
-        # Remove copied Dockerfile
-        cls._cleanup_test_env(cls.test_dir)
-        print("✓ Removed copied Dockerfile.hermetic")
-
-    @classmethod
-    def _prepare_test_env(cls, test_dir, repo_root):
-        """Prepare test environment by copying Dockerfile.hermetic."""
-        # Copy Dockerfile.hermetic to test directory
-        dockerfile_src = os.path.join(repo_root, "Dockerfile.hermetic")
-        dockerfile_dest = os.path.join(test_dir, "Dockerfile.hermetic")
-        shutil.copy(dockerfile_src, dockerfile_dest)
-
-        # Initialize git repository if it doesn't exist (required by npm build)
-        git_dir = os.path.join(test_dir, ".git")
-        if not os.path.exists(git_dir):
-            subprocess.run(["git", "init"], cwd=test_dir, check=True)
-            subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=test_dir, check=True)
-            subprocess.run(["git", "config", "user.name", "Test User"], cwd=test_dir, check=True)
-            subprocess.run(["git", "add", "."], cwd=test_dir, check=True)
-            subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=test_dir, check=True)
-
-    @classmethod
-    def _cleanup_test_env(cls, test_dir):
-        """Clean up test environment."""
-        dockerfile_dest = os.path.join(test_dir, "Dockerfile.hermetic")
-        if os.path.exists(dockerfile_dest):
-            os.remove(dockerfile_dest)
-
-    @classmethod
-    def _build_image(cls, test_dir, build_args=None, image_name=None):
-        """Build Docker image with optional build args.
-
-        Enforces offline/hermetic build by disabling network access during build.
-
-        Args:
-            test_dir: Directory containing the Dockerfile
-            build_args: Optional dict of build arguments
-            image_name: Optional custom image name (defaults to cls.IMAGE_NAME)
+        Returns:
+            str: Name of the built image
         """
-        target_image_name = image_name or cls.IMAGE_NAME
-
-        build_cmd = [
-            "podman", "build",
-            "-t", target_image_name,
-            "-f", "Dockerfile.hermetic",
-            "--network=none"  # Enforce offline/hermetic build
-        ]
-
-        # Add build args if provided
-        if build_args:
-            for key, value in build_args.items():
-                build_cmd.extend(["--build-arg", f"{key}={value}"])
-
-        build_cmd.append(".")
-
-        try:
-            result = subprocess.run(
-                build_cmd,
-                cwd=test_dir,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout for build
-            )
-        except subprocess.TimeoutExpired as e:
-            # Provide clear error message with available output
-            # Since text=True, stdout/stderr are already strings, not bytes
-            stdout = e.stdout if e.stdout else "No stdout"
-            stderr = e.stderr if e.stderr else "No stderr"
-            pytest.fail(
-                "Hermetic Docker build exceeded 5 minute timeout.\n"
-                "This may indicate the build is hanging or trying to access network.\n"
-                f"STDOUT:\n{stdout}\n\n"
-                f"STDERR:\n{stderr}"
-            )
-
-        if result.returncode != 0:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-            pytest.fail(f"Failed to build hermetic Docker image: {result.stderr}")
-
-        return result
+        return image_builder.build(
+            dockerfile="Dockerfile.hermetic",
+            build_args=build_args,
+            extra_args=["--network=none"],  # Enforce offline/hermetic build
+        )
 
     def _file_exists_in_image(self, file_path, image_name=None):
         """Check if a file exists in the image.
 
         Args:
             file_path: Path to check in the image
-            image_name: Optional custom image name (defaults to self.IMAGE_NAME)
+            image_name: Optional custom image name (defaults to self.image_name)
 
         Returns:
             bool: True if file exists, False otherwise
         """
-        target_image_name = image_name or self.IMAGE_NAME
-        # Use podman create + podman cp instead of running commands in minimal image
-        # Create a temporary container without starting it (use unique name to avoid conflicts)
-        container_name = f"temp-check-{uuid.uuid4().hex[:8]}"
-        create_result = subprocess.run(
-            ["podman", "create", "--name", container_name, target_image_name],
-            capture_output=True,
-            text=True
-        )
-        if create_result.returncode != 0:
-            return False
-
-        try:
-            # Try to copy the file to a temp location to check existence
-            with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-                tmp_path = tmp_file.name
-
-            try:
-                cp_result = subprocess.run(
-                    ["podman", "cp", f"{container_name}:{file_path}", tmp_path],
-                    capture_output=True,
-                    text=True
-                )
-                return cp_result.returncode == 0
-            finally:
-                # Clean up temp file
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-        finally:
-            # Clean up temporary container
-            subprocess.run(
-                ["podman", "rm", "-f", container_name],
-                capture_output=True,
-                text=True
-            )
+        return self.image_fs(image_name or self.image_name).exists(file_path)
 
     def _read_file_from_image(self, file_path, image_name=None):
         """Read a file from the image.
 
         Args:
             file_path: Path to read in the image
-            image_name: Optional custom image name (defaults to self.IMAGE_NAME)
+            image_name: Optional custom image name (defaults to self.image_name)
 
         Returns:
             str: File content if successful, None otherwise
         """
-        target_image_name = image_name or self.IMAGE_NAME
-        # Use podman create + podman cp instead of running cat in minimal image
-        # Create a temporary container without starting it (use unique name to avoid conflicts)
-        container_name = f"temp-read-{uuid.uuid4().hex[:8]}"
-        create_result = subprocess.run(
-            ["podman", "create", "--name", container_name, target_image_name],
-            capture_output=True,
-            text=True
-        )
-        if create_result.returncode != 0:
-            return None
-
-        try:
-            # Create a temporary file to copy content to
-            with tempfile.NamedTemporaryFile(mode='r', delete=False) as tmp_file:
-                tmp_path = tmp_file.name
-
-            try:
-                # Copy the file from container to host
-                cp_result = subprocess.run(
-                    ["podman", "cp", f"{container_name}:{file_path}", tmp_path],
-                    capture_output=True,
-                    text=True
-                )
-                if cp_result.returncode != 0:
-                    return None
-
-                # Read the file from host
-                with open(tmp_path) as f:
-                    return f.read()
-            finally:
-                # Clean up temporary file
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-        finally:
-            # Clean up temporary container
-            subprocess.run(
-                ["podman", "rm", "-f", container_name],
-                capture_output=True,
-                text=True
-            )
+        return self.image_fs(image_name or self.image_name).read(file_path)
 
     def _list_directory_in_image(self, dir_path, image_name=None):
         """List files in a directory in the image.
 
         Args:
             dir_path: Directory path to list in the image
-            image_name: Optional custom image name (defaults to self.IMAGE_NAME)
+            image_name: Optional custom image name (defaults to self.image_name)
 
         Returns:
             list: List of filenames if successful, None otherwise
         """
-        target_image_name = image_name or self.IMAGE_NAME
-        # Use podman create + podman cp instead of running ls in minimal image
-        # Create a temporary container without starting it (use unique name to avoid conflicts)
-        container_name = f"temp-list-{uuid.uuid4().hex[:8]}"
-        create_result = subprocess.run(
-            ["podman", "create", "--name", container_name, target_image_name],
-            capture_output=True,
-            text=True
-        )
-        if create_result.returncode != 0:
-            return None
-
-        try:
-            # Create a temporary directory to copy content to
-            tmp_dir = tempfile.mkdtemp()
-
-            try:
-                # Copy the directory from container to host
-                cp_result = subprocess.run(
-                    ["podman", "cp", f"{container_name}:{dir_path}", tmp_dir],
-                    capture_output=True,
-                    text=True
-                )
-                if cp_result.returncode != 0:
-                    return None
-
-                # List files in the copied directory
-                # The copied dir_path will be inside tmp_dir
-                copied_path = os.path.join(tmp_dir, os.path.basename(dir_path))
-                if os.path.isdir(copied_path):
-                    return os.listdir(copied_path)
-                else:
-                    # If it's a file, return the parent directory listing
-                    return os.listdir(tmp_dir)
-            finally:
-                # Clean up temporary directory
-                if os.path.exists(tmp_dir):
-                    shutil.rmtree(tmp_dir)
-        finally:
-            # Clean up temporary container
-            subprocess.run(
-                ["podman", "rm", "-f", container_name],
-                capture_output=True,
-                text=True
-            )
+        return self.image_fs(image_name or self.image_name).listdir(dir_path)
 
     def _get_image_labels(self, image_name=None):
         """Get labels from the Docker image.
 
-        Labels can be stored in different locations depending on Podman/Docker version
-        and whether inspecting an image or container:
-        - data[0]["Labels"] (older format or containers)
-        - data[0]["Config"]["Labels"] (newer format for images)
-
         Args:
-            image_name: Optional custom image name (defaults to self.IMAGE_NAME)
+            image_name: Optional custom image name (defaults to self.image_name)
         """
-        target_image_name = image_name or self.IMAGE_NAME
-        result = subprocess.run(
-            ["podman", "inspect", target_image_name],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode != 0:
-            return {}
-
-        try:
-            data = json.loads(result.stdout)
-            if not data or len(data) == 0:
-                return {}
-
-            # Try root-level Labels first (containers, older format)
-            if "Labels" in data[0] and data[0]["Labels"]:
-                return data[0]["Labels"]
-
-            # Fall back to Config.Labels (images, newer format)
-            return data[0].get("Config", {}).get("Labels", {})
-
-        except (json.JSONDecodeError, KeyError, IndexError):
-            return {}
-        except Exception:
-            # Catch any other unexpected errors
-            return {}
+        return self.image_fs(image_name or self.image_name).labels
 
     def _get_image_user(self, image_name=None):
         """Get the user the container runs as.
 
         Args:
-            image_name: Optional custom image name (defaults to self.IMAGE_NAME)
+            image_name: Optional custom image name (defaults to self.image_name)
         """
-        target_image_name = image_name or self.IMAGE_NAME
-        result = subprocess.run(
-            ["podman", "inspect", target_image_name],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode != 0:
-            return None
-
-        try:
-            data = json.loads(result.stdout)
-            if data and len(data) > 0:
-                config = data[0].get("Config", {})
-                return config.get("User", "")
-        except (json.JSONDecodeError, KeyError, IndexError):
-            return None
-        return None
+        return self.image_fs(image_name or self.image_name).user
 
     # ============= Filesystem Structure Tests =============
 
@@ -484,7 +221,7 @@ class TestDockerfileHermetic:
         # Try to run node command directly - should fail if node is absent
         # Note: ubi-micro doesn't have 'which', so we try to execute node directly
         result = subprocess.run(
-            ["podman", "run", "--rm", self.IMAGE_NAME, "node", "--version"],
+            ["podman", "run", "--rm", self.image_name, "node", "--version"],
             capture_output=True,
             text=True
         )
@@ -538,7 +275,7 @@ class TestDockerfileHermetic:
         print("\n=== Testing runtime user ID ===")
 
         result = subprocess.run(
-            ["podman", "run", "--rm", self.IMAGE_NAME, "id", "-u"],
+            ["podman", "run", "--rm", self.image_name, "id", "-u"],
             capture_output=True,
             text=True
         )
@@ -554,15 +291,15 @@ class TestDockerfileHermetic:
     def test_offline_build_succeeds(self):
         """Test that the hermetic build uses --offline flag successfully.
 
-        This is verified by the successful build in setup_class, which uses
+        This is verified by the successful build in the class fixture, which uses
         npm ci --offline. This test just confirms the image was built.
         """
         print("\n=== Testing offline build ===")
 
-        # If we got here, the image was built successfully in setup_class
+        # If we got here, the image was built successfully by the class fixture
         # using npm ci --offline, so the test passes
         result = subprocess.run(
-            ["podman", "image", "exists", self.IMAGE_NAME],
+            ["podman", "image", "exists", self.image_name],
             capture_output=True
         )
 
@@ -572,37 +309,23 @@ class TestDockerfileHermetic:
     def test_npm_ci_args_build_arg(self):
         """Test that NPM_CI_ARGS build argument can be used.
 
-        NOTE: This test builds its own image with custom build args,
+        NOTE: This test uses its own image with custom build args,
         separate from the shared image used by other tests.
         """
         print("\n=== Testing NPM_CI_ARGS build argument ===")
-        print("Note: Building separate image with custom NPM_CI_ARGS...")
-
-        custom_image_name = "test-frontend-builder-hermetic-custom:test"
-
-        try:
-            # Build with custom NPM_CI_ARGS
-            build_args = {"NPM_CI_ARGS": "--legacy-peer-deps"}
-
-            # Build with custom image name (no class mutation!)
-            self._build_image(self.test_dir, build_args, image_name=custom_image_name)
 
-            # Verify the image was built
-            result = subprocess.run(
-                ["podman", "image", "exists", custom_image_name],
-                capture_output=True
-            )
-            assert result.returncode == 0, "Custom hermetic image was not built"
+        # Build with custom NPM_CI_ARGS
+        build_args = {"NPM_CI_ARGS": "--legacy-peer-deps"}
+        custom_image_name = self._build_image(self.image_builder, build_args)
 
-            print("✓ NPM_CI_ARGS build argument works correctly")
+        # Verify the image was built
+        result = subprocess.run(
+            ["podman", "image", "exists", custom_image_name],
+            capture_output=True
+        )
+        assert result.returncode == 0, "Custom hermetic image was not built"
 
-        finally:
-            # Clean up the custom image
-            subprocess.run(
-                ["podman", "rmi", "-f", custom_image_name],
-                capture_output=True
-            )
-            print(f"✓ Cleaned up custom image {custom_image_name}")
+        print("✓ NPM_CI_ARGS build argument works correctly")
 
     # ============= Security Tests =============
 
@@ -610,16 +333,8 @@ class TestDockerfileHermetic:
         """Test that hermetic image is reasonably small (using ubi-micro base)."""
         print("\n=== Testing image size ===")
 
-        result = subprocess.run(
-            ["podman", "image", "inspect", self.IMAGE_NAME, "--format", "{{.Size}}"],
-            capture_output=True,
-            text=True
-        )
-
-        assert result.returncode == 0, "Failed to get image size"
-
         # Size is in bytes
-        size_bytes = int(result.stdout.strip())
+        size_bytes = int(self.image_fs(self.image_name).inspect["Size"])
         size_mb = size_bytes / (1024 * 1024)
 
         print(f"Image size: {size_mb:.2f} MB")
@@ -641,7 +356,7 @@ class TestDockerfileHermetic:
 
         # Try to read a file with read-only filesystem (stronger test than just ls)
         result = subprocess.run(
-            ["podman", "run", "--rm", "--read-only", self.IMAGE_NAME, "cat", "/srv/dist/index.html"],
+            ["podman", "run", "--rm", "--read-only", self.image_name, "cat", "/srv/dist/index.html"],
             capture_output=True,
             text=True
         )
@@ -0,0 +1,89 @@
+"""
+Image size tracking for the Dockerfile and Dockerfile.hermetic images.
+
+This suite:
+1. Builds (or reuses) both images
+2. Breaks their size down by layer (podman history) and by top-level
+   directory group (/srv/dist, /licenses, /etc/caddy, /srv, base)
+3. Records the breakdown to a JSON results file
+4. Fails when the image, a layer or a directory group grew beyond the
+   tolerance of its stored baseline; without a baseline entry the run is
+   skipped, or fails under CI
+
+Environment:
+    IMAGE_SIZE_RESULTS          Results file (default: benchmark-results/image-size.json)
+    IMAGE_SIZE_BASELINE         Baseline file (default: benchmarks/image-size-baseline.json)
+    IMAGE_SIZE_TOLERANCE        Allowed relative growth (default: 0.05)
+    IMAGE_SIZE_MIN_GROWTH       Growth in bytes ignored as noise (default: 1 MiB)
+    IMAGE_SIZE_UPDATE_BASELINE  Set to 1 to overwrite the baseline with this run
+"""
+
+import os
+
+import pytest
+
+from benchmark_harness import load_json, missing_baseline, write_json
+from image_size import (
+    DEFAULT_MIN_GROWTH,
+    DEFAULT_TOLERANCE,
+    compare_sizes,
+    format_report,
+    image_layers,
+    size_report,
+)
+
+TEST_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.environ.get(
+    "IMAGE_SIZE_RESULTS",
+    os.path.join(TEST_SCRIPT_DIR, "benchmark-results", "image-size.json")
+)
+BASELINE_PATH = os.environ.get(
+    "IMAGE_SIZE_BASELINE",
+    os.path.join(TEST_SCRIPT_DIR, "benchmarks", "image-size-baseline.json")
+)
+
+# Tracked images: baseline key -> image_builder.build arguments
+IMAGES = {
+    "caddy": {"dockerfile": "Dockerfile"},
+    "hermetic": {"dockerfile": "Dockerfile.hermetic", "extra_args": ["--network=none"]},
+}
+
+
+class TestDockerfileImageSize:
+    """Size regression tracking, one run per tracked image."""
+
+    @pytest.mark.parametrize("variant", list(IMAGES))
+    def test_image_size(self, variant, image_builder, image_fs):
+        """Break down the image size and gate it against the stored baseline."""
+        print(f"\n=== Image size: {variant} ===")
+
+        image_name = image_builder.build(**IMAGES[variant])
+        report = size_report(image_fs(image_name), image_layers(image_name))
+        baseline = load_json(BASELINE_PATH).get(variant)
+        print(format_report(report, baseline))
+
+        results = load_json(RESULTS_PATH)
+        results[variant] = report
+        write_json(RESULTS_PATH, results)
+
+        if os.environ.get("IMAGE_SIZE_UPDATE_BASELINE") == "1":
+            baselines = load_json(BASELINE_PATH)
+            baselines[variant] = report
+            write_json(BASELINE_PATH, baselines)
+            print(f"✓ Size baseline for {variant} updated at {BASELINE_PATH}")
+            return
+
+        if baseline is None:
+            missing_baseline(BASELINE_PATH, variant, "size-baseline")
+
+        tolerance = float(os.environ.get("IMAGE_SIZE_TOLERANCE", DEFAULT_TOLERANCE))
+        min_growth = int(os.environ.get("IMAGE_SIZE_MIN_GROWTH", DEFAULT_MIN_GROWTH))
+        regressions = compare_sizes(report, baseline, tolerance, min_growth)
+        assert not regressions, \
+            f"{variant} image grew beyond its baseline: {'; '.join(regressions)}"
+
+        print(f"✓ {variant} image is within {tolerance:.0%} of its baseline")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,140 @@
+"""
+Tests for fingerprint_lint.py, the long-cache safety check of asset names.
+
+This test suite verifies that webpack, Vite and Rollup style hashed names are
+recognised while ordinary names are not, that the assets referenced by
+index.html and fed-mods.json are resolved and flagged when mutable, that the
+mutable share limit and the fail mode work, and that a synthetic dist is
+classified as its hashed ratio says. These tests run without Podman — they
+use a temp build directory and a synthetic dist.
+"""
+
+import json
+
+import pytest
+from fingerprint_lint import REPORT_FILE, is_fingerprinted, lint, main
+
+
+class TestFingerprintLint:
+    """Test suite for the asset fingerprint linter."""
+
+    @pytest.fixture
+    def build_dir(self, make_build_dir):
+        """Create a build output with a mutable entry script and hashed chunks."""
+        return make_build_dir({
+            "index.html": '<link rel="stylesheet" href="css/main.4f2c9a1b.css">'
+                          '<script src="js/app.js"></script>'
+                          '<script src="https://cdn.example.com/lib.js"></script>',
+            "fed-mods.json": json.dumps({
+                "testApp": {"entry": ["/apps/test-app/js/testApp.1a2b3c4d5e.js"], "modules": []},
+            }),
+            "css/main.4f2c9a1b.css": "",
+            "js/app.js": "",
+            "js/testApp.1a2b3c4d5e.js": "",
+            "js/vendor-BxY7z_aQ.js": "",
+            "favicon.ico": "",
+            "app.info.json": "{}",
+        })
+
+    @pytest.mark.parametrize("name", [
+        "main.4f2c9a1b.js",
+        "320.f8a9b1c2d3e4f5a6.js",
+        "main-4f2c9a1b.css",
+        "index-BxY7z_aQ.js",
+        "index-Bx-7z_aQ.js",
+        "index-D3fX9kLq.js",
+        "app.abc123.js.map",
+    ])
+    def test_hashed_names(self, name):
+        """Test that webpack, Vite and Rollup hash segments are recognised."""
+        assert is_fingerprinted(name)
+
+    @pytest.mark.parametrize("name", [
+        "app.js",
+        "facade.js",
+        "chunk.deadbeef.js",
+        "es2015-polyfills.js",
+        "alpha-chunk-12.js",
+        "roboto-v20-latin.woff2",
+        "vendors-node_modules_react-dom_index_js.js",
+        "ReactDOM-Provider.js",
+        "ui-ChartsV2.js",
+        "abc-DoneDone.js",
+        "logo-20230101.png",
+    ])
+    def test_mutable_names(self, name):
+        """Test that ordinary names with words and numbers stay mutable."""
+        assert not is_fingerprinted(name)
+
+    def test_report(self, build_dir):
+        """Test classes, totals and resolved references; metadata is skipped."""
+        assert main([str(build_dir)]) == 0
+
+        report = json.loads((build_dir / REPORT_FILE).read_text())
+        assert report["assets"] == {
+            "css/main.4f2c9a1b.css": "hashed",
+            "favicon.ico": "mutable",
+            "fed-mods.json": "entry",
+            "index.html": "entry",
+            "js/app.js": "mutable",
+            "js/testApp.1a2b3c4d5e.js": "hashed",
+            "js/vendor-BxY7z_aQ.js": "hashed",
+        }
+        assert report["totals"] == {
+            "files": 7, "hashed": 3, "mutable": 2, "entry": 2, "mutable_ratio": 0.4,
+        }
+        assert [(r["source"], r["path"], r["class"]) for r in report["references"]] == [
+            ("index.html", "css/main.4f2c9a1b.css", "hashed"),
+            ("index.html", "js/app.js", "mutable"),
+            ("fed-mods.json", "js/testApp.1a2b3c4d5e.js", "hashed"),
+        ]
+        assert report["violations"] == ["index.html references mutable asset js/app.js"]
+
+    def test_fail_mode(self, build_dir, capsys):
+        """Test that fail mode exits 1 on a mutable entry script, warn mode does not."""
+        assert main([str(build_dir), "--mode", "warn"]) == 0
+        assert "Warning: index.html references mutable asset js/app.js" in capsys.readouterr().err
+
+        assert main([str(build_dir), "--mode", "fail"]) == 1
+        assert "Error: index.html references mutable asset js/app.js" in capsys.readouterr().err
+
+    def test_mutable_share_limit(self, build_dir):
+        """Test that a mutable share above --max-mutable is a violation."""
+        (build_dir / "js" / "app.js").rename(build_dir / "js" / "app.0a1b2c3d.js")
+
+        assert lint(str(build_dir), max_mutable=0.2)["violations"] == []
+        assert lint(str(build_dir), max_mutable=0.1)["violations"] == [
+            "1 of 5 assets have mutable names (20.0%, limit 10.0%)",
+        ]
+
+    def test_custom_pattern(self, build_dir):
+        """Test that FINGERPRINT_PATTERN replaces the built-in detection."""
+        assert main([str(build_dir), "--mode", "fail", "--pattern", r"^app\.js$"]) == 1
+
+        report = json.loads((build_dir / REPORT_FILE).read_text())
+        assert report["assets"]["js/app.js"] == "hashed"
+        assert report["assets"]["js/vendor-BxY7z_aQ.js"] == "mutable"
+
+    def test_synthetic_dist(self, synthetic_dist):
+        """Test a partly hashed synthetic dist: entry references resolve and mutable
+        names match the names generated without a hash."""
+        dist = synthetic_dist(file_count=2000, seed=5, hashed_ratio=0.5)
+        report = lint(dist["path"])
+
+        mutable = {path for path, cls in report["assets"].items() if cls == "mutable"}
+        unhashed = {
+            path for path in dist["files"]
+            if not path.endswith(".html") and path != "fed-mods.json"
+            and path.rsplit("/", 1)[-1].count(".") == 1
+        }
+        assert mutable == unhashed
+        assert {r["path"] for r in report["references"]} == set(dist["entry"].values())
+
+    def test_off_mode_writes_nothing(self, build_dir):
+        """Test that off mode skips the check."""
+        assert main([str(build_dir), "--mode", "off"]) == 0
+        assert not (build_dir / REPORT_FILE).exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
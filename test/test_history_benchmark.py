@@ -0,0 +1,191 @@
+"""
+History aggregation tests and benchmarks for src/frontend-build-history.sh.
+
+TestHistoryAggregation checks, at a small scale, that the script's
+aggregation functions merge every history level and the current build, and
+that the OCI layout input matches the plain directory input.
+
+TestHistoryBenchmark measures the aggregation for history depths 1-12 with
+synthetic builds and gates the deterministic output (file count, bytes
+written) against a stored baseline; times are recorded only. Neither needs
+quay, docker or podman.
+
+Environment (benchmark):
+    HISTORY_BENCH_DEPTHS           Comma-separated depths (default: 1,6,12)
+    HISTORY_BENCH_FILES            Files per build (default: 2000)
+    HISTORY_BENCH_SIZE_SCALE       synthetic_app size_scale; 1.0 is ~10 KB per
+                                   file, raise it for GB-sized dists (default: 0.25)
+    HISTORY_BENCH_CHURN            Fraction of files changed per build (default: 0.2)
+    HISTORY_BENCH_SOURCE           dir or oci (default: dir)
+    HISTORY_BENCH_RESULTS          Results file (default: benchmark-results/history.json)
+    HISTORY_BENCH_BASELINE         Baseline file (default: benchmarks/history-baseline.json)
+    HISTORY_BENCH_UPDATE_BASELINE  Set to 1 to overwrite the baseline with this run
+"""
+
+import os
+import subprocess
+
+import pytest
+
+from benchmark_harness import load_json, missing_baseline, write_json
+from history_benchmark import (
+    baseline_entry,
+    compare_to_baseline,
+    extract_oci_dist,
+    generate_builds,
+    run_history,
+    write_oci_layout,
+)
+
+TEST_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_SCRIPT = os.path.join(
+    os.path.dirname(TEST_SCRIPT_DIR), "src", "frontend-build-history.sh"
+)
+RESULTS_PATH = os.environ.get(
+    "HISTORY_BENCH_RESULTS",
+    os.path.join(TEST_SCRIPT_DIR, "benchmark-results", "history.json")
+)
+BASELINE_PATH = os.environ.get(
+    "HISTORY_BENCH_BASELINE",
+    os.path.join(TEST_SCRIPT_DIR, "benchmarks", "history-baseline.json")
+)
+DEPTHS = [int(depth) for depth in os.environ.get("HISTORY_BENCH_DEPTHS", "1,6,12").split(",")]
+
+# Synthetic build settings; a baseline only gates runs with the same ones. The
+# current build is the last of max(DEPTHS) + 1, so that count is an input too
+INPUTS = {
+    "builds": max(DEPTHS) + 1,
+    "files": int(os.environ.get("HISTORY_BENCH_FILES", "2000")),
+    "churn": float(os.environ.get("HISTORY_BENCH_CHURN", "0.2")),
+    "size_scale": float(os.environ.get("HISTORY_BENCH_SIZE_SCALE", "0.25")),
+}
+
+
+def _files(root):
+    return {
+        os.path.relpath(os.path.join(base, name), root)
+        for base, _, files in os.walk(root)
+        for name in files
+    }
+
+
+@pytest.fixture(scope="module")
+def builds(tmp_path_factory):
+    """Four consecutive small builds, oldest first."""
+    return generate_builds(str(tmp_path_factory.mktemp("builds")), 4, file_count=60, seed=1)
+
+
+@pytest.fixture(scope="module")
+def bench_builds(tmp_path_factory):
+    """max(DEPTHS) previous builds plus the current one, oldest first."""
+    return generate_builds(
+        str(tmp_path_factory.mktemp("history-builds")),
+        INPUTS["builds"],
+        file_count=INPUTS["files"],
+        churn=INPUTS["churn"],
+        size_scale=INPUTS["size_scale"],
+    )
+
+
+class TestHistoryAggregation:
+    """Test suite for the history aggregation functions of frontend-build-history.sh."""
+
+    def test_merges_every_level_and_current_build(self, builds, tmp_path):
+        """Test that the output holds every file of every level, current build last."""
+        *history, current = builds
+
+        result = run_history(HISTORY_SCRIPT, str(tmp_path), history[::-1], current)
+
+        expected = set().union(*(_files(build) for build in builds))
+        assert _files(tmp_path / "dist") == expected
+        assert (tmp_path / "dist" / "index.html").read_bytes() == \
+            open(os.path.join(current, "index.html"), "rb").read()
+        assert result["depth"] == 3
+        assert result["output_files"] == len(expected)
+        assert result["history_files"] == sum(len(_files(build)) for build in history)
+
+    def test_builds_share_unchanged_files(self, builds):
+        """Test that consecutive builds keep most names and change the entry files."""
+        first, second = _files(builds[0]), _files(builds[1])
+
+        assert len(first & second) >= 0.7 * len(first)
+        assert len(first) == len(second)
+
+    def test_oci_layout_matches_directory_input(self, builds, tmp_path):
+        """Test that OCI layout levels aggregate to the same output as directories."""
+        *history, current = builds
+        layouts = [
+            write_oci_layout(build, str(tmp_path / "layouts" / str(number)))
+            for number, build in enumerate(history)
+        ]
+        extract_oci_dist(layouts[0], str(tmp_path / "extracted"))
+        assert _files(tmp_path / "extracted") == _files(history[0])
+
+        from_dirs = run_history(HISTORY_SCRIPT, str(tmp_path / "dirs"), history[::-1], current)
+        from_oci = run_history(HISTORY_SCRIPT, str(tmp_path / "oci"), layouts[::-1], current,
+                               source_type="oci")
+
+        assert _files(tmp_path / "oci" / "dist") == _files(tmp_path / "dirs" / "dist")
+        assert from_oci["output_bytes"] == from_dirs["output_bytes"]
+
+    def test_history_levels_are_configurable(self, tmp_path):
+        """Test that HISTORY_LEVELS sets how many level directories are made."""
+        subprocess.run(
+            ["bash", "-c", 'source "$1" && HISTORY_LEVELS=12 && remakeHistoryDirectories',
+             "history", HISTORY_SCRIPT],
+            cwd=tmp_path,
+            check=True,
+        )
+
+        assert sorted(os.listdir(tmp_path / ".history"), key=int) == \
+            [str(level) for level in range(1, 13)]
+
+
+class TestHistoryBenchmark:
+    """Offline benchmark of the history aggregation at increasing depths."""
+
+    @pytest.mark.parametrize("depth", DEPTHS)
+    def test_history_aggregation(self, depth, bench_builds, tmp_path):
+        """Benchmark one history depth and gate it against the stored baseline."""
+        source_type = os.environ.get("HISTORY_BENCH_SOURCE", "dir")
+        *history, current = bench_builds
+        sources = history[::-1][:depth]
+        if source_type == "oci":
+            sources = [
+                write_oci_layout(source, str(tmp_path / "layouts" / str(number)))
+                for number, source in enumerate(sources)
+            ]
+
+        result = run_history(HISTORY_SCRIPT, str(tmp_path / "run"), sources, current, source_type)
+        key = f"{source_type}-depth-{depth}"
+        print(
+            f"\n  {key}: wall={result['wall_s']}s (fetch {result['fetch_s']}s, "
+            f"aggregate {result['aggregate_s']}s) written={result['bytes_written']} "
+            f"peak_disk={result['peak_disk_bytes']} output_files={result['output_files']}"
+        )
+
+        results = load_json(RESULTS_PATH)
+        results[key] = result
+        write_json(RESULTS_PATH, results)
+
+        if os.environ.get("HISTORY_BENCH_UPDATE_BASELINE") == "1":
+            baseline = load_json(BASELINE_PATH)
+            baseline[key] = baseline_entry(result, INPUTS)
+            write_json(BASELINE_PATH, baseline)
+            print(f"✓ Baseline for {key} updated at {BASELINE_PATH}")
+            return
+
+        baseline = load_json(BASELINE_PATH).get(key)
+        if baseline is None:
+            missing_baseline(BASELINE_PATH, key, "bench-history-baseline")
+        if baseline["inputs"] != INPUTS:
+            pytest.skip(f"Baseline for {key} was recorded with {baseline['inputs']}, not {INPUTS}")
+
+        regressions = compare_to_baseline(result, baseline)
+        assert not regressions, f"{key} regressed against baseline: {'; '.join(regressions)}"
+
+        print(f"✓ {key} output matches its baseline")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
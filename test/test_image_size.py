@@ -0,0 +1,107 @@
+"""
+Tests for image_size.py, the image size breakdown and baseline comparison.
+
+This test suite verifies that podman history output is turned into stable
+per-layer keys, that file sizes are grouped by top-level directory, and that
+the baseline comparison names the layer or directory that grew. These tests
+run without Podman — they feed recorded history output and synthetic file
+lists.
+"""
+
+import pytest
+
+from image_size import compare_sizes, directory_sizes, layer_key, parse_history
+
+MB = 1024 * 1024
+
+# podman history --human=false --no-trunc --format "{{.Size}}\t{{.CreatedBy}}",
+# newest layer first
+HISTORY = """\
+0\t/bin/sh -c #(nop) USER default
+4096\t/bin/sh -c #(nop) COPY file:3f2a9c0e1b7d5a4c8e6f0a1b2c3d4e5f6a7b8c9d0e1f2a3b4c5d6e7f8a9b0c1d in .
+2048\t/bin/sh -c #(nop) COPY dir:9a8b7c6d5e4f3a2b1c0d9e8f7a6b5c4d3e2f1a0b9c8d7e6f5a4b3c2d1e0f9a8b in dist
+52428800\t/bin/sh -c #(nop) COPY dir:1111111111111111111111111111111111111111111111111111111111111111 in dist
+1024\t/bin/sh -c #(nop) COPY file:aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa in /licenses/
+0\t/bin/sh -c #(nop) ENV ENV_PUBLIC_PATH=/default
+104857600\t/bin/sh -c microdnf install -y caddy && microdnf clean all
+"""
+
+
+class TestImageSizeReport:
+    """Test suite for the image size breakdown."""
+
+    def test_layer_key_drops_shell_wrapper_and_digests(self):
+        """Test that layer keys survive rebuilds of changed content."""
+        assert layer_key("/bin/sh -c #(nop) COPY dir:9a8b7c6d5e4f3a2b1c0d in dist") == \
+            "COPY dir:<digest> in dist"
+        assert layer_key("/bin/sh -c npm ci   --offline") == "npm ci --offline"
+        assert len(layer_key("RUN " + "x" * 500)) == 100
+
+    def test_parse_history(self):
+        """Test that empty layers are dropped and repeated instructions numbered."""
+        layers = parse_history(HISTORY)
+
+        assert layers == {
+            "microdnf install -y caddy && microdnf clean all": 100 * MB,
+            "COPY file:<digest> in /licenses/": 1024,
+            "COPY dir:<digest> in dist": 50 * MB,
+            "COPY dir:<digest> in dist #2": 2048,
+            "COPY file:<digest> in .": 4096,
+        }
+        assert list(layers)[0].startswith("microdnf")
+
+    def test_directory_sizes(self):
+        """Test that files are grouped by the first matching directory prefix."""
+        sizes = directory_sizes([
+            ("/srv/dist/js/app.js", 300),
+            ("/srv/dist/index.html", 100),
+            ("/srv/package.json", 10),
+            ("/licenses/LICENSE", 5),
+            ("/usr/bin/caddy", 1000),
+            ("/srv/distribution.txt", 1),
+        ])
+
+        assert sizes == {
+            "/srv/dist": 400,
+            "/licenses": 5,
+            "/etc/caddy": 0,
+            "/srv": 11,
+            "base": 1000,
+        }
+
+    def test_compare_names_grown_layer_and_directory(self):
+        """Test that only growth beyond tolerance and the noise floor is reported."""
+        baseline = {
+            "total": 200 * MB,
+            "layers": {"base": 150 * MB, "COPY dist": 50 * MB},
+            "directories": {"/srv/dist": 50 * MB, "base": 150 * MB},
+        }
+        report = {
+            "total": 230 * MB,
+            "layers": {"base": 151 * MB, "COPY dist": 79 * MB},
+            "directories": {"/srv/dist": 79 * MB, "base": 151 * MB},
+        }
+
+        regressions = compare_sizes(report, baseline, tolerance=0.05, min_growth=MB)
+
+        assert len(regressions) == 3
+        assert regressions[0].startswith("image grew from 200.00 MB to 230.00 MB")
+        assert "layer 'COPY dist'" in regressions[1]
+        assert "directory '/srv/dist'" in regressions[2]
+
+    def test_compare_ignores_small_growth_and_flags_new_layers(self):
+        """Test the min_growth noise floor and layers missing from the baseline."""
+        baseline = {"total": 10 * MB, "layers": {"COPY dist": 10 * MB}, "directories": {}}
+        report = {
+            "total": 10 * MB + 1000,
+            "layers": {"COPY dist": 10 * MB + 1000, "RUN npm ci": 2 * MB},
+            "directories": {},
+        }
+
+        regressions = compare_sizes(report, baseline, tolerance=0.0, min_growth=MB)
+
+        assert regressions == ["layer 'RUN npm ci' grew from 0.00 MB to 2.00 MB (+2.00 MB)"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,285 @@
+"""
+Tests for lockfile_deps.py, the lockfile-based dependency version extractor.
+
+This test suite verifies that direct production dependency versions are
+resolved from package-lock.json (v1 and v3), yarn.lock (classic and berry)
+and pnpm-lock.yaml (5.x, 6.x and 9.x) without running a package manager.
+These tests run without Podman — they only parse files in a temp directory.
+"""
+
+import json
+
+import pytest
+from lockfile_deps import DependencyIndex
+
+PACKAGE_JSON = {
+    "name": "lock-app",
+    "dependencies": {
+        "@patternfly/react-core": "^5.0.0",
+        "@redhat-cloud-services/frontend-components": "^4.2.0",
+        "react": "^18.2.0",
+    },
+    "devDependencies": {
+        "@patternfly/patternfly-a11y": "^4.0.0",
+    },
+}
+
+EXPECTED_VERSIONS = {
+    "@patternfly/react-core": "5.4.0",
+    "@redhat-cloud-services/frontend-components": "4.2.1",
+    "react": "18.2.0",
+}
+
+PACKAGE_LOCK_V3 = {
+    "name": "lock-app",
+    "lockfileVersion": 3,
+    "packages": {
+        "": {"name": "lock-app"},
+        "node_modules/@patternfly/react-core": {"version": "5.4.0"},
+        "node_modules/@patternfly/patternfly-a11y": {"version": "4.3.0", "dev": True},
+        "node_modules/@redhat-cloud-services/frontend-components": {"version": "4.2.1"},
+        "node_modules/@redhat-cloud-services/frontend-components/node_modules/@patternfly/react-core": {
+            "version": "4.276.0"
+        },
+        "node_modules/react": {"version": "18.2.0"},
+    },
+}
+
+PACKAGE_LOCK_V1 = {
+    "name": "lock-app",
+    "lockfileVersion": 1,
+    "dependencies": {
+        "@patternfly/react-core": {"version": "5.4.0"},
+        "@patternfly/patternfly-a11y": {"version": "4.3.0", "dev": True},
+        "@redhat-cloud-services/frontend-components": {"version": "4.2.1"},
+        "react": {"version": "18.2.0"},
+    },
+}
+
+YARN_CLASSIC_LOCK = """\
+# THIS IS AN AUTOGENERATED FILE. DO NOT EDIT THIS FILE DIRECTLY.
+# yarn lockfile v1
+
+
+"@patternfly/react-core@^4.0.0":
+  version "4.276.0"
+  resolved "https://registry.yarnpkg.com/@patternfly/react-core/-/react-core-4.276.0.tgz"
+
+"@patternfly/react-core@^5.0.0", "@patternfly/react-core@^5.1.0":
+  version "5.4.0"
+  resolved "https://registry.yarnpkg.com/@patternfly/react-core/-/react-core-5.4.0.tgz"
+  dependencies:
+    react "^18"
+
+"@redhat-cloud-services/frontend-components@^4.2.0":
+  version "4.2.1"
+
+react@^18, react@^18.2.0:
+  version "18.2.0"
+"""
+
+YARN_BERRY_LOCK = """\
+__metadata:
+  version: 6
+  cacheKey: 8
+
+"@patternfly/react-core@npm:^5.0.0":
+  version: 5.4.0
+  resolution: "@patternfly/react-core@npm:5.4.0"
+
+"@redhat-cloud-services/frontend-components@npm:^4.2.0":
+  version: 4.2.1
+  resolution: "@redhat-cloud-services/frontend-components@npm:4.2.1"
+
+"react@npm:^18.2.0":
+  version: 18.2.0
+  resolution: "react@npm:18.2.0"
+"""
+
+PNPM_LOCK_V9 = """\
+lockfileVersion: '9.0'
+
+settings:
+  autoInstallPeers: true
+
+importers:
+
+  .:
+    dependencies:
+      '@patternfly/react-core':
+        specifier: ^5.0.0
+        version: 5.4.0(react-dom@18.2.0(react@18.2.0))(react@18.2.0)
+      '@redhat-cloud-services/frontend-components':
+        specifier: ^4.2.0
+        version: 4.2.1(react@18.2.0)
+      react:
+        specifier: ^18.2.0
+        version: 18.2.0
+    devDependencies:
+      '@patternfly/patternfly-a11y':
+        specifier: ^4.0.0
+        version: 4.3.0
+
+  packages/other:
+    dependencies:
+      react:
+        specifier: ^17.0.0
+        version: 17.0.2
+
+packages:
+
+  '@patternfly/react-core@5.4.0':
+    resolution: {integrity: sha512-abc}
+"""
+
+PNPM_LOCK_V6 = """\
+lockfileVersion: '6.0'
+
+dependencies:
+  '@patternfly/react-core':
+    specifier: ^5.0.0
+    version: 5.4.0(react@18.2.0)
+  '@redhat-cloud-services/frontend-components':
+    specifier: ^4.2.0
+    version: 4.2.1
+  react:
+    specifier: ^18.2.0
+    version: 18.2.0
+
+devDependencies:
+  '@patternfly/patternfly-a11y':
+    specifier: ^4.0.0
+    version: 4.3.0
+
+packages:
+
+  /@patternfly/react-core@5.4.0(react@18.2.0):
+    resolution: {integrity: sha512-abc}
+"""
+
+PNPM_LOCK_V5 = """\
+lockfileVersion: 5.4
+
+specifiers:
+  '@patternfly/react-core': ^5.0.0
+  '@redhat-cloud-services/frontend-components': ^4.2.0
+  react: ^18.2.0
+
+dependencies:
+  '@patternfly/react-core': 5.4.0_react@18.2.0
+  '@redhat-cloud-services/frontend-components': 4.2.1
+  react: 18.2.0
+
+devDependencies:
+  '@patternfly/patternfly-a11y': 4.3.0
+"""
+
+
+class TestLockfileDeps:
+    """Test suite for lockfile-based dependency extraction."""
+
+    def _write_project(self, project_dir, lockfile, content):
+        """Write package.json and a lockfile into project_dir."""
+        (project_dir / "package.json").write_text(json.dumps(PACKAGE_JSON))
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        (project_dir / lockfile).write_text(content)
+
+    @pytest.mark.parametrize(("lockfile", "content"), [
+        ("package-lock.json", PACKAGE_LOCK_V3),
+        ("package-lock.json", PACKAGE_LOCK_V1),
+        ("yarn.lock", YARN_CLASSIC_LOCK),
+        ("yarn.lock", YARN_BERRY_LOCK),
+        ("pnpm-lock.yaml", PNPM_LOCK_V9),
+        ("pnpm-lock.yaml", PNPM_LOCK_V6),
+        ("pnpm-lock.yaml", PNPM_LOCK_V5),
+    ], ids=["npm-v3", "npm-v1", "yarn-classic", "yarn-berry", "pnpm-v9", "pnpm-v6", "pnpm-v5"])
+    def test_resolves_direct_production_versions(self, tmp_path, lockfile, content):
+        """Test that each lockfile format yields the root's production versions only."""
+        self._write_project(tmp_path, lockfile, content)
+
+        index = DependencyIndex.load(str(tmp_path))
+
+        assert index.lockfile == lockfile
+        assert index.versions == EXPECTED_VERSIONS
+
+    @pytest.mark.parametrize(("lockfile", "content"), [
+        ("package-lock.json", {
+            "lockfileVersion": 3,
+            "packages": {
+                "node_modules/react": {"version": "18.2.0"},
+                "packages/other/node_modules/react": {"version": "17.0.2"},
+            },
+        }),
+        ("pnpm-lock.yaml", PNPM_LOCK_V9),
+    ], ids=["npm", "pnpm"])
+    def test_workspace_package_versions(self, tmp_path, lockfile, content):
+        """Test that a workspace package's package.json reads its own importer."""
+        self._write_project(tmp_path, lockfile, content)
+        (tmp_path / "packages" / "other").mkdir(parents=True)
+        (tmp_path / "packages" / "other" / "package.json").write_text(
+            json.dumps({"dependencies": {"react": "^17.0.0"}})
+        )
+
+        index = DependencyIndex.load(str(tmp_path), "packages/other/package.json")
+
+        assert index.versions == {"react": "17.0.2"}
+
+    def test_yarn_berry_multi_descriptor_entry(self, tmp_path):
+        """Test a berry header listing several descriptors, with an older version first."""
+        self._write_project(tmp_path, "yarn.lock", """\
+__metadata:
+  version: 6
+
+"@patternfly/react-core@npm:^4.0.0":
+  version: 4.9.9
+  resolution: "@patternfly/react-core@npm:4.9.9"
+
+"@patternfly/react-core@npm:^5.0.0, @patternfly/react-core@npm:^5.1.0":
+  version: 5.1.2
+  resolution: "@patternfly/react-core@npm:5.1.2"
+
+"react@npm:^18.2.0":
+  version: 18.2.0
+  resolution: "react@npm:18.2.0"
+""")
+
+        index = DependencyIndex.load(str(tmp_path))
+
+        assert index.versions["@patternfly/react-core"] == "5.1.2"
+        assert index.versions["react"] == "18.2.0"
+
+    def test_scope_queries_share_one_index(self, tmp_path):
+        """Test that scope queries match case-insensitively against one parse."""
+        self._write_project(tmp_path, "package-lock.json", PACKAGE_LOCK_V3)
+
+        index = DependencyIndex.load(str(tmp_path))
+
+        assert index.matching("@PatternFly") == ["@patternfly/react-core@5.4.0"]
+        assert index.matching("@redhat-cloud-services") == [
+            "@redhat-cloud-services/frontend-components@4.2.1"
+        ]
+        assert index.matching("@nonexistent") == []
+
+    def test_missing_lockfile_entry_is_unknown(self, tmp_path):
+        """Test that declared dependencies missing from the lockfile report 'unknown'."""
+        lock = json.loads(json.dumps(PACKAGE_LOCK_V3))
+        del lock["packages"]["node_modules/react"]
+        self._write_project(tmp_path, "package-lock.json", lock)
+
+        index = DependencyIndex.load(str(tmp_path))
+
+        assert index.versions["react"] == "unknown"
+
+    def test_no_lockfile_yields_empty_index(self, tmp_path):
+        """Test that a project without a lockfile has no dependency versions."""
+        (tmp_path / "package.json").write_text(json.dumps(PACKAGE_JSON))
+
+        index = DependencyIndex.load(str(tmp_path))
+
+        assert index.lockfile is None
+        assert index.versions == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
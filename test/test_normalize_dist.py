@@ -0,0 +1,136 @@
+"""
+Tests for normalize_dist.py, the reproducible build output step.
+
+This test suite verifies that the build output is split into the asset tree
+and the volatile metadata files, that every entry gets SOURCE_DATE_EPOCH as
+its mtime and a normalized mode, and that the epoch falls back to the commit
+time. These tests run without Podman — they use a temp build directory.
+"""
+
+import os
+import subprocess
+
+import pytest
+from normalize_dist import VOLATILE_FILES, main, source_date_epoch
+
+EPOCH = 1700000000
+
+
+def _tree(root):
+    return sorted(
+        os.path.relpath(os.path.join(base, name), root)
+        for base, dirs, files in os.walk(root)
+        for name in dirs + files
+    )
+
+
+class TestNormalizeDist:
+    """Test suite for the build output normalization."""
+
+    @pytest.fixture
+    def build_dir(self, make_build_dir):
+        """Create a build output with assets and volatile metadata."""
+        make_build_dir({"js/app.js": "console.log('app');"}, mode=0o664)
+        make_build_dir({"bin/tool.sh": "#!/bin/sh\n"}, mode=0o775)
+        return make_build_dir({
+            "index.html": "<html></html>",
+            "plugin/app.info.json": "{}",
+            **dict.fromkeys(VOLATILE_FILES, "{}"),
+        }, mode=0o600)
+
+    def test_splits_volatile_metadata(self, build_dir, tmp_path):
+        """Test that only top-level build metadata goes to the metadata tree."""
+        assets, metadata = tmp_path / "assets", tmp_path / "metadata"
+
+        assert main([str(build_dir), "--assets", str(assets), "--metadata", str(metadata),
+                     "--epoch", str(EPOCH)]) == 0
+
+        assert _tree(metadata) == sorted(VOLATILE_FILES)
+        assert _tree(assets) == [
+            "bin", "bin/tool.sh", "index.html", "js", "js/app.js",
+            "plugin", "plugin/app.info.json",
+        ]
+        assert (assets / "js" / "app.js").read_text() == "console.log('app');"
+
+    def test_app_dirs_metadata(self, build_dir, make_build_dir, tmp_path):
+        """Test that --app-dirs also splits off the metadata of each app directory."""
+        assets, metadata = tmp_path / "assets", tmp_path / "metadata"
+        make_build_dir({"plugin/asset-index.json": "{}", "plugin/js/app.info.json": "{}"},
+                       mode=0o600)
+
+        assert main([str(build_dir), "--assets", str(assets), "--metadata", str(metadata),
+                     "--epoch", str(EPOCH), "--app-dirs"]) == 0
+
+        assert "plugin/app.info.json" in _tree(metadata)
+        assert "plugin/asset-index.json" in _tree(metadata)
+        assert "plugin/js/app.info.json" in _tree(assets)
+
+    def test_normalizes_mtimes_and_modes(self, build_dir, tmp_path):
+        """Test that every entry gets the epoch mtime and a normalized mode."""
+        assets, metadata = tmp_path / "assets", tmp_path / "metadata"
+
+        main([str(build_dir), "--assets", str(assets), "--metadata", str(metadata),
+              "--epoch", str(EPOCH)])
+
+        for tree in (assets, metadata):
+            for rel_path in [".", *_tree(tree)]:
+                assert os.lstat(tree / rel_path).st_mtime == EPOCH, rel_path
+        assert (assets / "js" / "app.js").stat().st_mode & 0o777 == 0o644
+        assert (assets / "bin" / "tool.sh").stat().st_mode & 0o777 == 0o755
+        assert (assets / "js").stat().st_mode & 0o777 == 0o755
+
+    def test_build_output_is_untouched(self, build_dir, tmp_path):
+        """Test that normalizing the copies leaves the modes and mtimes of the build output."""
+        app_js = build_dir / "js" / "app.js"
+        os.utime(app_js, (EPOCH + 60, EPOCH + 60))
+
+        main([str(build_dir), "--assets", str(tmp_path / "assets"),
+              "--metadata", str(tmp_path / "metadata"), "--epoch", str(EPOCH)])
+
+        assert app_js.stat().st_mode & 0o777 == 0o664
+        assert app_js.stat().st_mtime == EPOCH + 60
+        assert (build_dir / "index.html").stat().st_mode & 0o777 == 0o600
+
+    def test_keeps_empty_dirs_and_reports_symlinked_dirs(self, build_dir, tmp_path, capsys):
+        """Test that empty directories are kept and symlinked directories are reported."""
+        assets = tmp_path / "assets"
+        (build_dir / "fonts" / "empty").mkdir(parents=True)
+        (build_dir / "js-link").symlink_to("js")
+
+        main([str(build_dir), "--assets", str(assets),
+              "--metadata", str(tmp_path / "metadata"), "--epoch", str(EPOCH)])
+
+        assert (assets / "fonts" / "empty").is_dir()
+        assert os.lstat(assets / "fonts" / "empty").st_mtime == EPOCH
+        assert not (assets / "js-link").exists()
+        assert "Warning: skipping symlinked directory js-link" in capsys.readouterr().err
+
+    def test_rerun_replaces_previous_output(self, build_dir, tmp_path):
+        """Test that a rerun drops files that are no longer in the build."""
+        assets, metadata = tmp_path / "assets", tmp_path / "metadata"
+        args = [str(build_dir), "--assets", str(assets), "--metadata", str(metadata)]
+
+        main(args + ["--epoch", str(EPOCH)])
+        (build_dir / "js" / "app.js").unlink()
+        main(args + ["--epoch", str(EPOCH)])
+
+        assert "js/app.js" not in _tree(assets)
+
+    def test_epoch_from_env_then_commit(self, tmp_path):
+        """Test the SOURCE_DATE_EPOCH fallbacks: env var, commit time, zero."""
+        assert source_date_epoch({"SOURCE_DATE_EPOCH": "123"}, cwd=str(tmp_path)) == 123
+        assert source_date_epoch({}, cwd=str(tmp_path)) == 0
+
+        git = ["git", "-c", "user.email=test@test.com", "-c", "user.name=Test User"]
+        subprocess.run(git + ["init", "-q"], cwd=tmp_path, check=True)
+        subprocess.run(
+            git + ["commit", "-q", "--allow-empty", "-m", "Initial commit"],
+            cwd=tmp_path,
+            check=True,
+            env={**os.environ, "GIT_COMMITTER_DATE": f"@{EPOCH} +0000"},
+        )
+        assert source_date_epoch({}, cwd=str(tmp_path)) == EPOCH
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
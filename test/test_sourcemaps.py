@@ -0,0 +1,252 @@
+"""
+Tests for sourcemaps.py, the sourcemap split-out step.
+
+This test suite verifies that the *.map files move out of the build output
+into a reproducible tarball, that the manifest pairs each map with its
+bundle for the Sentry upload, and that strip mode removes only the comments
+of maps that were moved. The upload tests check that the content-hash ledger
+skips unchanged files and that uploads run with bounded concurrency. These
+tests run without Podman — they use a temp build directory and a local
+FakeSentry server.
+"""
+
+import json
+import os
+import shutil
+import tarfile
+
+import pytest
+import sourcemaps
+from sourcemaps import ARCHIVE_NAME, LEDGER_FILE, MANIFEST_NAME, find_comment, main
+
+from fake_sentry import FakeSentry
+
+
+class TestSourcemaps:
+    """Test suite for the sourcemap split-out."""
+
+    @pytest.fixture
+    def build_dir(self, make_build_dir):
+        """Create a build output with paired, unpaired, external and inline maps."""
+        return make_build_dir({
+            "index.html": "<html></html>",
+            "js/app.1a2b3c4d.js": "console.log('app');\n//# sourceMappingURL=app.1a2b3c4d.js.map\n",
+            "js/app.1a2b3c4d.js.map": '{"version":3,"sources":["app.ts"]}',
+            "css/main.css": "body{margin:0}\n/*# sourceMappingURL=../maps/main.css.map */\n",
+            "maps/main.css.map": '{"version":3}',
+            "js/vendor.js": "var v;\n",
+            "js/vendor.js.map": '{"version":3}',
+            "js/cdn.js": "var c;\n//# sourceMappingURL=https://cdn.example.com/cdn.js.map",
+            "js/inline.js": "var i;\n//# sourceMappingURL=data:application/json;base64,e30=\n",
+        })
+
+    def _split(self, build_dir, tmp_path, mode, *extra):
+        output = tmp_path / "sourcemaps"
+        assert main(["split", str(build_dir), "--output", str(output), "--mode", mode,
+                     *extra]) == 0
+        return output, json.loads((output / MANIFEST_NAME).read_text())
+
+    def test_find_comment(self, build_dir):
+        """Test both comment styles; inline and missing comments are not returned."""
+        offset, url = find_comment(build_dir / "js" / "app.1a2b3c4d.js")
+        assert url == "app.1a2b3c4d.js.map"
+        assert offset == len("console.log('app');\n")
+        assert find_comment(build_dir / "css" / "main.css")[1] == "../maps/main.css.map"
+        assert find_comment(build_dir / "js" / "inline.js") is None
+        assert find_comment(build_dir / "js" / "vendor.js") is None
+
+    def test_split_moves_maps_into_archive(self, build_dir, tmp_path):
+        """Test that every map leaves the build output and lands in the tarball."""
+        output, manifest = self._split(build_dir, tmp_path, "split", "--release", "abc123")
+
+        assert not list(build_dir.rglob("*.map"))
+        assert not (build_dir / "maps").exists()
+        with tarfile.open(output / ARCHIVE_NAME) as tar:
+            assert tar.getnames() == ["js/app.1a2b3c4d.js.map", "js/vendor.js.map",
+                                      "maps/main.css.map"]
+            assert tar.extractfile("maps/main.css.map").read() == b'{"version":3}'
+        assert manifest["release"] == "abc123"
+        assert manifest["comments_stripped"] == 0
+        assert "sourceMappingURL" in (build_dir / "js" / "app.1a2b3c4d.js").read_text()
+
+    def test_manifest_pairs_maps_with_bundles(self, build_dir, tmp_path):
+        """Test pairing by comment, by file name, and the recorded size and hash."""
+        _, manifest = self._split(build_dir, tmp_path, "split")
+
+        sources = {entry["map"]: entry["source"] for entry in manifest["files"]}
+        assert sources == {
+            "js/app.1a2b3c4d.js.map": "js/app.1a2b3c4d.js",
+            "js/vendor.js.map": "js/vendor.js",
+            "maps/main.css.map": "css/main.css",
+        }
+        entry = manifest["files"][0]
+        assert entry["size"] == len('{"version":3,"sources":["app.ts"]}')
+        assert len(entry["sha256"]) == 64
+        assert manifest["total_size"] == sum(e["size"] for e in manifest["files"])
+
+    def test_strip_removes_comments_of_moved_maps(self, build_dir, tmp_path):
+        """Test that strip mode removes only the comments pointing at moved maps."""
+        _, manifest = self._split(build_dir, tmp_path, "strip")
+
+        assert manifest["comments_stripped"] == 2
+        assert (build_dir / "js" / "app.1a2b3c4d.js").read_text() == "console.log('app');\n"
+        assert (build_dir / "css" / "main.css").read_text() == "body{margin:0}\n"
+        assert "cdn.example.com" in (build_dir / "js" / "cdn.js").read_text()
+        assert "data:application/json" in (build_dir / "js" / "inline.js").read_text()
+
+    def test_archive_is_reproducible(self, build_dir, tmp_path):
+        """Test that the same maps produce a byte-identical tarball."""
+        copy = tmp_path / "copy"
+        shutil.copytree(build_dir, copy)
+        first, _ = self._split(build_dir, tmp_path / "first", "split")
+        os.utime(copy / "js" / "vendor.js.map", (0, 12345))
+        second, _ = self._split(copy, tmp_path / "second", "split")
+
+        assert (first / ARCHIVE_NAME).read_bytes() == (second / ARCHIVE_NAME).read_bytes()
+
+    def test_keep_mode_is_a_no_op(self, build_dir, tmp_path):
+        """Test that keep mode leaves the build output and writes nothing."""
+        assert main(["split", str(build_dir), "--output", str(tmp_path / "out"),
+                     "--mode", "keep"]) == 0
+
+        assert len(list(build_dir.rglob("*.map"))) == 3
+        assert not (tmp_path / "out").exists()
+
+
+class TestSourcemapUpload:
+    """Test suite for the ledger-based sourcemap upload."""
+
+    @pytest.fixture
+    def sentry(self, monkeypatch):
+        """Run a FakeSentry and point the SENTRY_* variables at it."""
+        with FakeSentry() as sentry:
+            monkeypatch.setenv("SENTRY_URL", sentry.url)
+            monkeypatch.setenv("SENTRY_ORG", "org")
+            monkeypatch.setenv("SENTRY_PROJECT", "app")
+            monkeypatch.setenv("SENTRY_AUTH_TOKEN", sentry.token)
+            monkeypatch.setenv("APP_NAME", "test-app")
+            monkeypatch.delenv("SENTRY_RELEASE", raising=False)
+            yield sentry
+
+    @pytest.fixture
+    def build(self, make_build_dir):
+        """Return a factory that writes and splits a build with a vendor chunk and app chunks."""
+        def write(root, chunks, vendor="vendor"):
+            files = {"index.html": "<html></html>"}
+            for name, content in [("vendor", vendor)] + [(f"c{n}", f"app {n}") for n in range(chunks)]:
+                files[f"js/{name}.js"] = f"{content};\n//# sourceMappingURL={name}.js.map\n"
+                files[f"js/{name}.js.map"] = f'{{"version":3,"file":"{content}"}}'
+            dist = make_build_dir(files, root=root / "dist")
+            assert main(["split", str(dist), "--output", str(root / "maps"), "--mode", "strip"]) == 0
+            return dist
+
+        return write
+
+    def _upload(self, root, release, *extra):
+        return main(["upload", str(root / "dist"), "--output", str(root / "maps"),
+                     "--release", release, *extra])
+
+    def test_first_upload_sends_maps_and_bundles(self, build, sentry, tmp_path):
+        """Test that every map and bundle is uploaded and recorded in the ledger."""
+        dist = build(tmp_path, chunks=2)
+
+        assert self._upload(tmp_path, "r1") == 0
+
+        assert sentry.uploads("r1") == sorted(
+            f"~/apps/test-app/js/{name}.js{suffix}"
+            for name in ("vendor", "c0", "c1") for suffix in ("", ".map")
+        )
+        bundle = sentry.releases["r1"]["~/apps/test-app/js/c0.js"]
+        assert bundle["header"] == "Sourcemap:c0.js.map"
+        assert bundle["content"] == b"app 0;\n"
+        ledger = json.loads((dist / LEDGER_FILE).read_text())
+        assert ledger["project"] == "app"
+        assert ledger["files"]["~/apps/test-app/js/vendor.js.map"]["releases"] == ["r1"]
+
+    def test_same_release_skips_everything(self, build, sentry, tmp_path):
+        """Test that a rebuild of the same release with the ledger uploads nothing."""
+        ledger = str(tmp_path / "ledger.json")
+        build(tmp_path / "a", chunks=2)
+        assert self._upload(tmp_path / "a", "r1", "--ledger", ledger) == 0
+        build(tmp_path / "b", chunks=2)
+        requests_before = len(sentry.requests)
+
+        assert self._upload(tmp_path / "b", "r1", "--ledger", ledger) == 0
+
+        assert len(sentry.requests) == requests_before
+
+    def test_app_scope_skips_unchanged_files_across_releases(self, build, sentry, tmp_path):
+        """Test that only changed files go to a new release in app scope."""
+        ledger = str(tmp_path / "ledger.json")
+        build(tmp_path / "a", chunks=2)
+        assert self._upload(tmp_path / "a", "r1", "--ledger", ledger, "--scope", "app") == 0
+        build(tmp_path / "b", chunks=2, vendor="vendor v2")
+
+        assert self._upload(tmp_path / "b", "r2", "--ledger", ledger, "--scope", "app") == 0
+
+        assert sentry.uploads("r2") == ["~/apps/test-app/js/vendor.js",
+                                        "~/apps/test-app/js/vendor.js.map"]
+        files = json.loads((tmp_path / "ledger.json").read_text())["files"]
+        assert files["~/apps/test-app/js/c0.js.map"]["releases"] == ["r1", "r2"]
+        assert files["~/apps/test-app/js/vendor.js.map"]["releases"] == ["r2"]
+
+    def test_release_scope_uploads_to_a_new_release(self, build, sentry, tmp_path):
+        """Test that the default scope does not reuse another release's uploads."""
+        ledger = str(tmp_path / "ledger.json")
+        build(tmp_path / "a", chunks=1)
+        assert self._upload(tmp_path / "a", "r1", "--ledger", ledger) == 0
+
+        assert self._upload(tmp_path / "a", "r2", "--ledger", ledger) == 0
+
+        assert sentry.uploads("r2") == sentry.uploads("r1")
+
+    def test_ledger_of_another_project_is_ignored(self, build, sentry, tmp_path, monkeypatch):
+        """Test that a ledger written for another Sentry project skips nothing."""
+        ledger = str(tmp_path / "ledger.json")
+        build(tmp_path, chunks=1)
+        assert self._upload(tmp_path, "r1", "--ledger", ledger) == 0
+        monkeypatch.setenv("SENTRY_PROJECT", "other")
+
+        assert self._upload(tmp_path, "r1", "--ledger", ledger) == 0
+
+        assert len(sentry.uploads("r1")) == 4
+
+    def test_uploads_run_with_bounded_concurrency(self, build, sentry, tmp_path):
+        """Test that uploads overlap but never exceed the concurrency limit."""
+        sentry.upload_delay = 0.05
+        build(tmp_path, chunks=7)
+
+        assert self._upload(tmp_path, "r1", "--concurrency", "3") == 0
+
+        assert len(sentry.uploads("r1")) == 16
+        assert 1 < sentry.max_in_flight <= 3
+
+    def test_failed_upload_is_retried_next_time(self, build, sentry, tmp_path, monkeypatch):
+        """Test that a failed file fails the run, stays out of the ledger and is retried."""
+        monkeypatch.setattr(sourcemaps, "RETRY_DELAY", 0)
+        ledger = str(tmp_path / "ledger.json")
+        build(tmp_path, chunks=1)
+        sentry.fail_names.add("~/apps/test-app/js/c0.js.map")
+
+        assert self._upload(tmp_path, "r1", "--ledger", ledger) == 1
+        assert "~/apps/test-app/js/c0.js.map" not in \
+            json.loads((tmp_path / "ledger.json").read_text())["files"]
+
+        sentry.fail_names.clear()
+        requests_before = len(sentry.requests)
+        assert self._upload(tmp_path, "r1", "--ledger", ledger) == 0
+        assert sentry.requests[requests_before:] == [
+            ("POST", "/api/0/organizations/org/releases/"),
+            ("POST", "/api/0/projects/org/app/releases/r1/files/"),
+        ]
+
+    def test_missing_sentry_config_fails(self, build, tmp_path, monkeypatch):
+        """Test that the upload refuses to run without the Sentry settings."""
+        monkeypatch.delenv("SENTRY_AUTH_TOKEN", raising=False)
+        build(tmp_path, chunks=1)
+
+        assert self._upload(tmp_path, "r1") == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
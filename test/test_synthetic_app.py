@@ -0,0 +1,150 @@
+"""
+Tests for synthetic_app.py, the synthetic large-app fixture generator.
+
+This test suite verifies that generated build outputs have exactly the
+requested number of files, are identical for identical arguments, carry
+content hashes and sizes as configured, and that a synthetic app with a fake
+lockfile builds through universal_build.sh. These tests run without Podman.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+
+import pytest
+from early_hints import collect_preloads
+from lockfile_deps import DependencyIndex
+
+from synthetic_app import (
+    ASSET_KINDS,
+    CONTENT_HASH_LENGTH,
+    SCOPED_DEPENDENCIES,
+    generate_app,
+    generate_dist,
+    generate_lockfile,
+)
+
+HASHED_NAME = re.compile(rf"\.([0-9a-f]{{{CONTENT_HASH_LENGTH}}})\.[a-z0-9]+$")
+
+
+def _tree_digest(root):
+    digest = hashlib.sha256()
+    for base, dirs, files in sorted(os.walk(root)):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(base, name)
+            digest.update(os.path.relpath(path, root).encode() + b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class TestSyntheticApp:
+    """Test suite for the synthetic large-app generator."""
+
+    @pytest.mark.parametrize("sourcemaps", [False, True])
+    def test_exact_file_count(self, tmp_path, sourcemaps):
+        """Test that the tree has exactly file_count files, as the summary says."""
+        summary = generate_dist(str(tmp_path), file_count=1234, sourcemaps=sourcemaps)
+
+        on_disk = {
+            os.path.relpath(os.path.join(base, name), tmp_path)
+            for base, _, files in os.walk(tmp_path)
+            for name in files
+        }
+        assert summary["file_count"] == len(on_disk) == 1234
+        assert set(summary["files"]) == on_disk
+        assert summary["total_size"] == sum(
+            os.path.getsize(tmp_path / path) for path in on_disk
+        )
+        assert any(path.endswith(".js.map") for path in on_disk) == sourcemaps
+
+    def test_deterministic(self, tmp_path):
+        """Test that equal arguments give identical trees and another seed does not."""
+        for name, seed in (("a", 7), ("b", 7), ("c", 8)):
+            generate_dist(str(tmp_path / name), file_count=300, seed=seed, sourcemaps=True)
+
+        assert _tree_digest(tmp_path / "a") == _tree_digest(tmp_path / "b")
+        assert _tree_digest(tmp_path / "a") != _tree_digest(tmp_path / "c")
+
+    def test_hashed_names_match_content(self, tmp_path):
+        """Test that hashed names carry the content hash and hashed_ratio=0 drops them."""
+        hashed = generate_dist(str(tmp_path / "hashed"), file_count=200, hashed_ratio=1.0)
+        unhashed = generate_dist(str(tmp_path / "unhashed"), file_count=200, hashed_ratio=0.0)
+
+        hashed_paths = [path for path in hashed["files"] if HASHED_NAME.search(path)]
+        assert hashed_paths
+        for path in hashed_paths:
+            content = (tmp_path / "hashed" / path).read_bytes()
+            assert HASHED_NAME.search(path).group(1) == hashlib.sha256(content).hexdigest()[:CONTENT_HASH_LENGTH]
+        assert any(path.startswith("locales/") for path in hashed["files"])
+        assert not [path for path in unhashed["files"] if HASHED_NAME.search(path)]
+
+    def test_fixed_size_distribution(self, tmp_path):
+        """Test that the fixed distribution gives every asset its kind's scaled median."""
+        summary = generate_dist(str(tmp_path), file_count=100, size_distribution="fixed",
+                                size_scale=0.5)
+
+        medians = {ext: median // 2 for _, ext, _, median, _ in ASSET_KINDS.values()}
+        for path, size in summary["files"].items():
+            if path not in ("index.html", "fed-mods.json"):
+                assert size == medians[os.path.splitext(path)[1]], path
+
+    def test_entry_assets_are_preloadable(self, tmp_path):
+        """Test that index.html and fed-mods.json reference the generated entry assets."""
+        summary = generate_dist(str(tmp_path), file_count=50, app_name="big-app")
+
+        preloads = collect_preloads(str(tmp_path), "/apps/big-app")
+        assert preloads == [
+            (f"/apps/big-app/{summary['entry']['style']}", "style"),
+            (f"/apps/big-app/{summary['entry']['chunk']}", "script"),
+        ]
+        for path in summary["entry"].values():
+            assert (tmp_path / path).is_file()
+
+    @pytest.mark.parametrize("file_count", [9, 100001])
+    def test_rejects_file_count_out_of_range(self, tmp_path, file_count):
+        """Test the 10 to 100k file count bounds."""
+        with pytest.raises(ValueError, match="file_count"):
+            generate_dist(str(tmp_path), file_count=file_count)
+
+    @pytest.mark.parametrize("fixture", ["fake-app", "fake-pnpm-app"])
+    def test_fake_lockfile_is_parsed(self, tmp_path, fixture):
+        """Test that the fake lockfile resolves every direct dependency of package.json."""
+        app_dir = tmp_path / fixture
+        shutil.copytree(os.path.join(os.path.dirname(__file__), "test-fixtures", fixture), app_dir)
+
+        direct = generate_lockfile(str(app_dir), entries=3000)
+
+        index = DependencyIndex.load(str(app_dir))
+        assert len(direct) == 50
+        assert index.versions == direct
+        for name, version in SCOPED_DEPENDENCIES.items():
+            assert index.versions[name] == version
+
+    def test_synthetic_app_builds(self, script_workspace):
+        """Test that a synthetic app goes through universal_build.sh like a fixture."""
+        workspace = script_workspace()
+        summary = generate_app(workspace.app_dir, file_count=400, lockfile_entries=2000)
+
+        workspace.run(["universal_build.sh"], CADDY_EARLY_HINTS="true")
+
+        for path in summary["files"]:
+            assert os.path.isfile(workspace.path("dist", path)), path
+        app_info = json.loads(workspace.read("dist", "app.info.json"))
+        assert "@patternfly/react-core@5.4.0" in app_info["patternfly_dependencies"]
+        assert f"/apps/test-app/{summary['entry']['chunk']}" in workspace.read("Caddyfile")
+
+    def test_synthetic_dist_fixture_is_shared(self, synthetic_dist):
+        """Test that the session fixture generates each option set once."""
+        first = synthetic_dist(file_count=100, seed=3)
+
+        assert synthetic_dist(file_count=100, seed=3) is first
+        assert synthetic_dist(file_count=100, seed=4)["path"] != first["path"]
+        assert len(os.listdir(first["path"])) > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,120 @@
+"""
+Tests for workspace_packages.py, the monorepo package discovery.
+
+This test suite verifies that the workspace globs come from the package
+manager the lockfile selects (package.json "workspaces" for npm and yarn,
+pnpm-workspace.yaml for pnpm), that negated globs and node_modules are left
+out, and that the app list honours WORKSPACE_PACKAGES and rejects unknown
+selections and duplicate app names. These tests run without Podman — they use
+a temp workspace checkout.
+"""
+
+import json
+
+import pytest
+from workspace_packages import WorkspaceError, main, workspace_apps, workspace_packages
+
+
+def _package(project_dir, rel_dir, name, appname=None):
+    path = project_dir / rel_dir / "package.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    package = {"name": name}
+    if appname:
+        package["insights"] = {"appname": appname}
+    path.write_text(json.dumps(package))
+
+
+class TestWorkspacePackages:
+    """Test suite for the workspace package discovery."""
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        """Create an npm workspace with two apps, a library and an excluded package."""
+        project = tmp_path / "monorepo"
+        project.mkdir()
+        (project / "package.json").write_text(json.dumps({
+            "name": "monorepo",
+            "workspaces": ["packages/*", "apps/**", "!packages/legacy"],
+        }))
+        (project / "package-lock.json").write_text("{}")
+        _package(project, "apps/web/inventory", "@org/inventory", "inventory")
+        _package(project, "packages/dashboard", "@org/dashboard", "dashboard")
+        _package(project, "packages/ui", "@org/ui")
+        _package(project, "packages/legacy", "@org/legacy", "legacy")
+        _package(project, "packages/ui/node_modules/dep", "dep", "dep")
+        (project / "packages" / "docs").mkdir()
+        return project
+
+    def test_npm_workspaces(self, project):
+        """Test globs, ** patterns, negations and node_modules pruning."""
+        assert workspace_packages(str(project)) == [
+            "apps/web/inventory", "packages/dashboard", "packages/ui",
+        ]
+
+    def test_yarn_workspaces_object(self, project):
+        """Test yarn's {"packages": [...]} form of the workspaces field."""
+        (project / "package-lock.json").rename(project / "yarn.lock")
+        (project / "package.json").write_text(json.dumps({
+            "workspaces": {"packages": ["packages/*"], "nohoist": ["**/react"]},
+        }))
+
+        assert workspace_packages(str(project)) == [
+            "packages/dashboard", "packages/legacy", "packages/ui",
+        ]
+
+    def test_pnpm_workspace_yaml(self, project):
+        """Test that pnpm reads pnpm-workspace.yaml and ignores package.json workspaces."""
+        (project / "package-lock.json").rename(project / "pnpm-lock.yaml")
+        (project / "pnpm-workspace.yaml").write_text(
+            "packages:\n  - 'apps/*/*'\n  - \"packages/dashboard\"  # the shell\n"
+            "\ncatalog:\n  react: ^18.2.0\n"
+        )
+
+        assert workspace_packages(str(project)) == ["apps/web/inventory", "packages/dashboard"]
+
+    def test_apps(self, project):
+        """Test that only packages with an insights.appname are apps."""
+        assert workspace_apps(str(project)) == [
+            ("apps/web/inventory", "@org/inventory", "inventory"),
+            ("packages/dashboard", "@org/dashboard", "dashboard"),
+        ]
+
+    def test_selected_apps(self, project):
+        """Test selection by package name, app name or directory."""
+        assert workspace_apps(str(project), ["@org/inventory"]) == [
+            ("apps/web/inventory", "@org/inventory", "inventory"),
+        ]
+        assert [app for _, _, app in workspace_apps(str(project), ["packages/dashboard"])] == [
+            "dashboard",
+        ]
+        with pytest.raises(WorkspaceError, match="no workspace app matches ui"):
+            workspace_apps(str(project), ["ui"])
+
+    def test_duplicate_app_names(self, project):
+        """Test that two packages with the same app name are rejected."""
+        _package(project, "packages/ui", "@org/ui", "dashboard")
+
+        with pytest.raises(WorkspaceError, match="app name dashboard is used by both"):
+            workspace_apps(str(project))
+
+    def test_cli(self, project, capsys, monkeypatch):
+        """Test the apps and manifests listings and the error exit."""
+        monkeypatch.setenv("WORKSPACE_PACKAGES", "dashboard")
+        assert main(["apps", "--project-dir", str(project)]) == 0
+        assert capsys.readouterr().out == "packages/dashboard\t@org/dashboard\tdashboard\n"
+
+        assert main(["manifests", "--project-dir", str(project)]) == 0
+        assert capsys.readouterr().out.splitlines() == [
+            "apps/web/inventory/package.json",
+            "packages/dashboard/package.json",
+            "packages/ui/package.json",
+        ]
+
+        monkeypatch.delenv("WORKSPACE_PACKAGES")
+        (project / "package.json").write_text("{}")
+        assert main(["apps", "--project-dir", str(project)]) == 1
+        assert "Error: no workspace package" in capsys.readouterr().err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
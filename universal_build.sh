@@ -1,6 +1,70 @@
 #!/bin/bash
 set -euo pipefail
 
+# ────────── BUILD STEPS ──────────
+# Usage: universal_build.sh [all|install|build]
+#        universal_build.sh manifests <source_dir> <dest_dir>
+#   all (default) - install dependencies and build in one step
+#   manifests     - copy only the files the install needs (lockfiles,
+#                   manifests, package manager config) from source_dir to
+#                   dest_dir, so the install layer does not depend on the source
+#   install       - install dependencies only; stamps node_modules with a
+#                   fingerprint of the lockfile and manifests
+#   build         - build from the installed dependencies; reinstalls only when
+#                   node_modules does not match the current lockfile
+BUILD_STEP="${1:-all}"
+
+# Files the dependency install reads; everything else is source.
+INSTALL_MANIFESTS=(
+  package.json
+  "${PACKAGE_JSON_PATH:-package.json}"
+  package-lock.json
+  npm-shrinkwrap.json
+  yarn.lock
+  pnpm-lock.yaml
+  pnpm-workspace.yaml
+  .npmrc
+  .yarnrc
+  .yarnrc.yml
+  .pnpmfile.cjs
+  .yarn/releases
+  .yarn/plugins
+  .yarn/patches
+  patches
+  build-tools/parse-secrets.sh
+)
+INSTALL_STAMP=node_modules/.universal-build-install
+
+# install_manifests <dir> - INSTALL_MANIFESTS plus the package.json of every
+# npm/yarn/pnpm workspace package in dir, which a workspace install reads too
+function install_manifests() {
+  printf '%s\n' "${INSTALL_MANIFESTS[@]}"
+  workspace_packages.py manifests --project-dir "$1"
+}
+
+function copy_install_manifests() {
+  local source_dir="$1" dest_dir="$2" path
+  mkdir -p "$dest_dir"
+  while read -r path; do
+    if [[ -e "${source_dir}/${path}" ]]; then
+      (cd "$source_dir" && cp -a --parents "$path" "$dest_dir/")
+    fi
+  done < <(install_manifests "$source_dir")
+}
+
+case "$BUILD_STEP" in
+  manifests)
+    copy_install_manifests "$2" "$3"
+    exit 0
+    ;;
+  all|install|build)
+    ;;
+  *)
+    echo "Exiting; unknown build step '${BUILD_STEP}'. Use all, install, build or manifests" >&2
+    exit 1
+    ;;
+esac
+
 # ────────── SENTRY & SECRETS SETUP ──────────
 # NOTE: xtrace (-x) and verbose (-v) are deliberately OFF during this section
 # to prevent secret values from leaking into Konflux/Tekton build logs.
@@ -37,18 +101,122 @@ set -xv
 export APP_BUILD_DIR=${APP_BUILD_DIR:-dist}
 export OUTPUT_DIR=${OUTPUT_DIR:-dist}
 
+# ────────── WORKSPACE BUILD ──────────
+# With BUILD_WORKSPACES=true every package of the npm, yarn or pnpm workspace
+# that has an insights.appname (or those named in WORKSPACE_PACKAGES) is
+# built: one install at the workspace root, then the package builds, at most
+# BUILD_JOBS at a time. Each app's output is moved to
+# ${APP_BUILD_DIR}/<app name> and gets its own app.info.json, and
+# server_config_gen.sh writes an /apps/<app name> route for each.
+export BUILD_WORKSPACES=${BUILD_WORKSPACES:-false}
+BUILD_JOBS=${BUILD_JOBS:-$(nproc)}
+WORKSPACE_APPS=()
+
+case "$BUILD_WORKSPACES" in
+  true|false) ;;
+  *)
+    echo "Exiting; unsupported BUILD_WORKSPACES '${BUILD_WORKSPACES}'. Use 'true' or 'false'" >&2
+    exit 1
+    ;;
+esac
+if [[ ! "$BUILD_JOBS" =~ ^[1-9][0-9]*$ ]]; then
+  echo "Exiting; BUILD_JOBS must be a positive number, got '${BUILD_JOBS}'" >&2
+  exit 1
+fi
+
+# ────────── BUILD TRACE ──────────
+# Each phase and subcommand is recorded in a Chrome trace / Perfetto file
+# (${BUILD_TRACE_DIR}/build-trace.json) with its start, duration, exit code and
+# peak RSS. The trace goes next to the split sourcemaps (${SOURCEMAP_DIR},
+# else ${TMPDIR}), outside the build output, so its timings are not served
+# with the app. Set BUILD_TRACE=false to run the commands without the wrapper.
+BUILD_TRACE=${BUILD_TRACE:-true}
+BUILD_TRACE_DIR=${BUILD_TRACE_DIR:-${SOURCEMAP_DIR:-${TMPDIR:-/tmp}}}
+BUILD_TRACE_EVENTS=$(mktemp -t build-trace.XXXXXX)
+
+function trace_event() {
+  printf '{"ph":"%s","name":"%s","cat":"phase","ts":%s,"exit_code":%s}\n' \
+    "$1" "$2" "${EPOCHREALTIME//[!0-9]/}" "${3:-null}" >> "$BUILD_TRACE_EVENTS"
+}
+
+# trace_phase <name> <function|command> [args...]
+# Shell functions run in this shell so the variables they set stay visible;
+# external commands go through build_trace.py for their peak RSS.
+function trace_phase() {
+  local name="$1"
+  shift
+  if [[ "$BUILD_TRACE" != true ]]; then
+    "$@"
+  elif declare -F "$1" > /dev/null; then
+    trace_event B "$name"
+    "$@"
+    trace_event E "$name" 0
+  else
+    build_trace.py exec --events "$BUILD_TRACE_EVENTS" --name "$name" --cat phase -- "$@"
+  fi
+}
+
+# trace_cmd <command> [args...] - record one subcommand inside a phase
+function trace_cmd() {
+  if [[ "$BUILD_TRACE" != true ]]; then
+    "$@"
+  else
+    build_trace.py exec --events "$BUILD_TRACE_EVENTS" --name "$*" -- "$@"
+  fi
+}
+
+# Renders the trace on exit, including builds aborted by set -e; phases still
+# open are closed with the build's exit code.
+function trace_finish() {
+  local exit_code=$?
+  if [[ "$BUILD_TRACE" == true ]]; then
+    local trace_dir="${BUILD_TRACE_DIR}"
+    mkdir -p "$trace_dir" 2> /dev/null || trace_dir="${TMPDIR:-/tmp}"
+    build_trace.py render --events "$BUILD_TRACE_EVENTS" \
+      --output "${trace_dir}/build-trace.json" --exit-code "$exit_code" || true
+  fi
+  rm -f "$BUILD_TRACE_EVENTS"
+  return "$exit_code"
+}
+
+trap trace_finish EXIT
+# ────────── END BUILD TRACE ──────────
+
 function install() {
   if [[ "$USES_NPM" == true ]]; then
-    npm ci
+    trace_cmd npm ci
   elif [[ "$USES_YARN" == true ]]; then
-    yarn install --immutable
+    # Work around large package timeout; up default from 30s to 5m
+    yarn config set network-timeout 300000
+    trace_cmd yarn install --immutable
   elif [[ "$USES_PNPM" == true ]]; then
-    pnpm install --frozen-lockfile
+    trace_cmd pnpm install --frozen-lockfile ${PNPM_STORE_DIR:+--store-dir "$PNPM_STORE_DIR"}
   else
     # Normally we would not use exit in a source'd file, but this should fail the job
     echo "Exiting; no supported installation packages"
     exit 1
   fi
+  mkdir -p node_modules
+  install_fingerprint > "$INSTALL_STAMP"
+}
+
+# Identifies an install: the Node version plus the content of every manifest
+# file the install read, including the files under manifest directories
+# (patches, .yarn/patches, .yarn/plugins, .yarn/releases).
+function install_fingerprint() {
+  local path
+  node --version
+  while read -r path; do
+    if [[ -f "$path" ]]; then
+      sha256sum "$path"
+    elif [[ -d "$path" ]]; then
+      find "$path" -type f -print0 | LC_ALL=C sort -z | xargs -0 -r sha256sum
+    fi
+  done < <(install_manifests .)
+}
+
+function install_is_current() {
+  [[ -f "$INSTALL_STAMP" ]] && [[ "$(install_fingerprint)" == "$(cat "$INSTALL_STAMP")" ]]
 }
 
 function verify() {
@@ -65,33 +233,32 @@ function verify() {
   fi
 }
 
-function build() {
+# build_script - the package.json script the build runs
+function build_script() {
   if [[ "$USES_NPM" == true ]]; then
     # If NPM_BUILD_SCRIPT env var is set use that
     # Otherwise just build
-    if [[ -n "$NPM_BUILD_SCRIPT" ]]; then
-      npm run "$NPM_BUILD_SCRIPT"
-    else
-      npm run build
-    fi
+    echo "${NPM_BUILD_SCRIPT:-build}"
   elif [[ "$USES_YARN" == true ]]; then
     # If YARN_BUILD_SCRIPT env var is set use that
     # Otherwise just build
-    if [[ -n "$YARN_BUILD_SCRIPT" ]]; then
-      yarn "$YARN_BUILD_SCRIPT"
-    else
-      yarn build:prod
-    fi
+    echo "${YARN_BUILD_SCRIPT:-build:prod}"
   elif [[ "$USES_PNPM" == true ]]; then
     # Prefer the pnpm-specific build arg, but keep NPM_BUILD_SCRIPT working for
     # existing Tekton/Konflux configs that use that build arg name.
-    if [[ -n "$PNPM_BUILD_SCRIPT" ]]; then
-      pnpm run "$PNPM_BUILD_SCRIPT"
-    elif [[ -n "$NPM_BUILD_SCRIPT" ]]; then
-      pnpm run "$NPM_BUILD_SCRIPT"
-    else
-      pnpm run build
-    fi
+    echo "${PNPM_BUILD_SCRIPT:-${NPM_BUILD_SCRIPT:-build}}"
+  fi
+}
+
+function build() {
+  local script
+  script=$(build_script)
+  if [[ "$USES_NPM" == true ]]; then
+    trace_cmd npm run "$script"
+  elif [[ "$USES_YARN" == true ]]; then
+    trace_cmd yarn "$script"
+  elif [[ "$USES_PNPM" == true ]]; then
+    trace_cmd pnpm run "$script"
   else
     # Normally we would not use exit in a source'd file, but this should fail the job
     echo "Exiting; no supported build or target"
@@ -99,6 +266,94 @@ function build() {
   fi
 }
 
+# load_workspace_apps - fill WORKSPACE_APPS with one "<dir>\t<package>\t<app>"
+# entry per workspace app (see workspace_packages.py)
+function load_workspace_apps() {
+  local listing
+  listing=$(workspace_packages.py apps)
+  mapfile -t WORKSPACE_APPS <<< "$listing"
+}
+
+# export_app_sentry <app name>
+# Enables Sentry with the app's own <APP_NAME>_SECRET when it is set; meant
+# for a subshell that handles only that app of a workspace build.
+function export_app_sentry() {
+  local secret_var
+  # No xtrace while the secret is read (see SENTRY & SECRETS SETUP)
+  { set +xv; } 2> /dev/null
+  secret_var="$(tr '[:lower:]-' '[:upper:]_' <<< "$1")_SECRET"
+  if [[ -n "${!secret_var:-}" ]]; then
+    export ENABLE_SENTRY=true
+    export SENTRY_AUTH_TOKEN="${!secret_var}"
+    echo "Sentry: token found for ${1} – enabling sourcemap upload."
+  fi
+  set -xv
+}
+
+# build_workspace_app <dir> <package name> <app name>
+# Builds one workspace package with the package manager's workspace command.
+function build_workspace_app() {
+  local dir="$1" name="$2" app="$3" script
+  script=$(build_script)
+  export_app_sentry "$app"
+  export APP_NAME="$app"
+  if [[ "$USES_NPM" == true ]]; then
+    trace_cmd npm run "$script" --workspace "$dir"
+  elif [[ "$USES_YARN" == true ]]; then
+    trace_cmd yarn workspace "$name" run "$script"
+  elif [[ "$USES_PNPM" == true ]]; then
+    trace_cmd pnpm --filter "$name" run "$script"
+  fi
+}
+
+# build_workspaces
+# Builds the workspace apps, at most BUILD_JOBS at a time, and moves each
+# app's output to ${APP_BUILD_DIR}/<app name>. A build's log is buffered and
+# printed once all builds finished so concurrent logs do not interleave;
+# every build runs to completion and the phase fails if any of them failed.
+function build_workspaces() {
+  local log_dir entry dir name app status failed=false
+  load_workspace_apps
+  log_dir=$(mktemp -d -t workspace-build.XXXXXX)
+
+  for entry in "${WORKSPACE_APPS[@]}"; do
+    IFS=$'\t' read -r dir name app <<< "$entry"
+    while (( $(jobs -rp | wc -l) >= BUILD_JOBS )); do
+      wait -n || true
+    done
+    echo "Workspace build: starting ${app} (${dir})"
+    (
+      status=0
+      build_workspace_app "$dir" "$name" "$app" > "${log_dir}/${app}.log" 2>&1 || status=$?
+      echo "$status" > "${log_dir}/${app}.status"
+    ) &
+  done
+  wait
+
+  mkdir -p "$APP_BUILD_DIR"
+  for entry in "${WORKSPACE_APPS[@]}"; do
+    IFS=$'\t' read -r dir name app <<< "$entry"
+    status=$(cat "${log_dir}/${app}.status")
+    echo "──────────── ${app} (${dir}): exit ${status} ────────────"
+    cat "${log_dir}/${app}.log"
+    if [[ "$status" != 0 ]]; then
+      failed=true
+    elif [[ ! -d "${dir}/${APP_BUILD_DIR}" ]]; then
+      echo "Exiting; the ${app} build wrote no ${dir}/${APP_BUILD_DIR}" >&2
+      failed=true
+    else
+      rm -rf "${APP_BUILD_DIR:?}/${app}"
+      mv "${dir}/${APP_BUILD_DIR}" "${APP_BUILD_DIR}/${app}"
+    fi
+  done
+  rm -rf "$log_dir"
+
+  if [[ "$failed" == true ]]; then
+    echo "Exiting; workspace builds failed" >&2
+    exit 1
+  fi
+}
+
 function delete_node_modules() {
   if [[ -d "node_modules" ]]; then
     rm -rf node_modules
@@ -155,16 +410,89 @@ fi
 
 export APP_NAME
 
-setPackageManager
+trace_phase setPackageManager setPackageManager
 
-if [[ "$USES_YARN" == true ]]; then
-  # Work around large package timeout; up default from 30s to 5m
-  yarn config set network-timeout 300000
+if [[ "$BUILD_STEP" == install ]]; then
+  trace_phase install install
+  exit 0
 fi
 
-install
-
 export BETA=false
-build
-build_app_info.sh > "${APP_BUILD_DIR}/app.info.json"
-server_config_gen.sh
+
+# Content-addressed build cache: same lockfile, sources, build script, Node
+# version and build env as a cached build => restore its output and skip the
+# install and build entirely (see build_cache.py).
+BUILD_CACHE_KEY=""
+if [[ -n "${BUILD_CACHE_DIR:-}" ]]; then
+  BUILD_CACHE_KEY=$(trace_phase build_cache_key build_cache.py key)
+fi
+
+if [[ -n "$BUILD_CACHE_KEY" ]] && build_cache.py restore "${APP_BUILD_DIR}" --key "$BUILD_CACHE_KEY"; then
+  echo "Build output restored from cache; skipping install and build"
+else
+  if [[ "$BUILD_STEP" == build ]] && install_is_current; then
+    echo "Dependencies already installed for this lockfile; skipping install"
+  else
+    trace_phase install install
+  fi
+
+  if [[ "$BUILD_WORKSPACES" == true ]]; then
+    trace_phase build build_workspaces
+  else
+    trace_phase build build
+  fi
+
+  if [[ -n "$BUILD_CACHE_KEY" ]]; then
+    trace_phase build_cache_store build_cache.py store "${APP_BUILD_DIR}" --key "$BUILD_CACHE_KEY" \
+      || echo "Warning: could not store the build output in the build cache" >&2
+  fi
+fi
+
+# process_build_output <build_dir> [<app name>]
+# The steps run on one app's build output; the app name (workspace builds)
+# is appended to the phase names.
+function process_build_output() {
+  local build_dir="$1" suffix="${2:+ $2}"
+
+  # Sourcemaps: with SOURCEMAP_MODE=split or strip the *.map files move out of
+  # the build output into a tarball plus manifest in ${SOURCEMAP_DIR} (see
+  # sourcemaps.py), after the cache store so cached outputs keep their maps.
+  trace_phase "sourcemaps${suffix}" sourcemaps.py split "$build_dir"
+
+  # With SOURCEMAP_UPLOAD=true and Sentry enabled, the split maps and their
+  # bundles are uploaded here, skipping what the ledger (SOURCEMAP_LEDGER)
+  # records as already uploaded. A failed upload does not fail the build; the
+  # failed files stay out of the ledger and are retried by the next build.
+  if [[ "${SOURCEMAP_UPLOAD:-false}" == true && "${ENABLE_SENTRY:-false}" == true ]]; then
+    trace_phase "sourcemap_upload${suffix}" sourcemaps.py upload "$build_dir" \
+      || echo "Warning: sourcemap upload failed" >&2
+  fi
+
+  # Size, SHA-256 and SRI (sha384) of every file: assets.manifest.json
+  trace_phase "asset_integrity${suffix}" asset_integrity.py "$build_dir"
+
+  trace_phase "app_info${suffix}" build_app_info.sh --output-dir "$build_dir"
+  trace_phase "asset_inventory${suffix}" asset_inventory.py "$build_dir"
+}
+
+if [[ "$BUILD_WORKSPACES" == true ]]; then
+  load_workspace_apps
+  for entry in "${WORKSPACE_APPS[@]}"; do
+    IFS=$'\t' read -r dir _ app <<< "$entry"
+    # Per-app settings; "{app}" in ASSET_BASELINE and SOURCEMAP_LEDGER is
+    # replaced with the app name
+    (
+      export_app_sentry "$app"
+      export APP_NAME="$app"
+      export PACKAGE_JSON_PATH="${dir}/package.json"
+      export SOURCEMAP_DIR="${SOURCEMAP_DIR:-sourcemaps}/${app}"
+      export ASSET_BASELINE="${ASSET_BASELINE:+${ASSET_BASELINE//\{app\}/$app}}"
+      export SOURCEMAP_LEDGER="${SOURCEMAP_LEDGER:+${SOURCEMAP_LEDGER//\{app\}/$app}}"
+      process_build_output "${APP_BUILD_DIR}/${app}" "$app"
+    )
+  done
+else
+  process_build_output "${APP_BUILD_DIR}"
+fi
+
+trace_phase server_config server_config_gen.sh
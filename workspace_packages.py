@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------
+# Script Name: workspace_packages.py
+# Description: discovers the packages of an npm, yarn or pnpm workspace. The
+#              workspace globs come from the package manager the lockfile
+#              selects, as in universal_build.sh setPackageManager():
+#              pnpm-workspace.yaml for pnpm-lock.yaml, the "workspaces" field
+#              of package.json for package-lock.json and yarn.lock. `apps`
+#              lists the packages with an insights.appname, which the
+#              workspace build mode builds; `manifests` lists the package.json
+#              of every workspace package, which the dependency install reads.
+#
+# Usage:       ./workspace_packages.py apps [--project-dir <dir>]
+#              ./workspace_packages.py manifests [--project-dir <dir>]
+#
+# Parameters:  --project-dir  Workspace root (default: current directory)
+#
+# Environment: WORKSPACE_PACKAGES  Space-separated package names, app names or
+#                                  directories to build (default: every app)
+#
+# Output:      apps: one "<dir>\t<package name>\t<app name>" line per app,
+#              sorted by directory; manifests: one package.json path per line.
+# ----------------------------------------------------------------------------
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+
+# Lockfile -> where that package manager reads its workspace globs from
+WORKSPACE_SOURCES = (
+    ("package-lock.json", "package.json"),
+    ("yarn.lock", "package.json"),
+    ("pnpm-lock.yaml", "pnpm-workspace.yaml"),
+)
+
+
+class WorkspaceError(Exception):
+    """Raised when the workspace packages cannot be determined."""
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except OSError:
+        return {}
+    except ValueError as e:
+        raise WorkspaceError(f"could not parse {path}: {e}") from e
+
+
+def workspace_globs(project_dir):
+    """Return the workspace package globs of the package manager in use.
+
+    Returns:
+        list: Glob patterns relative to project_dir; "!" patterns exclude
+    """
+    source = next(
+        (source for lockfile, source in WORKSPACE_SOURCES
+         if os.path.isfile(os.path.join(project_dir, lockfile))),
+        "package.json",
+    )
+    path = os.path.join(project_dir, source)
+    if source == "pnpm-workspace.yaml":
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return []
+        # The "packages:" list; the builder image has no YAML library
+        match = re.search(r"^packages:\s*\n((?:[ \t]+.*\n?|\s*\n)*)", text, re.MULTILINE)
+        if not match:
+            return []
+        return re.findall(r"^\s*-\s*['\"]?([^'\"#\s]+)", match.group(1), re.MULTILINE)
+
+    workspaces = _read_json(path).get("workspaces") or []
+    if isinstance(workspaces, dict):
+        workspaces = workspaces.get("packages") or []
+    return [pattern for pattern in workspaces if isinstance(pattern, str)]
+
+
+def workspace_packages(project_dir):
+    """Return the workspace package directories, relative and sorted."""
+    included, excluded = set(), set()
+    for pattern in workspace_globs(project_dir):
+        target = excluded if pattern.startswith("!") else included
+        pattern = pattern.lstrip("!").removeprefix("./").rstrip("/")
+        for path in glob.glob(os.path.join(project_dir, pattern), recursive=True):
+            rel_path = os.path.relpath(path, project_dir).replace(os.sep, "/")
+            if "node_modules" in rel_path.split("/") or rel_path == ".":
+                continue
+            if os.path.isfile(os.path.join(path, "package.json")):
+                target.add(rel_path)
+    return sorted(included - excluded)
+
+
+def workspace_apps(project_dir, selected=None):
+    """Return the workspace packages that are frontend apps.
+
+    Args:
+        project_dir: Workspace root
+        selected: Package names, app names or directories to keep (default: all)
+
+    Returns:
+        list: (directory, package name, app name) tuples, sorted by directory
+
+    Raises:
+        WorkspaceError: No apps, an unknown selection or a duplicate app name
+    """
+    apps = []
+    for rel_dir in workspace_packages(project_dir):
+        package = _read_json(os.path.join(project_dir, rel_dir, "package.json"))
+        app_name = (package.get("insights") or {}).get("appname")
+        if app_name:
+            apps.append((rel_dir, package.get("name") or rel_dir, app_name))
+
+    if selected:
+        unknown = [name for name in selected if not any(name in app for app in apps)]
+        if unknown:
+            raise WorkspaceError(f"no workspace app matches {', '.join(unknown)}")
+        apps = [app for app in apps if any(name in app for name in selected)]
+    if not apps:
+        raise WorkspaceError(
+            f"no workspace package in {project_dir} has an insights.appname in package.json"
+        )
+
+    seen = {}
+    for rel_dir, _, app_name in apps:
+        if app_name in seen:
+            raise WorkspaceError(
+                f"app name {app_name} is used by both {seen[app_name]} and {rel_dir}"
+            )
+        seen[app_name] = rel_dir
+    return apps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the packages of an npm/yarn/pnpm workspace.")
+    parser.add_argument("command", choices=["apps", "manifests"])
+    parser.add_argument("--project-dir", default=".")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "manifests":
+            for rel_dir in workspace_packages(args.project_dir):
+                print(f"{rel_dir}/package.json")
+            return 0
+
+        selected = (os.environ.get("WORKSPACE_PACKAGES") or "").split()
+        for app in workspace_apps(args.project_dir, selected):
+            print("\t".join(app))
+    except WorkspaceError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())